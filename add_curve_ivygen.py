@@ -27,11 +27,9 @@ from bpy.props import (
     PointerProperty,
 )
 from mathutils.bvhtree import BVHTree
-from mathutils import (
-    Vector,
-    Matrix,
-)
+from mathutils import Vector
 from collections import deque
+from itertools import chain
 from math import (
     pow, cos,
     pi, atan2,
@@ -39,8 +37,11 @@ from math import (
 from random import (
     random as rand_val,
     seed as rand_seed,
+    getstate as rand_getstate,
+    setstate as rand_setstate,
 )
 import time
+import numpy as np
 
 
 def createIvyGeometry(IVY, growLeaves):
@@ -59,55 +60,76 @@ def createIvyGeometry(IVY, growLeaves):
     if growLeaves:
         # Create the ivy leaves
         # Order location of the vertices
-        signList = ((-1.0, +1.0),
-                    (+1.0, +1.0),
-                    (+1.0, -1.0),
-                    (-1.0, -1.0),
-                    )
+        signList = np.array(((-1.0, +1.0),
+                             (+1.0, +1.0),
+                             (+1.0, -1.0),
+                             (-1.0, -1.0),
+                             ))
 
         # Get the local size
         # local_ivyLeafSize = IVY.ivyLeafSize  # * radius * IVY.ivySize
 
-        # Initialise the vertex and face lists
-        vertList = deque()
+        # Initialise the vertex list, one array of leaf quads per root
+        vertList = []
 
         # Store the methods for faster calling
-        addV = vertList.extend
-        rotMat = Matrix.Rotation
+        down = Vector((0, 0, -1))
 
     # Loop over all roots to generate its nodes
     for root in IVY.ivyRoots:
         # Only grow if more than one node
         numNodes = len(root.ivyNodes)
         if numNodes > 1:
+            # Random access is slow on a deque
+            nodes = list(root.ivyNodes)
+
             # Calculate the local radius
             local_ivyBranchRadius = 1.0 / (root.parents + 1) + 1.0
-            prevIvyLength = 1.0 / root.ivyNodes[-1].length
-            splineVerts = [ax for n in root.ivyNodes for ax in n.pos.to_4d()]
+            prevIvyLength = 1.0 / nodes[-1].length
+            positions = np.fromiter(chain.from_iterable(n.pos for n in nodes),
+                                    np.float64, 3 * numNodes).reshape(-1, 3)
+            splineVerts = np.ones((numNodes, 4))
+            splineVerts[:, :3] = positions
 
             radiusConstant = local_ivyBranchRadius * IVY.ivyBranchSize
             splineRadii = [radiusConstant * (1.3 - n.length * prevIvyLength)
-                           for n in root.ivyNodes]
+                           for n in nodes]
 
             # Add the poly curve and set coords and radii
             newSpline = curve.splines.new(type='POLY')
-            newSpline.points.add(len(splineVerts) // 4 - 1)
-            newSpline.points.foreach_set('co', splineVerts)
+            newSpline.points.add(numNodes - 1)
+            newSpline.points.foreach_set('co', splineVerts.ravel())
             newSpline.points.foreach_set('radius', splineRadii)
 
+            # Gaussian smoothing of the adhesion vectors along the root,
+            # summed in single precision like the vectors of the nodes
+            adhesionVectors = np.fromiter(
+                chain.from_iterable(n.adhesionVector for n in nodes),
+                np.float32, 3 * numNodes).reshape(-1, 3)
+            smoothAdhesionVectors = np.zeros((numNodes, 3), dtype=np.float32)
+            indices = np.arange(numNodes)
+            for k in range(len(gaussWeight)):
+                idx = np.clip(indices + k - 5, 0, numNodes - 1)
+                smoothAdhesionVectors += (np.float32(gaussWeight[k]) *
+                                          adhesionVectors[idx])
+
+            # Leaves: node index, position along the segment, random vector,
+            # angles and size of each leaf
+            leafNodes = []
+            leafFactors = []
+            leafRandom = []
+            leafAngles = []
+            leafSizes = []
+
             # Loop over all nodes in the root
-            for i, n in enumerate(root.ivyNodes):
-                for k in range(len(gaussWeight)):
-                    idx = max(0, min(i + k - 5, numNodes - 1))
-                    n.smoothAdhesionVector += (gaussWeight[k] *
-                                               root.ivyNodes[idx].adhesionVector)
+            for i, n in enumerate(nodes):
+                n.smoothAdhesionVector = Vector(smoothAdhesionVectors[i])
                 n.smoothAdhesionVector /= 56.0
                 n.adhesionLength = n.smoothAdhesionVector.length
                 n.smoothAdhesionVector.normalize()
 
                 if growLeaves and (i < numNodes - 1):
-                    node = root.ivyNodes[i]
-                    nodeNext = root.ivyNodes[i + 1]
+                    node = n
 
                     # Find the weight and normalize the smooth adhesion vector
                     weight = pow(node.length * prevIvyLength, 0.7)
@@ -125,7 +147,7 @@ def createIvyGeometry(IVY, growLeaves):
                                 node.smoothAdhesionVector.x) - pi / 2.0
 
                     theta = (0.5 *
-                        node.smoothAdhesionVector.angle(Vector((0, 0, -1)), 0))
+                        node.smoothAdhesionVector.angle(down, 0))
 
                     # Find the size weight
                     sizeWeight = 1.5 - (cos(2 * pi * weight) * 0.5 + 0.5)
@@ -145,45 +167,70 @@ def createIvyGeometry(IVY, growLeaves):
                         if (probability * weight) > IVY.leafProbability:
 
                             # Generate the random vector
-                            randomVector = Vector((rand_val() - 0.5,
-                                                   rand_val() - 0.5,
-                                                   rand_val() - 0.5,
-                                                   ))
-
-                            # Find the leaf center
-                            center = (node.pos.lerp(nodeNext.pos, j / 10.0) +
-                                               IVY.ivyLeafSize * randomVector)
-
-                            # For each of the verts, rotate/scale and append
-                            basisVecX = Vector((1, 0, 0))
-                            basisVecY = Vector((0, 1, 0))
-
-                            horiRot = rotMat(theta, 3, 'X')
-                            vertRot = rotMat(phi, 3, 'Z')
-
-                            basisVecX.rotate(horiRot)
-                            basisVecY.rotate(horiRot)
-
-                            basisVecX.rotate(vertRot)
-                            basisVecY.rotate(vertRot)
-
-                            basisVecX *= leafSize
-                            basisVecY *= leafSize
-
-                            addV([k1 * basisVecX + k2 * basisVecY + center for
-                                                           k1, k2 in signList])
+                            leafRandom.append((rand_val() - 0.5,
+                                               rand_val() - 0.5,
+                                               rand_val() - 0.5,
+                                               ))
+                            leafNodes.append(i)
+                            leafFactors.append(j / 10.0)
+                            leafAngles.append((theta, phi))
+                            leafSizes.append(leafSize)
+
+            if leafNodes:
+                leafNodes = np.array(leafNodes)
+                leafFactors = np.array(leafFactors)[:, np.newaxis]
+
+                # Find the leaf centers
+                center = (positions[leafNodes] * (1.0 - leafFactors) +
+                          positions[leafNodes + 1] * leafFactors +
+                          IVY.ivyLeafSize * np.array(leafRandom))
+
+                # Rotate the basis vectors around X by theta, then around Z
+                # by phi, all leaves at once
+                theta, phi = np.array(leafAngles).T
+                cosTheta, sinTheta = np.cos(theta), np.sin(theta)
+                cosPhi, sinPhi = np.cos(phi), np.sin(phi)
+                zeros = np.zeros_like(theta)
+                ones = np.ones_like(theta)
+                horiRot = np.stack((ones, zeros, zeros,
+                                    zeros, cosTheta, -sinTheta,
+                                    zeros, sinTheta, cosTheta),
+                                   axis=-1).reshape(-1, 3, 3)
+                vertRot = np.stack((cosPhi, -sinPhi, zeros,
+                                    sinPhi, cosPhi, zeros,
+                                    zeros, zeros, ones),
+                                   axis=-1).reshape(-1, 3, 3)
+                basis = (vertRot @ horiRot) * np.array(leafSizes)[:, np.newaxis, np.newaxis]
+                basisVecX = basis[:, :, 0]
+                basisVecY = basis[:, :, 1]
+
+                # For each of the verts, rotate/scale and append
+                vertList.append(
+                    signList[np.newaxis, :, 0, np.newaxis] * basisVecX[:, np.newaxis] +
+                    signList[np.newaxis, :, 1, np.newaxis] * basisVecY[:, np.newaxis] +
+                    center[:, np.newaxis])
 
     # Add the object and link to scene
     newCurve = bpy.data.objects.new("IVY_Curve", curve)
     bpy.context.collection.objects.link(newCurve)
 
     if growLeaves:
-        faceList = [[4 * i + l for l in range(4)] for i in
-                    range(len(vertList) // 4)]
+        if vertList:
+            vertList = np.concatenate(vertList).reshape(-1, 3)
+        else:
+            vertList = np.zeros((0, 3))
+        numVerts = len(vertList)
+        numFaces = numVerts // 4
 
         # Generate the new leaf mesh and link
         me = bpy.data.meshes.new('IvyLeaf')
-        me.from_pydata(vertList, [], faceList)
+        me.vertices.add(numVerts)
+        me.vertices.foreach_set('co', vertList.astype(np.float32).ravel())
+        me.loops.add(numVerts)
+        me.loops.foreach_set('vertex_index', np.arange(numVerts, dtype=np.int32))
+        me.polygons.add(numFaces)
+        me.polygons.foreach_set('loop_start', np.arange(0, numVerts, 4, dtype=np.int32))
+        me.polygons.foreach_set('loop_total', np.full(numFaces, 4, dtype=np.int32))
         me.update(calc_edges=True)
         ob = bpy.data.objects.new('IvyLeaf', me)
         bpy.context.collection.objects.link(ob)
@@ -280,29 +327,34 @@ class Ivy:
         # local_maxFloatLength = self.maxFloatLength  # * radius
         # local_maxAdhesionDistance = self.maxAdhesionDistance  # * radius
 
-        for root in self.ivyRoots:
-            # Make sure the root is alive, if not, skip
-            if not root.alive:
-                continue
-
-            # Get the last node in the current root
-            prevIvy = root.ivyNodes[-1]
+        # Grow the last node of all the roots alive in one step, the BVH
+        # tree is queried for all of them at once
+        growRoots = [root for root in self.ivyRoots if root.alive]
+        prevNodes = [root.ivyNodes[-1] for root in growRoots]
 
+        # Make the random vectors and normalize, in the order of the roots
+        randomVectors = []
+        for root, prevIvy in zip(growRoots, prevNodes):
             # If the node is floating for too long, kill the root
             if prevIvy.floatingLength > self.maxFloatLength:
                 root.alive = False
 
-            # Set the primary direction from the last node
-            primaryVector = prevIvy.primaryDir
-
-            # Make the random vector and normalize
             randomVector = Vector((rand_val() - 0.5, rand_val() - 0.5,
                                    rand_val() - 0.5)) + Vector((0, 0, 0.2))
             randomVector.normalize()
+            randomVectors.append(randomVector)
+
+        # Calculate the adhesion vectors
+        maxAdhesionDistance = self.maxAdhesionDistance
+        adhesionVectors = [adhesion(prevIvy.pos, bvhtree, maxAdhesionDistance)
+                           for prevIvy in prevNodes]
 
-            # Calculate the adhesion vector
-            adhesionVector = adhesion(
-                    prevIvy.pos, bvhtree, self.maxAdhesionDistance)
+        newPositions = []
+        gravityVectors = []
+        for prevIvy, randomVector, adhesionVector in zip(
+                prevNodes, randomVectors, adhesionVectors):
+            # Set the primary direction from the last node
+            primaryVector = prevIvy.primaryDir
 
             # Calculate the growing vector
             growVector = self.ivySize * (primaryVector * self.primaryWeight +
@@ -314,13 +366,17 @@ class Ivy:
                                                             Vector((0, 0, -1)))
             gravityVector *= pow(prevIvy.floatingLength / self.maxFloatLength,
                                  0.7)
+            gravityVectors.append(gravityVector)
 
             # Determine the new position vector
-            newPos = prevIvy.pos + growVector + gravityVector
+            newPositions.append(prevIvy.pos + growVector + gravityVector)
 
-            # Check for collisions with the object
-            climbing, newPos = collision(bvhtree, prevIvy.pos, newPos)
+        # Check for collisions with the object
+        collisions = [collision(bvhtree, prevIvy.pos, newPos)
+                      for prevIvy, newPos in zip(prevNodes, newPositions)]
 
+        for root, prevIvy, adhesionVector, gravityVector, (climbing, newPos) in zip(
+                growRoots, prevNodes, adhesionVectors, gravityVectors, collisions):
             # Update the growing vector for any collisions
             growVector = newPos - prevIvy.pos - gravityVector
             growVector.normalize()
@@ -355,27 +411,38 @@ class Ivy:
 
             # Check to make sure there's more than 1 node
             if len(root.ivyNodes) > 1:
-                # Loop through all nodes in root to check if new root is grown
-                for node in root.ivyNodes:
-                    # Set the last node of the root and find the weighting
-                    prevIvy = root.ivyNodes[-1]
-                    weight = 1.0 - (cos(2.0 * pi * node.length /
-                                        prevIvy.length) * 0.5 + 0.5)
-
-                    probability = rand_val()
-
-                    # Check if a new root is grown and if so, set its values
-                    if (probability * weight > self.branchingProbability):
-                        tmpNode = IvyNode()
-                        tmpNode.pos = node.pos
-                        tmpNode.floatingLength = node.floatingLength
-
-                        tmpRoot = IvyRoot()
-                        tmpRoot.parents = root.parents + 1
-
-                        tmpRoot.ivyNodes.append(tmpNode)
-                        self.ivyRoots.append(tmpRoot)
-                        return
+                # Find the weighting of all nodes in root, with the last
+                # node length
+                lengths = [node.length for node in root.ivyNodes]
+                prevLength = lengths[-1]
+                weights = [1.0 - (cos(2.0 * pi * length / prevLength) *
+                                  0.5 + 0.5) for length in lengths]
+
+                # One probability per node, as long as no new root is grown
+                randomState = rand_getstate()
+                probabilities = [rand_val() for length in lengths]
+                newRoots = np.flatnonzero(np.array(probabilities) *
+                                          np.array(weights) >
+                                          self.branchingProbability)
+
+                # Check if a new root is grown and if so, set its values
+                if len(newRoots):
+                    # Only the probabilities up to the new root are used
+                    rand_setstate(randomState)
+                    for i in range(newRoots[0] + 1):
+                        rand_val()
+
+                    node = root.ivyNodes[newRoots[0]]
+                    tmpNode = IvyNode()
+                    tmpNode.pos = node.pos
+                    tmpNode.floatingLength = node.floatingLength
+
+                    tmpRoot = IvyRoot()
+                    tmpRoot.parents = root.parents + 1
+
+                    tmpRoot.ivyNodes.append(tmpNode)
+                    self.ivyRoots.append(tmpRoot)
+                    return
 
 
 def adhesion(loc, bvhtree, max_l):
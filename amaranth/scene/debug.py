@@ -36,6 +36,7 @@ Branched Path Tracing), size, and change their visibility.
 import os
 import bpy
 from amaranth import utils
+from bpy.app.handlers import persistent
 from bpy.types import (
         Operator,
         Panel,
@@ -84,6 +85,168 @@ class AMTH_store_data():
     count_image_node_unlinked = 0  # Unlinked Image nodes
 
 
+class AMTH_users_index():
+    """
+    Reverse references of the datablocks, built in a single pass over the data with
+    bpy.data.user_map() and a walk of the node trees. Kept until the data changes,
+    a file is loaded, or on undo and redo.
+    """
+    image_node_types = {'TEX_IMAGE', 'TEX_ENVIRONMENT'}
+
+    def __init__(self):
+        d = bpy.data
+        self.user_map = d.user_map()
+
+        # material name: objects using it in a material slot
+        self.material_objects = {}
+        # vertex color layer name: mesh objects with that layer
+        self.vcol_objects = {}
+        for ob in d.objects:
+            for slot in ob.material_slots:
+                users = self.material_objects.setdefault(slot.name, [])
+                if ob not in users:
+                    users.append(ob)
+            if ob.type == 'MESH':
+                for v in ob.data.vertex_colors:
+                    users = self.vcol_objects.setdefault(v.name, [])
+                    if ob.name not in users:
+                        users.append(ob.name)
+
+        # image name: {users type: descriptions}, for images used by nodes
+        self.image_nodes = {}
+        # attribute name: materials with an attribute node reading it
+        self.attribute_materials = {}
+        if utils.cycles_exists():
+            for ma in d.materials:
+                if not ma.node_tree:
+                    continue
+                objects = [ob.name for ob in self.material_objects.get(ma.name, [])]
+                for no in self.walk_nodes(ma.node_tree, self.image_node_types):
+                    if no.image:
+                        self.add_image_user(no.image.name, 'MATERIAL', '"{0}" {1}{2}'.format(
+                                ma.name,
+                                'in object: {0}'.format(objects) if objects else ' (unassigned)',
+                                '' if self.is_linked(no) else ' (unconnected)'))
+                for no in ma.node_tree.nodes:
+                    if no.type == 'ATTRIBUTE':
+                        if objects:
+                            name = '{0} in object: {1}'.format(ma.name, objects)
+                        else:
+                            name = '{0} (unassigned)'.format(ma.name)
+                        users = self.attribute_materials.setdefault(no.attribute_name, [])
+                        if name not in users:
+                            users.append(name)
+
+            for la in d.lights:
+                if la.node_tree:
+                    for no in self.walk_nodes(la.node_tree, self.image_node_types):
+                        if no.image:
+                            self.add_image_user(no.image.name, 'LIGHT', la.name)
+
+            for wo in d.worlds:
+                if wo.node_tree:
+                    for no in self.walk_nodes(wo.node_tree, self.image_node_types):
+                        if no.image:
+                            self.add_image_user(no.image.name, 'WORLD', wo.name)
+
+        for sce in d.scenes:
+            if sce.node_tree:
+                for no in self.walk_nodes(sce.node_tree, {'IMAGE'}):
+                    if no.image:
+                        self.add_image_user(no.image.name, 'NODETREE',
+                                'Node {0} in Compositor (Scene "{1}"){2}'.format(
+                                no.name,
+                                sce.name,
+                                '' if self.is_linked(no) else ' (unconnected)'))
+
+    @staticmethod
+    def walk_nodes(node_tree, types):
+        # nodes of the given types in the tree and in its group nodes
+        for nd in node_tree.nodes:
+            if nd.type in types:
+                yield nd
+            elif nd.type == 'GROUP' and nd.node_tree:
+                for ng in nd.node_tree.nodes:
+                    if ng.type in types:
+                        yield ng
+
+    @staticmethod
+    def is_linked(node):
+        return any(o.links for o in node.outputs)
+
+    def add_image_user(self, image_name, what, name):
+        users = self.image_nodes.setdefault(image_name, {}).setdefault(what, [])
+        if name not in users:
+            users.append(name)
+
+    def image_users(self, image_name):
+        """Users of the image, in a dict with the keys of AMTH_store_data.users"""
+        users = {what: list(names) for what, names in self.image_nodes.get(image_name, {}).items()}
+        image = bpy.data.images.get(image_name)
+        if image is None:
+            return users
+
+        for user in self.user_map.get(image, ()):
+            if isinstance(user, bpy.types.Texture):
+                if user.type == 'IMAGE' and user.image == image:
+                    users.setdefault('TEXTURE', []).append(user.name)
+
+            elif isinstance(user, bpy.types.Object):
+                if user.type == 'EMPTY' and user.data == image:
+                    users.setdefault('OUTLINER_OB_EMPTY', []).append(
+                            'Used in Empty "{0}"'.format(user.name))
+                for mo in user.modifiers:
+                    if getattr(mo, "image", None) == image:
+                        users.setdefault('MODIFIER', []).append(
+                                '"{0}" modifier in {1}'.format(mo.name, user.name))
+
+            elif isinstance(user, bpy.types.Camera):
+                for ob in self.user_map.get(user, ()):
+                    if isinstance(ob, bpy.types.Object):
+                        users.setdefault('OUTLINER_OB_CAMERA', []).append(
+                                'Used as background for Camera "{0}"'.format(ob.name))
+
+        return users
+
+    def material_users(self, material_name):
+        """Names of the objects using the material, flagged if linked or with fake user"""
+        return ["%s%s%s" % (
+                "[L] " if ob.library else "",
+                "[F] " if ob.use_fake_user else "",
+                ob.name) for ob in self.material_objects.get(material_name, [])]
+
+
+def get_missing_images():
+    """Images with a file path that doesn't exist on disk"""
+    return [im for im in bpy.data.images
+            if im.type not in ("UV_TEST", "RENDER_RESULT", "COMPOSITING") and
+            not im.packed_file and
+            not os.path.exists(bpy.path.abspath(im.filepath, library=im.library))]
+
+
+_users_index = None
+
+
+def get_users_index():
+    global _users_index
+    if _users_index is None:
+        _users_index = AMTH_users_index()
+    return _users_index
+
+
+@persistent
+def clear_users_index(*args):
+    global _users_index
+    _users_index = None
+
+
+@persistent
+def clear_users_index_on_data_update(scene, depsgraph):
+    # Changing settings of the scene, like the datablock to list, doesn't change its users
+    if any(not isinstance(update.id, bpy.types.Scene) for update in depsgraph.updates):
+        clear_users_index()
+
+
 def call_update_datablock_type(self, context):
     try:
         # Note: this is pretty weak, but updates the operator enum selection
@@ -328,6 +491,7 @@ class AMTH_SCENE_OT_list_missing_node_links(Operator):
         libraries = []
 
         reset_global_storage(what="NODE_LINK")
+        index = get_users_index()
 
         for ma in bpy.data.materials:
             if not ma.node_tree:
@@ -338,14 +502,7 @@ class AMTH_SCENE_OT_list_missing_node_links(Operator):
                     if not no.node_tree:
                         AMTH_store_data.count_groups += 1
 
-                        users_ngroup = []
-
-                        for ob in bpy.data.objects:
-                            if ob.material_slots and ma.name in ob.material_slots:
-                                users_ngroup.append("%s%s%s" % (
-                                    "[L] " if ob.library else "",
-                                    "[F] " if ob.use_fake_user else "",
-                                    ob.name))
+                        users_ngroup = index.material_users(ma.name)
 
                         missing_groups.append(
                             "MA: %s%s%s [%s]%s%s%s\n" %
@@ -376,14 +533,7 @@ class AMTH_SCENE_OT_list_missing_node_links(Operator):
 
                     if outputs_empty or not no.image or not image_path_exists:
 
-                        users_images = []
-
-                        for ob in bpy.data.objects:
-                            if ob.material_slots and ma.name in ob.material_slots:
-                                users_images.append("%s%s%s" % (
-                                    "[L] " if ob.library else "",
-                                    "[F] " if ob.use_fake_user else "",
-                                    ob.name))
+                        users_images = index.material_users(ma.name)
 
                         if outputs_empty:
                             AMTH_store_data.count_image_node_unlinked += 1
@@ -582,7 +732,6 @@ class AMTH_SCENE_OT_list_users_for_x(Operator):
     name: StringProperty()
 
     def execute(self, context):
-        d = bpy.data
         x = self.name if self.name else context.scene.amth_list_users_for_x_name
 
         if USER_X_NAME_EMPTY in x:
@@ -594,187 +743,23 @@ class AMTH_SCENE_OT_list_users_for_x(Operator):
 
         reset_global_storage("XTYPE")
 
+        index = get_users_index()
+
         # IMAGE TYPE
         if dtype == 'IMAGE_DATA':
-            # Check Materials
-            for ma in d.materials:
-                # Cycles
-                if utils.cycles_exists():
-                    if ma and ma.node_tree and ma.node_tree.nodes:
-                        materials = []
-
-                        for nd in ma.node_tree.nodes:
-                            if nd and nd.type in {'TEX_IMAGE', 'TEX_ENVIRONMENT'}:
-                                materials.append(nd)
-
-                            if nd and nd.type == 'GROUP':
-                                if nd.node_tree and nd.node_tree.nodes:
-                                    for ng in nd.node_tree.nodes:
-                                        if ng.type in {'TEX_IMAGE', 'TEX_ENVIRONMENT'}:
-                                            materials.append(ng)
-
-                            for no in materials:
-                                if no.image and no.image.name == x:
-                                    objects = []
-
-                                    for ob in d.objects:
-                                        if ma.name in ob.material_slots:
-                                            objects.append(ob.name)
-                                    links = False
-
-                                    for o in no.outputs:
-                                        if o.links:
-                                            links = True
-
-                                    name = '"{0}" {1}{2}'.format(
-                                            ma.name,
-                                            'in object: {0}'.format(objects) if objects else ' (unassigned)',
-                                            '' if links else ' (unconnected)')
-
-                                    if name not in AMTH_store_data.users['MATERIAL']:
-                                        AMTH_store_data.users['MATERIAL'].append(name)
-
-            # Check Lights
-            for la in d.lights:
-                # Cycles
-                if utils.cycles_exists():
-                    if la and la.node_tree and la.node_tree.nodes:
-                        for no in la.node_tree.nodes:
-                            if no and \
-                                   no.type in {'TEX_IMAGE', 'TEX_ENVIRONMENT'} and \
-                                   no.image and no.image.name == x:
-                                if la.name not in AMTH_store_data.users['LIGHT']:
-                                    AMTH_store_data.users['LIGHT'].append(la.name)
-
-            # Check World
-            for wo in d.worlds:
-                # Cycles
-                if utils.cycles_exists():
-                    if wo and wo.node_tree and wo.node_tree.nodes:
-                        for no in wo.node_tree.nodes:
-                            if no and \
-                                   no.type in {'TEX_IMAGE', 'TEX_ENVIRONMENT'} and \
-                                   no.image and no.image.name == x:
-                                if wo.name not in AMTH_store_data.users['WORLD']:
-                                    AMTH_store_data.users['WORLD'].append(wo.name)
-
-            # Check Textures
-            for te in d.textures:
-                if te and te.type == 'IMAGE' and te.image:
-                    name = te.image.name
-
-                    if name == x and \
-                            name not in AMTH_store_data.users['TEXTURE']:
-                        AMTH_store_data.users['TEXTURE'].append(te.name)
-
-            # Check Modifiers in Objects
-            for ob in d.objects:
-                for mo in ob.modifiers:
-                    if mo.type in {'UV_PROJECT'}:
-                        image = mo.image
-
-                        if mo and image and image.name == x:
-                            name = '"{0}" modifier in {1}'.format(mo.name, ob.name)
-                            if name not in AMTH_store_data.users['MODIFIER']:
-                                AMTH_store_data.users['MODIFIER'].append(name)
-
-            # Check Background Images in Cameras
-            for ob in d.objects:
-                if ob and ob.type == 'CAMERA' and ob.data.background_images:
-                    for bg in ob.data.background_images:
-                        image = bg.image
-
-                        if bg and image and image.name == x:
-                            name = 'Used as background for Camera "{0}"'\
-                                    .format(ob.name)
-                            if name not in AMTH_store_data.users['OUTLINER_OB_CAMERA']:
-                                AMTH_store_data.users['OUTLINER_OB_CAMERA'].append(name)
-
-            # Check Empties type Image
-            for ob in d.objects:
-                if ob and ob.type == 'EMPTY' and ob.image_user:
-                    if ob.image_user.id_data.data:
-                        image = ob.image_user.id_data.data
-
-                        if image and image.name == x:
-                            name = 'Used in Empty "{0}"'\
-                                    .format(ob.name)
-                            if name not in AMTH_store_data.users['OUTLINER_OB_EMPTY']:
-                                AMTH_store_data.users['OUTLINER_OB_EMPTY'].append(name)
-
-            # Check the Compositor
-            for sce in d.scenes:
-                if sce.node_tree and sce.node_tree.nodes:
-                    nodes = []
-                    for nd in sce.node_tree.nodes:
-                        if nd.type == 'IMAGE':
-                            nodes.append(nd)
-                        elif nd.type == 'GROUP':
-                            if nd.node_tree and nd.node_tree.nodes:
-                                for ng in nd.node_tree.nodes:
-                                    if ng.type == 'IMAGE':
-                                        nodes.append(ng)
-
-                        for no in nodes:
-                            if no.image and no.image.name == x:
-                                links = False
-
-                                for o in no.outputs:
-                                    if o.links:
-                                        links = True
-
-                                name = 'Node {0} in Compositor (Scene "{1}"){2}'.format(
-                                        no.name,
-                                        sce.name,
-                                        '' if links else ' (unconnected)')
-
-                                if name not in AMTH_store_data.users['NODETREE']:
-                                    AMTH_store_data.users['NODETREE'].append(name)
+            for what, names in index.image_users(x).items():
+                AMTH_store_data.users[what].extend(names)
         # MATERIAL TYPE
-        if dtype == 'MATERIAL':
-            # Check Materials - Note: build an object_check list as only strings are stored
-            object_check = [d.objects[names] for names in AMTH_store_data.users['OBJECT_DATA'] if
-                            names in d.objects]
-            for ob in d.objects:
-                for ma in ob.material_slots:
-                    if ma.name == x:
-                        if ma not in object_check:
-                            AMTH_store_data.users['OBJECT_DATA'].append(ob.name)
-
-                        if ob.library:
-                            AMTH_store_data.libraries.append(ob.library.filepath)
+        elif dtype == 'MATERIAL':
+            for ob in index.material_objects.get(x, []):
+                AMTH_store_data.users['OBJECT_DATA'].append(ob.name)
+
+                if ob.library:
+                    AMTH_store_data.libraries.append(ob.library.filepath)
         # VERTEX COLOR TYPE
         elif dtype == 'GROUP_VCOL':
-            # Check VCOL in Meshes
-            for ob in bpy.data.objects:
-                if ob.type == 'MESH':
-                    for v in ob.data.vertex_colors:
-                        if v.name == x:
-                            name = '{0}'.format(ob.name)
-
-                            if name not in AMTH_store_data.users['MESH_DATA']:
-                                AMTH_store_data.users['MESH_DATA'].append(name)
-            # Check VCOL in Materials
-            for ma in d.materials:
-                # Cycles
-                if utils.cycles_exists():
-                    if ma and ma.node_tree and ma.node_tree.nodes:
-                        for no in ma.node_tree.nodes:
-                            if no and no.type in {'ATTRIBUTE'}:
-                                if no.attribute_name == x:
-                                    objects = []
-
-                                    for ob in d.objects:
-                                        if ma.name in ob.material_slots:
-                                            objects.append(ob.name)
-
-                                    if objects:
-                                        name = '{0} in object: {1}'.format(ma.name, objects)
-                                    else:
-                                        name = '{0} (unassigned)'.format(ma.name)
-
-                                    if name not in AMTH_store_data.users['MATERIAL']:
-                                        AMTH_store_data.users['MATERIAL'].append(name)
+            AMTH_store_data.users['MESH_DATA'].extend(index.vcol_objects.get(x, []))
+            AMTH_store_data.users['MATERIAL'].extend(index.attribute_materials.get(x, []))
 
         AMTH_store_data.libraries = sorted(list(set(AMTH_store_data.libraries)))
 
@@ -1268,17 +1253,14 @@ def fill_missing_images_props(context, refresh=False):
             if index != -1:
                 image_state.remove(index)
 
-    for im in bpy.data.images:
-        if im.type not in ("UV_TEST", "RENDER_RESULT", "COMPOSITING"):
-            if not im.packed_file and \
-                    not os.path.exists(bpy.path.abspath(im.filepath, library=im.library)):
-                text_l = "{}{} [{}]{}".format("[L] " if im.library else "", im.name,
-                    im.users, " [F]" if im.use_fake_user else "")
-                prop = image_state.add()
-                prop.name = im.name
-                prop.text_lib = text_l
-                prop.has_filepath = im.filepath if im.filepath else "No Filepath"
-                prop.is_library = im.library.filepath if im.library else ""
+    for im in get_missing_images():
+        text_l = "{}{} [{}]{}".format("[L] " if im.library else "", im.name,
+            im.users, " [F]" if im.use_fake_user else "")
+        prop = image_state.add()
+        prop.name = im.name
+        prop.text_lib = text_l
+        prop.has_filepath = im.filepath if im.filepath else "No Filepath"
+        prop.is_library = im.library.filepath if im.library else ""
 
 
 def fill_ligters_corner_props(context, refresh=False):
@@ -1370,10 +1352,21 @@ def register():
             type=AMTH_MissingImagesStateProp
             )
 
+    bpy.app.handlers.depsgraph_update_post.append(clear_users_index_on_data_update)
+    bpy.app.handlers.load_post.append(clear_users_index)
+    bpy.app.handlers.undo_post.append(clear_users_index)
+    bpy.app.handlers.redo_post.append(clear_users_index)
+
 
 def unregister():
     clear()
 
+    bpy.app.handlers.depsgraph_update_post.remove(clear_users_index_on_data_update)
+    bpy.app.handlers.load_post.remove(clear_users_index)
+    bpy.app.handlers.undo_post.remove(clear_users_index)
+    bpy.app.handlers.redo_post.remove(clear_users_index)
+    clear_users_index()
+
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
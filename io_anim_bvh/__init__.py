@@ -15,6 +15,8 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    if "bvh_utils" in locals():
+        importlib.reload(bvh_utils)
     if "import_bvh" in locals():
         importlib.reload(import_bvh)
     if "export_bvh" in locals():
@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# A copy of this file is io_anim_nuke_chan/chan_utils.py, keep both in sync.
+
+import numpy as np
+
+# Same as compatible_eul() in Blender, the angles are shifted by 2 pi in float precision.
+_COMPAT_PI_X2 = float(np.float32(2.0 * np.pi))
+
+
+def euler_to_matrices(angles, order):
+    """
+    Rotation matrices for rows of x, y, z euler angles, applied in `order`,
+    the same as Euler(angles, order).to_matrix() for each row.
+    """
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    result = None
+    for axis in order:
+        i = 'XYZ'.index(axis)
+        j = (i + 1) % 3
+        k = (i + 2) % 3
+        matrices = np.zeros((len(angles), 3, 3))
+        matrices[:, i, i] = 1.0
+        matrices[:, j, j] = matrices[:, k, k] = cos[:, i]
+        matrices[:, j, k] = -sin[:, i]
+        matrices[:, k, j] = sin[:, i]
+        result = matrices if result is None else matrices @ result
+    return result
+
+
+def quaternions_to_matrices(quats):
+    """
+    Rotation matrices for rows of (w, x, y, z), normalized first like the pose evaluation does,
+    a zero quaternion becomes (0, 1, 0, 0) as in normalize_qt().
+    """
+    length = np.linalg.norm(quats, axis=1)
+    w, x, y, z = (quats / np.where(length == 0.0, 1.0, length)[:, np.newaxis]).T
+    x = np.where(length == 0.0, 1.0, x)
+    return np.stack((
+        np.stack((1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)), axis=1),
+        np.stack((2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)), axis=1),
+        np.stack((2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)), axis=1),
+    ), axis=1)
+
+
+def axis_angles_to_matrices(axis_angles):
+    """Rotation matrices for rows of (angle, x, y, z), the identity for a zero axis."""
+    angle = axis_angles[:, 0]
+    axis = axis_angles[:, 1:]
+    length = np.linalg.norm(axis, axis=1)
+    axis = axis / np.where(length == 0.0, 1.0, length)[:, np.newaxis]
+    angle = np.where(length == 0.0, 0.0, angle)
+    x, y, z = axis.T
+    cos = np.cos(angle)
+    sin = np.sin(angle)
+    t = 1.0 - cos
+    return np.stack((
+        np.stack((t * x * x + cos, t * x * y - sin * z, t * x * z + sin * y), axis=1),
+        np.stack((t * x * y + sin * z, t * y * y + cos, t * y * z - sin * x), axis=1),
+        np.stack((t * x * z - sin * y, t * y * z + sin * x, t * z * z + cos), axis=1),
+    ), axis=1)
+
+
+def matrices_to_quaternions(matrices):
+    """Normalized (w, x, y, z) rows for rotation matrices, with w >= 0 like Matrix.to_quaternion()."""
+    m = matrices
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    # Use the largest component to divide by, for all four of them.
+    squares = np.stack((
+        1.0 + trace,
+        1.0 + 2.0 * m[:, 0, 0] - trace,
+        1.0 + 2.0 * m[:, 1, 1] - trace,
+        1.0 + 2.0 * m[:, 2, 2] - trace,
+    ), axis=1)
+    largest = np.argmax(squares, axis=1)
+    s = 2.0 * np.sqrt(np.maximum(squares[np.arange(len(m)), largest], 0.0))
+    diff = (m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1])
+    sums = (m[:, 2, 1] + m[:, 1, 2], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 0] + m[:, 0, 1])
+    candidates = np.array((
+        (0.25 * s, diff[0] / s, diff[1] / s, diff[2] / s),
+        (diff[0] / s, 0.25 * s, sums[2] / s, sums[1] / s),
+        (diff[1] / s, sums[2] / s, 0.25 * s, sums[0] / s),
+        (diff[2] / s, sums[1] / s, sums[0] / s, 0.25 * s),
+    ))
+    quats = candidates[largest, :, np.arange(len(m))]
+    quats[quats[:, 0] < 0.0] *= -1.0
+    quats /= np.linalg.norm(quats, axis=1)[:, np.newaxis]
+    return quats
+
+
+def matrices_to_eulers(matrices, order):
+    """
+    Both euler solutions for rotation matrices, as Blender computes them for
+    Matrix.to_euler(order, compat) to pick the one closest to `compat`.
+    """
+    i, j, k = ('XYZ'.index(axis) for axis in order)
+    m = matrices
+    cy = np.hypot(m[:, i, i], m[:, j, i])
+    eul1 = np.empty((len(m), 3))
+    eul2 = np.empty((len(m), 3))
+    eul1[:, i] = np.arctan2(m[:, k, j], m[:, k, k])
+    eul1[:, j] = np.arctan2(-m[:, k, i], cy)
+    eul1[:, k] = np.arctan2(m[:, j, i], m[:, i, i])
+    eul2[:, i] = np.arctan2(-m[:, k, j], -m[:, k, k])
+    eul2[:, j] = np.arctan2(-m[:, k, i], -cy)
+    eul2[:, k] = np.arctan2(-m[:, j, i], -m[:, i, i])
+
+    # Gimbal lock, a single solution.
+    locked = cy <= 16.0 * np.finfo(np.float32).eps
+    eul1[locked, i] = np.arctan2(-m[locked, j, k], m[locked, j, j])
+    eul1[locked, k] = 0.0
+    eul2[locked] = eul1[locked]
+
+    # Odd permutations of XYZ rotate the other way around.
+    if order in {'XZY', 'YXZ', 'ZYX'}:
+        eul1 = -eul1
+        eul2 = -eul2
+    return eul1, eul2
+
+
+def compatible_eulers(eul1, eul2, prev):
+    """
+    The solution closest to the `prev` rows, after shifting both by turns of 2 pi
+    towards them, like compatible_eul() in Blender.
+    Returns the chosen rows and whether it is the second solution.
+    """
+    result = []
+    for eul in (eul1, eul2):
+        deul = eul - prev
+        eul = eul - np.where(
+            np.abs(deul) > np.pi,
+            np.sign(deul) * np.floor(np.abs(deul) / _COMPAT_PI_X2 + 0.5) * _COMPAT_PI_X2,
+            0.0,
+        )
+        deul = eul - prev
+
+        # A single axis more than half a turn off.
+        big = np.abs(deul) > np.pi
+        small = np.abs(deul) < np.pi / 2
+        flip = big & np.roll(small, 1, axis=1) & np.roll(small, 2, axis=1)
+        eul = eul - np.where(flip, np.sign(deul) * _COMPAT_PI_X2, 0.0)
+        result.append(eul)
+
+    eul1, eul2 = result
+    second = np.abs(eul1 - prev).sum(axis=1) > np.abs(eul2 - prev).sum(axis=1)
+    return np.where(second[:, np.newaxis], eul2, eul1), second
+
+
+def compatible_euler_sequence(eul1, eul2, prev):
+    """
+    Compatible eulers for all frames at once, assuming shifting the previous
+    frame by whole turns shifts the next one the same way, which holds unless
+    an axis rotates more than half a turn between two frames.
+    Only the solution picked and the turns added then depend on the frame before.
+    """
+    first, first_second = compatible_eulers(eul1[:1], eul2[:1], prev[np.newaxis])
+    # Each frame after the first one, for the first and for the second solution picked before.
+    compat_first, second_after_first = compatible_eulers(eul1[1:], eul2[1:], eul1[:-1])
+    compat_second, second_after_second = compatible_eulers(eul1[1:], eul2[1:], eul2[:-1])
+
+    # Which solution is picked in each frame, composing the choices of all
+    # frames before in log steps.
+    after_first = second_after_first.copy()
+    after_second = second_after_second.copy()
+    step = 1
+    while step < len(after_first):
+        before_first = after_first[:-step]
+        before_second = after_second[:-step]
+        after_first[step:], after_second[step:] = (
+            np.where(before_first, after_second[step:], after_first[step:]),
+            np.where(before_second, after_second[step:], after_first[step:]),
+        )
+        step *= 2
+
+    second = np.empty(len(eul1), dtype=bool)
+    second[0] = first_second[0]
+    second[1:] = after_second if second[0] else after_first
+
+    picked = np.where(second[:, np.newaxis], eul2, eul1)
+    turns = np.empty((len(eul1), 3))
+    turns[0] = first[0] - picked[0]
+    turns[1:] = np.where(second[:-1, np.newaxis], compat_second, compat_first) - picked[1:]
+    turns = np.cumsum(np.rint(turns / _COMPAT_PI_X2), axis=0)
+    return picked + turns * _COMPAT_PI_X2
+
+
+def matrices_to_compatible_eulers(matrices, order):
+    """
+    Same as converting the matrices one by one, with Matrix.to_euler(order, prev_euler)
+    and the euler of the frame before as prev_euler.
+    """
+    eul1, eul2 = matrices_to_eulers(matrices, order)
+    result = np.empty((len(matrices), 3))
+    prev = np.zeros(3)
+    start = 0
+    while start < len(matrices):
+        result[start:] = compatible_euler_sequence(eul1[start:], eul2[start:], prev)
+
+        # Check every frame against the one before, only large jumps can break it.
+        prevs = np.vstack((prev, result[start:-1]))
+        check, _ = compatible_eulers(eul1[start:], eul2[start:], prevs)
+        wrong = np.flatnonzero(np.abs(check - result[start:]).max(axis=1) > 1e-6)
+        if len(wrong) == 0:
+            break
+
+        # Continue one frame at a time for a while from the first wrong frame on,
+        # jumps tend to come in groups.
+        start += wrong[0]
+        stop = min(start + 16, len(matrices))
+        # Only needed here, the rest of the module works without Blender.
+        from mathutils import Euler, Matrix
+        for frame_i in range(start, stop):
+            prev = result[frame_i] = Matrix(matrices[frame_i]).to_euler(order, Euler(prev))
+        start = stop
+        prev = result[stop - 1]
+    return result
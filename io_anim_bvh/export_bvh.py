@@ -4,6 +4,119 @@
 # fixes from Andrea Rugliancich
 
 import bpy
+import numpy as np
+
+from .bvh_utils import (
+    euler_to_matrices,
+    quaternions_to_matrices,
+    axis_angles_to_matrices,
+    matrices_to_compatible_eulers,
+)
+
+
+def _pose_from_action(scene, obj):
+    """
+    Whether the pose of every frame only depends on the action of the armature,
+    so it can be evaluated from its fcurves without stepping through the frames.
+    """
+    if scene.render.frame_map_old != scene.render.frame_map_new:
+        return False
+    if obj.data.pose_position != 'POSE':
+        return False
+
+    for anim_data in (obj.animation_data, obj.data.animation_data):
+        if anim_data and (anim_data.drivers or anim_data.nla_tracks):
+            return False
+    anim_data = obj.animation_data
+    if anim_data and (
+            anim_data.use_tweak_mode or
+            anim_data.action_influence != 1.0 or
+            anim_data.action_blend_type != 'REPLACE'
+    ):
+        return False
+
+    for pose_bone in obj.pose.bones:
+        bone = pose_bone.bone
+        if (
+                pose_bone.constraints or
+                not bone.use_inherit_rotation or
+                not bone.use_local_location or
+                bone.inherit_scale != 'FULL'
+        ):
+            return False
+    return True
+
+
+def _pose_matrices_from_action(obj, bone_names, frames):
+    """
+    Pose matrices (armature space) of the bones for all frames, composed from the
+    evaluated fcurves of the action, parents before their children in `bone_names`.
+    """
+    action = obj.animation_data.action if obj.animation_data else None
+    fcurves = {}
+    if action:
+        for fcurve in action.fcurves:
+            if fcurve.mute or (fcurve.group and fcurve.group.mute):
+                continue
+            if not fcurve.keyframe_points and not fcurve.modifiers:
+                continue
+            fcurves[fcurve.data_path, fcurve.array_index] = fcurve
+
+    frames = [float(frame) for frame in frames]
+
+    def channel_values(pose_bone, prop, size):
+        # Channels without an fcurve keep their current value.
+        data_path = pose_bone.path_from_id(prop)
+        value = getattr(pose_bone, prop)
+        values = np.empty((len(frames), size))
+        for i in range(size):
+            fcurve = fcurves.get((data_path, i))
+            if fcurve is None:
+                values[:, i] = value[i]
+            else:
+                values[:, i] = np.fromiter(map(fcurve.evaluate, frames), dtype=np.float64, count=len(frames))
+        return values
+
+    pose_matrices = {}
+    for bone_name in bone_names:
+        pose_bone = obj.pose.bones[bone_name]
+        bone = pose_bone.bone
+
+        rotation_mode = pose_bone.rotation_mode
+        if rotation_mode == 'QUATERNION':
+            rotation = quaternions_to_matrices(channel_values(pose_bone, "rotation_quaternion", 4))
+        elif rotation_mode == 'AXIS_ANGLE':
+            rotation = axis_angles_to_matrices(channel_values(pose_bone, "rotation_axis_angle", 4))
+        else:
+            rotation = euler_to_matrices(channel_values(pose_bone, "rotation_euler", 3), rotation_mode)
+
+        # Same as pose_bone.matrix_basis.
+        basis = np.zeros((len(frames), 4, 4))
+        basis[:, :3, :3] = rotation * channel_values(pose_bone, "scale", 3)[:, np.newaxis, :]
+        basis[:, :3, 3] = channel_values(pose_bone, "location", 3)
+        basis[:, 3, 3] = 1.0
+
+        rest_arm_mat = np.array(bone.matrix_local)
+        if bone.parent:
+            rest_local_mat = np.linalg.inv(np.array(bone.parent.matrix_local)) @ rest_arm_mat
+            pose_matrices[bone_name] = pose_matrices[bone.parent.name] @ rest_local_mat @ basis
+        else:
+            pose_matrices[bone_name] = rest_arm_mat @ basis
+    return pose_matrices
+
+
+def _pose_matrices_from_scene(scene, obj, bone_names, frames):
+    """Pose matrices (armature space) of the bones for all frames, evaluated by setting each frame."""
+    pose_bones = obj.pose.bones
+    bone_indices = [pose_bones.find(bone_name) for bone_name in bone_names]
+    matrices = np.empty((len(frames), len(pose_bones) * 16), dtype=np.float32)
+    for frame_i, frame in enumerate(frames):
+        scene.frame_set(frame)
+        pose_bones.foreach_get("matrix", matrices[frame_i])
+
+    # Flat matrices are stored column by column.
+    matrices = matrices.reshape(len(frames), len(pose_bones), 4, 4).transpose(1, 0, 3, 2).astype(np.float64)
+    return {bone_name: matrices[bone_i] for bone_name, bone_i in zip(bone_names, bone_indices)}
 
 
 def write_armature(
@@ -21,9 +134,6 @@ def write_armature(
             rot_order_str = "XYZ"
         return rot_order_str
 
-    from mathutils import Matrix, Euler
-    from math import degrees
-
     file = open(filepath, "w", encoding="utf8", newline="\n")
 
     obj = context.object
@@ -139,20 +249,10 @@ def write_armature(
             "rest_bone",
             # Blender pose bone.
             "pose_bone",
-            # Blender pose matrix.
-            "pose_mat",
             # Blender rest matrix (armature space).
             "rest_arm_mat",
-            # Blender rest matrix (local space).
-            "rest_local_mat",
-            # Pose_mat inverted.
-            "pose_imat",
             # Rest_arm_mat inverted.
             "rest_arm_imat",
-            # Rest_local_mat inverted.
-            "rest_local_imat",
-            # Last used euler to preserve euler compatibility in between keyframes.
-            "prev_euler",
             # Is the bone disconnected to the parent bone?
             "skip_position",
             "rot_order",
@@ -183,25 +283,12 @@ def write_armature(
 
             self.rot_order = DecoratedBone._eul_order_lookup[self.rot_order_str]
 
-            self.pose_mat = self.pose_bone.matrix
-
-            # mat = self.rest_bone.matrix  # UNUSED
-            self.rest_arm_mat = self.rest_bone.matrix_local
-            self.rest_local_mat = self.rest_bone.matrix
-
-            # inverted mats
-            self.pose_imat = self.pose_mat.inverted()
-            self.rest_arm_imat = self.rest_arm_mat.inverted()
-            self.rest_local_imat = self.rest_local_mat.inverted()
+            self.rest_arm_mat = np.array(self.rest_bone.matrix_local)
+            self.rest_arm_imat = np.linalg.inv(self.rest_arm_mat)
 
             self.parent = None
-            self.prev_euler = Euler((0.0, 0.0, 0.0), self.rot_order_str_reverse)
             self.skip_position = ((self.rest_bone.use_connect or root_transform_only) and self.rest_bone.parent)
 
-        def update_posedata(self):
-            self.pose_mat = self.pose_bone.matrix
-            self.pose_imat = self.pose_mat.inverted()
-
         def __repr__(self):
             if self.parent:
                 return "[\"%s\" child on \"%s\"]\n" % (self.name, self.parent.name)
@@ -221,41 +308,50 @@ def write_armature(
 
     scene = context.scene
     frame_current = scene.frame_current
+    frames = range(frame_start, frame_end + 1)
 
     file.write("MOTION\n")
     file.write("Frames: %d\n" % (frame_end - frame_start + 1))
     file.write("Frame Time: %.6f\n" % (1.0 / (scene.render.fps / scene.render.fps_base)))
 
-    for frame in range(frame_start, frame_end + 1):
-        scene.frame_set(frame)
-
-        for dbone in bones_decorated:
-            dbone.update_posedata()
-
-        for dbone in bones_decorated:
-            trans = Matrix.Translation(dbone.rest_bone.head_local)
-            itrans = Matrix.Translation(-dbone.rest_bone.head_local)
+    # Without constraints or drivers the pose only depends on the action,
+    # skip evaluating the whole scene for every frame then.
+    if _pose_from_action(scene, obj):
+        pose_mats = _pose_matrices_from_action(obj, serialized_names, frames)
+    else:
+        pose_mats = _pose_matrices_from_scene(scene, obj, serialized_names, frames)
+    pose_imats = {name: np.linalg.inv(pose_mat) for name, pose_mat in pose_mats.items()}
 
-            if dbone.parent:
-                mat_final = dbone.parent.rest_arm_mat @ dbone.parent.pose_imat @ dbone.pose_mat @ dbone.rest_arm_imat
-                mat_final = itrans @ mat_final @ trans
-                loc = mat_final.to_translation() + (dbone.rest_bone.head_local - dbone.parent.rest_bone.head_local)
-            else:
-                mat_final = dbone.pose_mat @ dbone.rest_arm_imat
-                mat_final = itrans @ mat_final @ trans
-                loc = mat_final.to_translation() + dbone.rest_bone.head
+    # The channels of all frames, one column each.
+    motion = []
+    for dbone in bones_decorated:
+        head = np.array(dbone.rest_bone.head_local)
+
+        if dbone.parent:
+            mat_final = (
+                dbone.parent.rest_arm_mat @ pose_imats[dbone.parent.name] @
+                pose_mats[dbone.name] @ dbone.rest_arm_imat
+            )
+            offset = head - np.array(dbone.parent.rest_bone.head_local)
+        else:
+            mat_final = pose_mats[dbone.name] @ dbone.rest_arm_imat
+            offset = np.array(dbone.rest_bone.head)
 
-            # keep eulers compatible, no jumping on interpolation.
-            rot = mat_final.to_euler(dbone.rot_order_str_reverse, dbone.prev_euler)
+        # Translation of mat_final around the bone head.
+        rot_mat = mat_final[:, :3, :3]
+        loc = rot_mat @ head + mat_final[:, :3, 3] - head + offset
 
-            if not dbone.skip_position:
-                file.write("%.6f %.6f %.6f " % (loc * global_scale)[:])
+        # keep eulers compatible, no jumping on interpolation.
+        rot_mat = rot_mat / np.linalg.norm(rot_mat, axis=1)[:, np.newaxis, :]
+        rot = matrices_to_compatible_eulers(rot_mat, dbone.rot_order_str_reverse)
 
-            file.write("%.6f %.6f %.6f " % (degrees(rot[dbone.rot_order[0]]), degrees(rot[dbone.rot_order[1]]), degrees(rot[dbone.rot_order[2]])))
+        if not dbone.skip_position:
+            motion.append(loc * global_scale)
 
-            dbone.prev_euler = rot
+        motion.append(np.degrees(rot[:, dbone.rot_order]))
 
-        file.write("\n")
+    motion = np.hstack(motion) if motion else np.empty((len(frames), 0))
+    np.savetxt(file, motion, fmt="%.6f " * motion.shape[1])
 
     file.close()
 
@@ -2,10 +2,17 @@
 
 # Script copyright (C) Campbell Barton
 
-from math import radians, ceil
+from math import ceil
 
 import bpy
-from mathutils import Vector, Euler, Matrix
+import numpy as np
+from mathutils import Vector, Matrix
+
+from .bvh_utils import (
+    euler_to_matrices,
+    matrices_to_quaternions,
+    matrices_to_compatible_eulers,
+)
 
 
 class BVH_Node:
@@ -33,7 +40,7 @@ class BVH_Node:
         'rot_order',
         # Same as above but a string 'XYZ' format..
         'rot_order_str',
-        # A list one tuple's one for each frame: (locx, locy, locz, rotx, roty, rotz),
+        # An array with one row for each frame: (locx, locy, locz, rotx, roty, rotz),
         # euler rotation ALWAYS stored xyz order, even when native used.
         'anim_data',
         # Convenience function, bool, same as: (channels[0] != -1 or channels[1] != -1 or channels[2] != -1).
@@ -74,9 +81,10 @@ class BVH_Node:
 
         self.children = []
 
-        # List of 6 length tuples: (lx, ly, lz, rx, ry, rz)
+        # Array of 6 length rows: (lx, ly, lz, rx, ry, rz), set when reading the motion,
         # even if the channels aren't used they will just be zero.
-        self.anim_data = [(0, 0, 0, 0, 0, 0)]
+        # The first row is the rest pose.
+        self.anim_data = np.zeros((1, 6))
 
     def __repr__(self):
         return (
@@ -256,31 +264,26 @@ def read_bvh(context, file_path, rotate_mode='XYZ', global_scale=1.0):
     # second life expects it, which isn't to spec.
     bvh_nodes_list = sorted_nodes(bvh_nodes)
 
-    while lineIdx < len(file_lines):
-        line = file_lines[lineIdx]
-        for bvh_node in bvh_nodes_list:
-            # for bvh_node in bvh_nodes_serial:
-            lx = ly = lz = rx = ry = rz = 0.0
-            channels = bvh_node.channels
-            anim_data = bvh_node.anim_data
-            if channels[0] != -1:
-                lx = global_scale * float(line[channels[0]])
-
-            if channels[1] != -1:
-                ly = global_scale * float(line[channels[1]])
-
-            if channels[2] != -1:
-                lz = global_scale * float(line[channels[2]])
+    # Read all frames at once, one row per frame and one column per channel.
+    num_channels = channelIndex + 1
+    motion_lines = file_lines[lineIdx:]
+    motion = np.array(
+        [line[:num_channels] for line in motion_lines],
+        dtype=np.float64,
+    ).reshape(len(motion_lines), num_channels)
 
-            if channels[3] != -1 or channels[4] != -1 or channels[5] != -1:
+    for bvh_node in bvh_nodes_list:
+        channels = bvh_node.channels
+        anim_data = np.zeros((len(motion) + 1, 6))
+        for axis_i in range(3):
+            if channels[axis_i] != -1:
+                anim_data[1:, axis_i] = global_scale * motion[:, channels[axis_i]]
 
-                rx = radians(float(line[channels[3]]))
-                ry = radians(float(line[channels[4]]))
-                rz = radians(float(line[channels[5]]))
+        if bvh_node.has_rot:
+            anim_data[1:, 3:] = np.radians(motion[:, channels[3:]])
 
-            # Done importing motion data #
-            anim_data.append((lx, ly, lz, rx, ry, rz))
-        lineIdx += 1
+        # Done importing motion data #
+        bvh_node.anim_data = anim_data
 
     # Assign children
     for bvh_node in bvh_nodes_list:
@@ -386,6 +389,22 @@ def bvh_node_dict2objects(context, bvh_name, bvh_nodes, rotate_mode='NATIVE', fr
     return objects
 
 
+def _add_fcurves(action, data_path, group, time, values):
+    """One linear fcurve for each column of `values`, keyed at `time`."""
+    linear = bpy.types.Keyframe.bl_rna.properties['interpolation'].enum_items['LINEAR'].value
+    interpolation = np.full(len(time), linear, dtype=np.int32)
+    co = np.empty((len(time), 2), dtype=np.float32)
+    co[:, 0] = time
+    for axis_i in range(values.shape[1]):
+        curve = action.fcurves.new(data_path=data_path, index=axis_i, action_group=group)
+        keyframe_points = curve.keyframe_points
+        keyframe_points.add(len(time))
+
+        co[:, 1] = values[:, axis_i]
+        keyframe_points.foreach_set('co', co.ravel())
+        keyframe_points.foreach_set('interpolation', interpolation)
+
+
 def bvh_node_dict2armature(
         context,
         bvh_name,
@@ -536,99 +555,52 @@ def bvh_node_dict2armature(
         num_frame = num_frame - skip_frame
 
     # Create a shared time axis for all animation curves.
-    time = [float(frame_start)] * num_frame
+    time = np.full(num_frame, float(frame_start))
     if use_fps_scale:
         dt = scene.render.fps * bvh_frame_time
-        for frame_i in range(1, num_frame):
-            time[frame_i] += float(frame_i) * dt
+        time[1:] += np.arange(1, num_frame) * dt
     else:
-        for frame_i in range(1, num_frame):
-            time[frame_i] += float(frame_i)
+        time[1:] += np.arange(1, num_frame)
 
     # print("bvh_frame_time = %f, dt = %f, num_frame = %d"
     #      % (bvh_frame_time, dt, num_frame]))
 
     for i, bvh_node in enumerate(bvh_nodes_list):
         pose_bone, bone, bone_rest_matrix, bone_rest_matrix_inv = bvh_node.temp
+        rest_matrix = np.array(bone_rest_matrix.to_3x3())
+        rest_matrix_inv = np.array(bone_rest_matrix_inv.to_3x3())
+        anim_data = bvh_node.anim_data[skip_frame:skip_frame + num_frame]
 
         if bvh_node.has_loc:
             # Not sure if there is a way to query this or access it in the
             # PoseBone structure.
             data_path = 'pose.bones["%s"].location' % pose_bone.name
 
-            location = [(0.0, 0.0, 0.0)] * num_frame
-            for frame_i in range(num_frame):
-                bvh_loc = bvh_node.anim_data[frame_i + skip_frame][:3]
-
-                bone_translate_matrix = Matrix.Translation(
-                    Vector(bvh_loc) - bvh_node.rest_head_local)
-                location[frame_i] = (bone_rest_matrix_inv @
-                                     bone_translate_matrix).to_translation()
+            location = (anim_data[:, :3] - np.array(bvh_node.rest_head_local)) @ rest_matrix_inv.T
 
             # For each location x, y, z.
-            for axis_i in range(3):
-                curve = action.fcurves.new(data_path=data_path, index=axis_i, action_group=bvh_node.name)
-                keyframe_points = curve.keyframe_points
-                keyframe_points.add(num_frame)
-
-                for frame_i in range(num_frame):
-                    keyframe_points[frame_i].co = (
-                        time[frame_i],
-                        location[frame_i][axis_i],
-                    )
+            _add_fcurves(action, data_path, bvh_node.name, time, location)
 
         if bvh_node.has_rot:
-            data_path = None
-            rotate = None
+            # apply rotation order and convert to XYZ
+            # note that the rot_order_str is reversed.
+            bone_rotation_matrices = euler_to_matrices(anim_data[:, 3:], bvh_node.rot_order_str[::-1])
+            bone_rotation_matrices = rest_matrix_inv @ bone_rotation_matrices @ rest_matrix
 
             if 'QUATERNION' == rotate_mode:
-                rotate = [(1.0, 0.0, 0.0, 0.0)] * num_frame
+                rotate = matrices_to_quaternions(bone_rotation_matrices)
                 data_path = ('pose.bones["%s"].rotation_quaternion'
                              % pose_bone.name)
             else:
-                rotate = [(0.0, 0.0, 0.0)] * num_frame
+                rotate = matrices_to_compatible_eulers(bone_rotation_matrices, pose_bone.rotation_mode)
                 data_path = ('pose.bones["%s"].rotation_euler' %
                              pose_bone.name)
 
-            prev_euler = Euler((0.0, 0.0, 0.0))
-            for frame_i in range(num_frame):
-                bvh_rot = bvh_node.anim_data[frame_i + skip_frame][3:]
-
-                # apply rotation order and convert to XYZ
-                # note that the rot_order_str is reversed.
-                euler = Euler(bvh_rot, bvh_node.rot_order_str[::-1])
-                bone_rotation_matrix = euler.to_matrix().to_4x4()
-                bone_rotation_matrix = (
-                    bone_rest_matrix_inv @
-                    bone_rotation_matrix @
-                    bone_rest_matrix
-                )
-
-                if len(rotate[frame_i]) == 4:
-                    rotate[frame_i] = bone_rotation_matrix.to_quaternion()
-                else:
-                    rotate[frame_i] = bone_rotation_matrix.to_euler(
-                        pose_bone.rotation_mode, prev_euler)
-                    prev_euler = rotate[frame_i]
-
             # For each euler angle x, y, z (or quaternion w, x, y, z).
-            for axis_i in range(len(rotate[0])):
-                curve = action.fcurves.new(data_path=data_path, index=axis_i, action_group=bvh_node.name)
-                keyframe_points = curve.keyframe_points
-                keyframe_points.add(num_frame)
-
-                for frame_i in range(num_frame):
-                    keyframe_points[frame_i].co = (
-                        time[frame_i],
-                        rotate[frame_i][axis_i],
-                    )
-
-    for cu in action.fcurves:
-        if IMPORT_LOOP:
-            pass  # 2.5 doenst have cyclic now?
-
-        for bez in cu.keyframe_points:
-            bez.interpolation = 'LINEAR'
+            _add_fcurves(action, data_path, bvh_node.name, time, rotate)
+
+    if IMPORT_LOOP:
+        pass  # 2.5 doenst have cyclic now?
 
     # finally apply matrix
     arm_ob.matrix_world = global_matrix
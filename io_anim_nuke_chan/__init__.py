@@ -17,6 +17,8 @@ bl_info = {
 # if it's there, reload everything
 if "bpy" in locals():
     import importlib
+    if "chan_utils" in locals():
+        importlib.reload(chan_utils)
     if "import_nuke_chan" in locals():
         importlib.reload(import_nuke_chan)
     if "export_nuke_chan" in locals():
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+if __name__ == '__main__':
+    from chan_utils import (
+        euler_to_matrices,
+        quaternions_to_matrices,
+        axis_angles_to_matrices,
+        matrices_to_quaternions,
+        matrices_to_eulers,
+        matrices_to_compatible_eulers,
+    )
+else:
+    from .chan_utils import (
+        euler_to_matrices,
+        quaternions_to_matrices,
+        axis_angles_to_matrices,
+        matrices_to_quaternions,
+        matrices_to_eulers,
+        matrices_to_compatible_eulers,
+    )
+import unittest
+
+import numpy as np
+
+try:
+    from mathutils import Euler, Matrix
+except ImportError:
+    Euler = Matrix = None
+
+ORDERS = ('XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX')
+
+
+def random_rotations(rng, count):
+    return euler_to_matrices(rng.uniform(-np.pi, np.pi, (count, 3)), 'XYZ')
+
+
+def smooth_chan_rotations(rng, count):
+    """ Rotations in degrees of a camera turning around a few times, the middle axis within 90 degrees. """
+    rotations = np.cumsum(rng.uniform(-20.0, 20.0, (count, 3)), axis=0)
+    rotations[:, 1] = 80.0 * np.sin(np.linspace(0.0, 10.0, count))
+    return rotations
+
+
+class ChanUtilsTest(unittest.TestCase):
+    def test_euler_order(self):
+        x, y, z = (euler_to_matrices(np.array([angles]), 'XYZ')[0] for angles in np.eye(3) * 0.5)
+        np.testing.assert_allclose(euler_to_matrices(np.array([[0.5, 0.5, 0.5]]), 'ZXY')[0], y @ x @ z)
+        self.assertAlmostEqual(x[2, 1], np.sin(0.5))
+
+    def test_quaternion_round_trip(self):
+        rng = np.random.default_rng(0)
+        matrices = random_rotations(rng, 1000)
+        quats = matrices_to_quaternions(matrices)
+        self.assertTrue((quats[:, 0] >= 0.0).all())
+        np.testing.assert_allclose(quaternions_to_matrices(quats), matrices, atol=1e-12)
+        angles = 2.0 * np.arccos(quats[:, :1])
+        axis_angles = np.hstack((angles, quats[:, 1:] / np.sin(angles / 2.0)))
+        np.testing.assert_allclose(axis_angles_to_matrices(axis_angles), matrices, atol=1e-12)
+
+    def test_zero_rotation(self):
+        np.testing.assert_array_equal(axis_angles_to_matrices(np.array([[1.0, 0.0, 0.0, 0.0]]))[0], np.eye(3))
+        np.testing.assert_array_equal(quaternions_to_matrices(np.zeros((1, 4)))[0], np.diag((1.0, -1.0, -1.0)))
+
+    def test_euler_round_trip(self):
+        rng = np.random.default_rng(1)
+        matrices = random_rotations(rng, 1000)
+        for order in ORDERS:
+            # both solutions give the same rotation
+            for eulers in matrices_to_eulers(matrices, order):
+                np.testing.assert_allclose(euler_to_matrices(eulers, order), matrices, atol=1e-12)
+
+    def test_chan_round_trip(self):
+        # rotations read from a file, converted to matrices and written again
+        rng = np.random.default_rng(2)
+        rotations = smooth_chan_rotations(rng, 2000)
+        for order in ORDERS:
+            chan_rotations = rotations[:, ['XYZ'.index(axis) for axis in order]]
+            matrices = euler_to_matrices(np.radians(chan_rotations), order)
+            result = np.degrees(matrices_to_compatible_eulers(matrices, order))
+            np.testing.assert_allclose(result, chan_rotations, atol=1e-6)
+
+    @unittest.skipIf(Matrix is None, "needs mathutils, run it with Blender's Python")
+    def test_compatible_eulers_after_jumps(self):
+        # turning more than half a turn between two frames, against Blender converting frame by frame
+        rng = np.random.default_rng(3)
+        rotations = np.radians(np.cumsum(rng.uniform(-200.0, 200.0, (300, 3)), axis=0))
+        matrices = euler_to_matrices(rotations, 'XYZ')
+        expected = np.empty((len(matrices), 3))
+        prev = Euler()
+        for i, matrix in enumerate(matrices):
+            prev = Matrix(matrix).to_euler('XYZ', prev)
+            expected[i] = prev
+        np.testing.assert_allclose(matrices_to_compatible_eulers(matrices, 'XYZ'), expected, atol=1e-5)
+
+    def test_empty(self):
+        self.assertEqual(matrices_to_compatible_eulers(np.empty((0, 3, 3)), 'XYZ').shape, (0, 3))
+        self.assertEqual(matrices_to_eulers(np.empty((0, 3, 3)), 'XYZ')[0].shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,8 +4,97 @@
 It takes the currently active object and writes it's transformation data
 into a text file with .chan extension."""
 
-from mathutils import Matrix, Euler
-from math import radians, degrees
+import numpy as np
+from mathutils import Matrix
+from math import radians
+
+from .chan_utils import (
+    euler_to_matrices,
+    quaternions_to_matrices,
+    axis_angles_to_matrices,
+    matrices_to_compatible_eulers,
+)
+
+
+def animated_by_action(scene, obj):
+    """
+    Whether the world matrix (and the camera settings) of every frame only depends
+    on the actions of the object, so they can be evaluated from the fcurves
+    without stepping through the frames.
+    """
+    if scene.render.frame_map_old != scene.render.frame_map_new:
+        return False
+    if obj.parent or obj.constraints or obj.rigid_body:
+        return False
+
+    for id_data in (obj, obj.data):
+        anim_data = id_data and id_data.animation_data
+        if anim_data and (
+                anim_data.drivers or
+                anim_data.nla_tracks or
+                anim_data.use_tweak_mode or
+                anim_data.action_influence != 1.0 or
+                anim_data.action_blend_type != 'REPLACE'
+        ):
+            return False
+    return True
+
+
+def evaluate_channels(id_data, frames):
+    """A function returning the values of a property of `id_data` over `frames`, one column per channel."""
+    action = id_data.animation_data.action if id_data.animation_data else None
+    fcurves = {}
+    if action:
+        for fcurve in action.fcurves:
+            if fcurve.mute or (fcurve.group and fcurve.group.mute):
+                continue
+            if not fcurve.keyframe_points and not fcurve.modifiers:
+                continue
+            fcurves[fcurve.data_path, fcurve.array_index] = fcurve
+
+    frames = [float(frame) for frame in frames]
+
+    def channel_values(prop, size):
+        # channels without an fcurve keep their current value
+        value = getattr(id_data, prop)
+        if size == 1:
+            value = (value,)
+        values = np.empty((len(frames), size))
+        for i in range(size):
+            fcurve = fcurves.get((prop, i))
+            if fcurve is None:
+                values[:, i] = value[i]
+            else:
+                values[:, i] = np.fromiter(map(fcurve.evaluate, frames), dtype=np.float64, count=len(frames))
+        return values
+
+    return channel_values
+
+
+def world_matrices_from_action(obj, frames):
+    """World matrices of a parentless object for all frames, composed like BKE_object_to_mat4()."""
+    channel_values = evaluate_channels(obj, frames)
+
+    rotation_mode = obj.rotation_mode
+    if rotation_mode == 'QUATERNION':
+        rotation = (
+            quaternions_to_matrices(channel_values("delta_rotation_quaternion", 4)) @
+            quaternions_to_matrices(channel_values("rotation_quaternion", 4))
+        )
+    elif rotation_mode == 'AXIS_ANGLE':
+        rotation = axis_angles_to_matrices(channel_values("rotation_axis_angle", 4))
+    else:
+        rotation = (
+            euler_to_matrices(channel_values("delta_rotation_euler", 3), rotation_mode) @
+            euler_to_matrices(channel_values("rotation_euler", 3), rotation_mode)
+        )
+    scale = channel_values("scale", 3) * channel_values("delta_scale", 3)
+
+    matrices = np.zeros((len(frames), 4, 4))
+    matrices[:, :3, :3] = rotation * scale[:, np.newaxis, :]
+    matrices[:, :3, 3] = channel_values("location", 3) + channel_values("delta_location", 3)
+    matrices[:, 3, 3] = 1.0
+    return matrices
 
 
 def save_chan(context, filepath, y_up, rot_ord):
@@ -16,53 +105,46 @@ def save_chan(context, filepath, y_up, rot_ord):
     camera = obj.data if obj.type == 'CAMERA' else None
 
     # get the range of an animation
-    f_start = scene.frame_start
-    f_end = scene.frame_end
+    frames = np.arange(scene.frame_start, scene.frame_end + 1)
 
-    # prepare the correcting matrix
-    rot_mat = Matrix.Rotation(radians(-90.0), 4, 'X').to_4x4()
-    previous_rotation = Euler()
-
-    filehandle = open(filepath, 'w')
-    fw = filehandle.write
-
-    # iterate the frames
-    for frame in range(f_start, f_end + 1, 1):
-
-        # set the current frame
-        scene.frame_set(frame)
-
-        # get the objects world matrix
-        mat = obj.matrix_world.copy()
-
-        # if the setting is proper use the rotation matrix
-        # to flip the Z and Y axis
-        if y_up:
-            mat = rot_mat @ mat
-
-        # create the first component of a new line, the frame number
-        fw("%i\t" % frame)
-
-        # create transform component
-        t = mat.to_translation()
-        fw("%f\t%f\t%f\t" % t[:])
-
-        # create rotation component
-        r = mat.to_euler(rot_ord, previous_rotation)
-
-        fw("%f\t%f\t%f\t" % (degrees(r[0]), degrees(r[1]), degrees(r[2])))
-
-        # store previous rotation for compatibility
-        previous_rotation = r
-
-        # if the selected object is a camera export vertical fov also
+    # get the objects world matrices and the cameras vertical fov of all frames,
+    # only step through the frames when more than the actions animate them
+    if animated_by_action(scene, obj):
+        matrices = world_matrices_from_action(obj, frames)
         if camera:
-            vfov = degrees(camera.angle_y)
-            fw("%f" % vfov)
-
-        fw("\n")
-
-    # after the whole loop close the file
-    filehandle.close()
+            channel_values = evaluate_channels(camera, frames)
+            # the same as camera.angle_y
+            fovs = 2.0 * np.arctan(channel_values("sensor_height", 1) / 2.0 / channel_values("lens", 1))
+    else:
+        frame_current = scene.frame_current
+        matrices = np.empty((len(frames), 4, 4))
+        fovs = np.empty((len(frames), 1))
+        for frame_i, frame in enumerate(frames):
+            scene.frame_set(frame)
+            matrices[frame_i] = obj.matrix_world
+            if camera:
+                fovs[frame_i] = camera.angle_y
+        scene.frame_set(frame_current)
+
+    # if the setting is proper use the rotation matrix
+    # to flip the Z and Y axis
+    if y_up:
+        matrices = np.array(Matrix.Rotation(radians(-90.0), 4, 'X')) @ matrices
+
+    # the rotations stay compatible from one frame to the next
+    rotations = matrices[:, :3, :3]
+    rotations = rotations / np.linalg.norm(rotations, axis=1)[:, np.newaxis, :]
+    eulers = matrices_to_compatible_eulers(rotations, rot_ord)
+
+    # one line per frame: the frame number, translation, rotation
+    # and if the selected object is a camera the vertical fov also
+    columns = [frames[:, np.newaxis], matrices[:, :3, 3], np.degrees(eulers)]
+    fmt = "%i\t%f\t%f\t%f\t%f\t%f\t%f\t"
+    if camera:
+        columns.append(np.degrees(fovs))
+        fmt += "%f"
+
+    with open(filepath, 'w') as filehandle:
+        np.savetxt(filehandle, np.hstack(columns), fmt=fmt)
 
     return {'FINISHED'}
@@ -2,9 +2,149 @@
 
 """ This script is an importer for the nuke's .chan files"""
 
-from mathutils import Vector, Matrix, Euler
+import bpy
+import numpy as np
+from mathutils import Matrix
 from math import radians
 
+from .chan_utils import (
+    euler_to_matrices,
+    matrices_to_quaternions,
+    matrices_to_eulers,
+)
+
+# The curve colors keyframe_insert() gives with the "XYZ to RGB" preference.
+XYZ_TO_RGB_MODES = {
+    "location": 'AUTO_RGB',
+    "rotation_euler": 'AUTO_RGB',
+    "scale": 'AUTO_RGB',
+    "rotation_quaternion": 'AUTO_YRGB',
+}
+
+
+def quaternions_to_axis_angles(quats):
+    """
+    Rows of (angle, x, y, z) for normalized quaternions, like Quaternion.to_axis_angle(),
+    a rotation by zero gets the axis (0, 1, 0).
+    """
+    half_angle = np.arccos(np.clip(quats[:, 0], -1.0, 1.0))
+    sin = np.sin(half_angle)
+    axis = quats[:, 1:] / np.where(np.abs(sin) < 0.0005, 1.0, sin)[:, np.newaxis]
+    axis[np.all(axis == 0.0, axis=1)] = (0.0, 1.0, 0.0)
+    return np.hstack(((2.0 * half_angle)[:, np.newaxis], axis))
+
+
+def matrices_to_smallest_eulers(matrices, order):
+    """Same as Matrix.to_euler(order) without a compatible euler, for each of the rotation matrices."""
+    eul1, eul2 = matrices_to_eulers(matrices, order)
+    second = np.abs(eul1).sum(axis=1) > np.abs(eul2).sum(axis=1)
+    return np.where(second[:, np.newaxis], eul2, eul1)
+
+
+def new_interpolations(old_frames, old_interpolation, new_frames, interpolation):
+    """
+    The interpolation keyframe_insert() gives the keys at `new_frames` inserted one by one:
+    once the curve has more than two keys, a new key continues the interpolation of the key
+    before it (or after it, if it is the first one), otherwise it gets `interpolation`.
+    """
+    n = np.arange(len(new_frames))
+    before = np.searchsorted(old_frames, new_frames) - 1
+    preferred = len(old_frames) + n + 1 <= 2
+    # The key before is an old one, or there is none and the key after is.
+    after_old = np.ones(len(n), dtype=bool)
+    after_old[1:] = before[1:] != before[:-1]
+    known = preferred | after_old
+    values = np.where(preferred, interpolation, old_interpolation[np.maximum(before, 0)] if len(old_frames) else 0)
+    # The others continue the new key before them.
+    return values[np.maximum.accumulate(np.where(known, n, 0))]
+
+
+def insert_keyframes(action, data_path, frames, values, preferences, group=None):
+    """
+    Key all channels of `data_path` at once, one column of `values` each,
+    the same as keyframe_insert() at every frame: keys already at one of the
+    frames only get the new value, the new keys use the preferred handle type and
+    interpolation, or continue the interpolation of the keys around them.
+    """
+    keyframe = bpy.types.Keyframe.bl_rna.properties
+    interpolation = keyframe['interpolation'].enum_items[preferences.keyframe_new_interpolation_type].value
+    handle_type = keyframe['handle_left_type'].enum_items[preferences.keyframe_new_handle_type].value
+
+    for index, channel_values in enumerate(values.T):
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is None:
+            fcurve = action.fcurves.new(data_path, index=index, action_group=group or "")
+            if preferences.use_insertkey_xyz_to_rgb and data_path in XYZ_TO_RGB_MODES:
+                fcurve.color_mode = XYZ_TO_RGB_MODES[data_path]
+        keyframe_points = fcurve.keyframe_points
+
+        old_count = len(keyframe_points)
+        co = np.empty(old_count * 2, dtype=np.float32)
+        keyframe_points.foreach_get("co", co)
+        co = co.reshape(old_count, 2)
+        old_interpolation = np.empty(old_count, dtype=np.int32)
+        keyframe_points.foreach_get("interpolation", old_interpolation)
+        handles = {}
+        for prop in ("handle_left", "handle_right"):
+            handles[prop] = np.empty(old_count * 2, dtype=np.float32)
+            keyframe_points.foreach_get(prop, handles[prop])
+            handles[prop] = handles[prop].reshape(old_count, 2)
+
+        # The keys are sorted by frame, the ones already there move with their handles.
+        old_i = np.minimum(np.searchsorted(co[:, 0], frames), max(old_count - 1, 0))
+        keyed = co[old_i, 0] == frames if old_count else np.zeros(len(frames), dtype=bool)
+        delta = channel_values[keyed] - co[old_i[keyed], 1]
+        co[old_i[keyed], 1] = channel_values[keyed]
+        for prop in handles:
+            handles[prop][old_i[keyed], 1] += delta
+
+        new_frames = frames[~keyed]
+        interpolations = new_interpolations(co[:, 0], old_interpolation, new_frames, interpolation)
+
+        keyframe_points.add(len(new_frames))
+        new_co = np.column_stack((new_frames, channel_values[~keyed])).astype(np.float32)
+        co = np.vstack((co, new_co))
+        keyframe_points.foreach_set("co", co.ravel())
+        # new handles one frame to each side, as keyframe_insert() puts them
+        for prop, offset in (("handle_left", -1.0), ("handle_right", 1.0)):
+            new_handles = new_co + np.array((offset, 0.0), dtype=np.float32)
+            keyframe_points.foreach_set(prop, np.vstack((handles[prop], new_handles)).ravel())
+
+        for prop, values in (
+                ("interpolation", interpolations),
+                ("handle_left_type", handle_type),
+                ("handle_right_type", handle_type),
+        ):
+            settings = np.empty(len(co), dtype=np.int32)
+            keyframe_points.foreach_get(prop, settings)
+            settings[old_count:] = values
+            keyframe_points.foreach_set(prop, settings)
+        fcurve.update()
+
+
+def insert_needed_keyframes(id_data, data_path, frames, values, preferences, group=None):
+    """
+    Key `data_path` of `id_data` with keyframe_insert() row by row, for the "only insert
+    needed" preference, that depends on the curve left by the keys before.
+    """
+    options = {'INSERTKEY_NEEDED'}
+    if preferences.use_insertkey_xyz_to_rgb:
+        options.add('INSERTKEY_XYZ_TO_RGB')
+    # an empty group name would still create a "Group"
+    group_kwargs = {"group": group} if group else {}
+    single = values.shape[1] == 1
+    for frame, row in zip(frames, values):
+        setattr(id_data, data_path, float(row[0]) if single else row.tolist())
+        id_data.keyframe_insert(data_path, frame=float(frame), options=options, **group_kwargs)
+
+
+def ensure_action(id_data):
+    """The action of `id_data`, created the same way keyframe_insert() does if there is none."""
+    anim_data = id_data.animation_data or id_data.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new(id_data.name + "Action")
+    return anim_data.action
+
 
 def read_chan(context, filepath, z_up, rot_ord, sensor_width, sensor_height):
 
@@ -12,83 +152,66 @@ def read_chan(context, filepath, z_up, rot_ord, sensor_width, sensor_height):
     scene = context.scene
     obj = context.active_object
     camera = obj.data if obj.type == 'CAMERA' else None
-
-    # prepare the correcting matrix
-    rot_mat = Matrix.Rotation(radians(90.0), 4, 'X').to_4x4()
-
-    # read the file
-    filehandle = open(filepath, 'r')
-
-    # iterate through the files lines
-    for line in filehandle:
-        # reset the target objects matrix
-        # (the one from which one we'll extract the final transforms)
-        m_trans_mat = Matrix()
-
-        # strip the line
-        data = line.split()
-
-        # test if the line is not commented out
-        if data and not data[0].startswith("#"):
-
-            # set the frame number basing on the chan file
-            scene.frame_set(int(data[0]))
-
-            # read the translation values from the first three columns of line
-            v_transl = Vector((float(data[1]),
-                               float(data[2]),
-                               float(data[3])))
-            translation_mat = Matrix.Translation(v_transl)
-            translation_mat.to_4x4()
-
-            # read the rotations, and set the rotation order basing on the
-            # order set during the export (it's not being saved in the chan
-            # file you have to keep it noted somewhere
-            # the actual objects rotation order doesn't matter since the
-            # rotations are being extracted from the matrix afterwards
-            e_rot = Euler((radians(float(data[4])),
-                           radians(float(data[5])),
-                           radians(float(data[6]))))
-            e_rot.order = rot_ord
-            mrot_mat = e_rot.to_matrix()
-            mrot_mat.resize_4x4()
-
-            # merge the rotation and translation
-            m_trans_mat = translation_mat @ mrot_mat
-
-            # correct the world space
-            # (nuke's and blenders scene spaces are different)
-            if z_up:
-                m_trans_mat = rot_mat @ m_trans_mat
-
-            # break the matrix into a set of the coordinates
-            trns = m_trans_mat.decompose()
-
-            # set the location and the location's keyframe
-            obj.location = trns[0]
-            obj.keyframe_insert("location")
-
-            # convert the rotation to euler angles (or not)
-            # basing on the objects rotation mode
-            if obj.rotation_mode == 'QUATERNION':
-                obj.rotation_quaternion = trns[1]
-                obj.keyframe_insert("rotation_quaternion")
-            elif obj.rotation_mode == 'AXIS_ANGLE':
-                tmp_rot = trns[1].to_axis_angle()
-                obj.rotation_axis_angle = (tmp_rot[1], *tmp_rot[0])
-                obj.keyframe_insert("rotation_axis_angle")
-                del tmp_rot
-            else:
-                obj.rotation_euler = trns[1].to_euler(obj.rotation_mode)
-                obj.keyframe_insert("rotation_euler")
-
-            # check if the object is camera and fov data is present
-            if camera and len(data) > 7:
-                camera.sensor_fit = 'HORIZONTAL'
-                camera.sensor_width = sensor_width
-                camera.sensor_height = sensor_height
-                camera.angle_y = radians(float(data[7]))
-                camera.keyframe_insert("lens")
-    filehandle.close()
+    preferences = context.preferences.edit
+
+    # read the whole file, one row per frame:
+    # frame, translation, rotation in degrees and an optional vertical fov
+    data = np.loadtxt(filepath, comments="#", ndmin=2)
+    if not data.size:
+        return {'FINISHED'}
+
+    # a frame keyed twice keeps the last values
+    frames = data[::-1, 0].astype(np.int64)
+    frames, last = np.unique(frames, return_index=True)
+    data = data[::-1][last]
+    frames = frames.astype(np.float32)
+
+    # the rotations use the order set during the export (it's not being
+    # saved in the chan file you have to keep it noted somewhere), the
+    # actual objects rotation order doesn't matter since the rotations are
+    # being extracted from the matrices afterwards
+    matrices = np.zeros((len(data), 4, 4))
+    matrices[:, :3, :3] = euler_to_matrices(np.radians(data[:, 4:7]), rot_ord)
+    matrices[:, :3, 3] = data[:, 1:4]
+    matrices[:, 3, 3] = 1.0
+
+    # correct the world space
+    # (nuke's and blenders scene spaces are different)
+    if z_up:
+        matrices = np.array(Matrix.Rotation(radians(90.0), 4, 'X')) @ matrices
+
+    # only inserting the needed keys depends on the curve left by each key
+    # before, so then they are inserted one by one
+    def insert(id_data, data_path, values, group=None):
+        if preferences.use_keyframe_insert_needed:
+            insert_needed_keyframes(id_data, data_path, frames, values, preferences, group)
+        else:
+            insert_keyframes(ensure_action(id_data), data_path, frames, values, preferences, group)
+
+    insert(obj, "location", matrices[:, :3, 3], "Object Transforms")
+
+    # convert the rotation to euler angles (or not)
+    # basing on the objects rotation mode
+    rotations = matrices[:, :3, :3]
+    if obj.rotation_mode == 'QUATERNION':
+        insert(obj, "rotation_quaternion", matrices_to_quaternions(rotations), "Object Transforms")
+    elif obj.rotation_mode == 'AXIS_ANGLE':
+        axis_angles = quaternions_to_axis_angles(matrices_to_quaternions(rotations))
+        insert(obj, "rotation_axis_angle", axis_angles, "Object Transforms")
+    else:
+        eulers = matrices_to_smallest_eulers(rotations, obj.rotation_mode)
+        insert(obj, "rotation_euler", eulers, "Object Transforms")
+
+    # check if the object is camera and fov data is present
+    if camera and data.shape[1] > 7:
+        camera.sensor_fit = 'HORIZONTAL'
+        camera.sensor_width = sensor_width
+        camera.sensor_height = sensor_height
+        # the same focal length setting camera.angle_y gives
+        lens = (np.float32(sensor_height) / 2.0) / np.tan(np.radians(data[:, 7:8]) / 2.0)
+        insert(camera, "lens", lens)
+
+    # show the imported animation at the current frame
+    scene.frame_set(scene.frame_current)
 
     return {'FINISHED'}
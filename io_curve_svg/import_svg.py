@@ -365,6 +365,61 @@ def id_names_from_node(node, ob):
 
 #### SVG path helpers ####
 
+# Path command, number, or a lone sign or dot which can't start a number
+re_path_token = re.compile(r"([MmLlHhVvCcSsQqTtAaZz])|"
+                           r"(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|-?\.\d+(?:[eE][-+]?\d+)?)|"
+                           r"([-.])")
+
+
+def SVGTokenizePath(d):
+    """
+    Split the definition of the outline of a shape into commands and numbers,
+    any other character is a separator
+    """
+
+    if 'a' not in d and 'A' not in d:
+        tokens = re_path_token.findall(d)
+        if not any(invalid for command, number, invalid in tokens):
+            return [command or number for command, number, invalid in tokens]
+
+    tokens = []
+    search = re_path_token.search
+    is_arc = False
+    arg_index = 1
+    pos = 0
+
+    while True:
+        match = search(d, pos)
+        if match is None:
+            break
+
+        command, number, invalid = match.groups()
+
+        if command:
+            tokens.append(command)
+            is_arc = command in 'aA'
+            arg_index = 1
+            pos = match.end()
+            continue
+
+        # Special case for 'a/A' commands.
+        # Arguments 4 and 5 are either 0 or 1 and might not
+        # be separated from the next argument with space or comma.
+        if is_arc and arg_index % 7 in [4, 5]:
+            start = match.start()
+            tokens.append(d[start])
+            pos = start + 1
+        elif invalid:
+            start = match.start()
+            raise Exception('Invalid float value near ' + d[start:start + 10])
+        else:
+            tokens.append(number)
+            pos = match.end()
+
+        arg_index += 1
+
+    return tokens
+
 
 class SVGPathData:
     """
@@ -382,44 +437,7 @@ class SVGPathData:
         d - the definition of the outline of a shape
         """
 
-        spaces = ' ,\t'
-        commands = {'m', 'l', 'h', 'v', 'c', 's', 'q', '', 't', 'a', 'z'}
-        current_command = ''
-        tokens = []
-
-        i = 0
-        n = len(d)
-        while i < n:
-            c = d[i]
-
-            if c in spaces:
-                pass
-            elif c.lower() in commands:
-                tokens.append(c)
-                current_command = c
-                arg_index = 1
-            elif c in ['-', '.'] or c.isdigit():
-                # Special case for 'a/A' commands.
-                # Arguments 4 and 5 are either 0 or 1 and might not
-                # be separated from the next argument with space or comma.
-                if current_command.lower() == 'a':
-                    if arg_index % 7 in [4,5]:
-                        token = d[i]
-                        last_char = i + 1
-                    else:
-                        token, last_char = read_float(d, i)
-                else:
-                    token, last_char = read_float(d, i)
-
-                arg_index += 1
-                tokens.append(token)
-
-                # in most cases len(token) and (last_char - i) are the same
-                # but with whitespace or ',' prefix they are not.
-
-                i += (last_char - i) - 1
-
-            i += 1
+        tokens = SVGTokenizePath(d)
 
         self._data = tokens
         self._index = 0
@@ -919,9 +937,11 @@ class SVGGeometry:
 
     __slots__ = ('_node',  # XML node for geometry
                  '_context',  # Global SVG context (holds matrices stack, i.e.)
-                 '_creating')  # Flag if geometry is already creating
+                 '_creating',  # Flag if geometry is already creating
                                # for this node
                                # need to detect cycles for USE node
+                 '_shared')  # First created object with its matrix and
+                             # display rectangle, reused by USE nodes
 
     def __init__(self, node, context):
         """
@@ -931,6 +951,7 @@ class SVGGeometry:
         self._node = node
         self._context = context
         self._creating = False
+        self._shared = None
 
         if hasattr(node, 'getAttribute'):
             defs = context['defines']
@@ -1018,10 +1039,46 @@ class SVGGeometry:
     def _doCreateGeom(self, instancing):
         """
         Internal handler to create real geometries
+
+        Returns the created curve object, if any, so following users
+        of this node can share its curve
         """
 
         pass
 
+    def _createInstance(self):
+        """
+        Create an object sharing the curve of the first object created for
+        this node, placed with the difference between both matrices.
+        Returns False if the curve has to be created again
+        """
+
+        first_ob, first_matrix, first_rect = self._shared
+
+        # Percent coordinates depend on the display rectangle
+        if self._context['rect'] != first_rect:
+            return False
+
+        try:
+            matrix = self._context['matrix'] @ first_matrix.inverted()
+        except ValueError:
+            return False
+
+        # Skew can't be stored in object location, rotation and scale
+        loc, rot, scale = matrix.decompose()
+        rebuilt = (Matrix.Translation(loc) @ rot.to_matrix().to_4x4() @
+                   Matrix.Diagonal(scale.to_4d()))
+        for row, rebuilt_row in zip(matrix, rebuilt):
+            for a, b in zip(row, rebuilt_row):
+                if abs(a - b) > 1e-6:
+                    return False
+
+        ob = bpy.data.objects.new(first_ob.name, first_ob.data)
+        ob.matrix_world = matrix
+        self._context['collection'].objects.link(ob)
+
+        return True
+
     def getTransformMatrix(self):
         """
         Get matrix created from "transform" attribute
@@ -1048,7 +1105,13 @@ class SVGGeometry:
         if matrix is not None:
             self._pushMatrix(matrix)
 
-        self._doCreateGeom(instancing)
+        # Nodes referenced several times share one curve datablock
+        if self._shared is None or not self._createInstance():
+            ob = self._doCreateGeom(instancing)
+
+            if ob is not None and self._shared is None:
+                self._shared = (ob, self._context['matrix'].copy(),
+                                self._context['rect'])
 
         if matrix is not None:
             self._popMatrix()
@@ -1200,6 +1263,8 @@ class SVGGeometryPATH(SVGGeometry):
 
         SVGFinishCurve()
 
+        return ob
+
 
 class SVGGeometryDEFS(SVGGeometryContainer):
     """
@@ -1435,6 +1500,8 @@ class SVGGeometryRECT(SVGGeometry):
 
         SVGFinishCurve()
 
+        return ob
+
 
 class SVGGeometryELLIPSE(SVGGeometry):
     """
@@ -1541,6 +1608,8 @@ class SVGGeometryELLIPSE(SVGGeometry):
 
         SVGFinishCurve()
 
+        return ob
+
 
 class SVGGeometryCIRCLE(SVGGeometryELLIPSE):
     """
@@ -1633,6 +1702,8 @@ class SVGGeometryLINE(SVGGeometry):
 
         SVGFinishCurve()
 
+        return ob
+
 
 class SVGGeometryPOLY(SVGGeometry):
     """
@@ -1710,6 +1781,8 @@ class SVGGeometryPOLY(SVGGeometry):
 
         SVGFinishCurve()
 
+        return ob
+
 
 class SVGGeometryPOLYLINE(SVGGeometryPOLY):
     """
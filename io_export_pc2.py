@@ -27,6 +27,7 @@ cacheFile -pc2 1 -pcf "<insert filepath of source>" -f "<insert target filename
 import bpy
 from bpy.props import BoolProperty, IntProperty, EnumProperty
 import mathutils
+import numpy as np
 from bpy_extras.io_utils import ExportHelper
 
 from os import remove
@@ -39,6 +40,17 @@ def get_sampled_frames(start, end, sampling):
     return [math.modf(start + x * sampling) for x in range(int((end - start) / sampling) + 1)]
 
 
+def transform_coords(coords, matrix):
+    """
+    Same as Mesh.transform(matrix) for the (n, 3) float32 vertex coords, in place,
+    with the float32 operations in the same order, so the written values stay the same.
+    """
+    matrix = np.array(matrix, dtype=np.float32)
+    x, y, z = coords.T.copy()
+    for axis_i, row in enumerate(matrix[:3]):
+        coords[:, axis_i] = x * row[0] + y * row[1] + z * row[2] + row[3]
+
+
 def do_export(context, props, filepath):
     mat_x90 = mathutils.Matrix.Rotation(-math.pi/2, 4, 'X')
     ob = context.active_object
@@ -62,6 +74,9 @@ def do_export(context, props, filepath):
     headerStr = struct.pack(headerFormat, b'POINTCACHE2\0',
                             1, vertCount, start, sampling, sampleCount)
 
+    # Reused for the vertex locations of every sample.
+    coords = np.empty((vertCount, 3), dtype=np.float32)
+
     file = open(filepath, "wb")
     file.write(headerStr)
 
@@ -85,16 +100,13 @@ def do_export(context, props, filepath):
             print('Export failed. Vertexcount of Object is not constant')
             return False
 
+        me.vertices.foreach_get("co", coords.ravel())
         if props.world_space:
-            me.transform(ob.matrix_world)
+            transform_coords(coords, ob.matrix_world)
         if props.rot_x90:
-            me.transform(mat_x90)
+            transform_coords(coords, mat_x90)
 
-        for v in me.vertices:
-            thisVertex = struct.pack('<fff', float(v.co[0]),
-                                     float(v.co[1]),
-                                     float(v.co[2]))
-            file.write(thisVertex)
+        coords.astype('<f4').tofile(file)
 
     if apply_modifiers:
         ob.evaluated_get(depsgraph).to_mesh_clear()
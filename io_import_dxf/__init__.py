@@ -92,11 +92,11 @@ def is_ref_scene(scene):
 
 def read(report, filename, obj_merge=BY_LAYER, import_text=True, import_light=True, export_acis=True, merge_lines=True,
          do_bbox=True, block_rep=LINKED_OBJECTS, new_scene=None, recenter=False, projDXF=None, projSCN=None,
-         thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0):
+         thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0, merge_lines_tolerance=1e-6):
     # import dxf and export nurbs types to sat/sab files
     # because that's how autocad stores nurbs types in a dxf...
     do = Do(filename, obj_merge, import_text, import_light, export_acis, merge_lines, do_bbox, block_rep, recenter,
-            projDXF, projSCN, thicknessWidth, but_group_by_att, dxf_unit_scale)
+            projDXF, projSCN, thicknessWidth, but_group_by_att, dxf_unit_scale, merge_lines_tolerance)
 
     errors = do.entities(os.path.basename(filename).replace(".dxf", ""), new_scene)
 
@@ -224,6 +224,14 @@ class IMPORT_OT_dxf(bpy.types.Operator):
             default=T_MergeLines
             )
 
+    merge_lines_tolerance: FloatProperty(
+            name="Tolerance",
+            description="Line ends closer than this distance are joined",
+            default=1e-6,
+            min=0.0,
+            precision=6,
+            )
+
     import_text: BoolProperty(
             name="Import Text",
             description="Import DXF Text Entities MTEXT and TEXT",
@@ -378,6 +386,9 @@ class IMPORT_OT_dxf(bpy.types.Operator):
         sub.enabled = self.merge
         sub.prop(self, "merge_options")
         box.prop(self, "merge_lines")
+        sub = box.row()
+        sub.enabled = self.merge_lines
+        sub.prop(self, "merge_lines_tolerance")
 
         # general options
         layout.label(text="Line thickness and width:")
@@ -520,7 +531,8 @@ class IMPORT_OT_dxf(bpy.types.Operator):
         else:
             read(self.report, self.filepath, merge_options, self.import_text, self.import_light, self.export_acis,
                  self.merge_lines, self.do_bbox, block_map[self.block_options], scene, self.recenter,
-                 proj_dxf, proj_scn, self.represent_thickness_and_width, self.import_atts, dxf_unit_scale)
+                 proj_dxf, proj_scn, self.represent_thickness_and_width, self.import_atts, dxf_unit_scale,
+                 self.merge_lines_tolerance)
 
         if self.outliner_groups:
             display_groups_in_outliner()
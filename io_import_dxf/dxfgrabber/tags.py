@@ -60,6 +60,7 @@ def to_float_with_infinite(value):
 class TagCaster:
     def __init__(self):
         self._cast = self._build()
+        self.table = self._build_table()
 
     def _build(self):
         table = {}
@@ -68,6 +69,13 @@ class TagCaster:
                 table[code] = caster
         return table
 
+    def _build_table(self):
+        # list indexed by group code, faster to look up than the dict for the tagger
+        table = [tostr] * (max(self._cast) + 1)
+        for code, caster in self._cast.items():
+            table[code] = caster
+        return table
+
     def cast(self, tag):
         code, value = tag
         typecaster = self._cast.get(code, tostr)
@@ -124,64 +132,120 @@ _TagCaster = TagCaster()
 cast_tag = _TagCaster.cast
 cast_tag_value = _TagCaster.cast_value
 
+BLOCK_SIZE = 1 << 20
+
+
+def block_lines(stream, block_size=BLOCK_SIZE):
+    """ Generates lists of lines without line endings, reads the stream in large blocks.
+    Each list holds an even number of lines, a (group code, value) pair is never split.
+    """
+    if not hasattr(stream, 'read'):
+        lines = [line.rstrip('\r\n') for line in iter(stream.readline, '')]
+        yield lines[:len(lines) & ~1]
+        return
+
+    rest = ''
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        block = rest + block
+        lines = block.split('\n')
+        rest = lines.pop()  # incomplete last line, completed by the next block
+        if len(lines) & 1:
+            rest = lines.pop() + '\n' + rest
+        if '\r' in block:
+            lines = [line.rstrip('\r') for line in lines]
+        yield lines
+    if rest:
+        lines = [line.rstrip('\r') for line in rest.split('\n')]
+        if not lines[-1]:  # line ending of the last line
+            lines.pop()
+        yield lines[:len(lines) & ~1]  # an incomplete last pair is dropped
+
 
 def stream_tagger(stream, assure_3d_coords=False):
     """ Generates DXFTag() from a stream (untrusted external source). Does not skip comment tags 999.
     """
-    class Counter:
-        def __init__(self):
-            self.counter = 0
-
-    undo_tag = None
-    line = Counter()  # writeable line counter for next_tag(), Python 2.7 does not support the nonlocal statement
-
-    def next_tag():
-        code = stream.readline()
-        value = stream.readline()
-        line.counter += 2
-        if code and value:  # StringIO(): empty strings indicates EOF
-            return DXFTag(int(code.rstrip('\r\n')), value.rstrip('\r\n'))  # without line ending
-        else:  # StringIO(): empty lines indicates EOF
-            raise EOFError()
+    new_tag = tuple.__new__  # DXFTag() without the namedtuple constructor overhead
+    cast_table = _TagCaster.table
+    table_size = len(cast_table)
+    point_codes = POINT_CODES
+    codes = []
+    values = []
+    line = 0  # lines before codes[0]
+    blocks = block_lines(stream)
+    block = next(blocks, None)
+
+    while block is not None:
+        codes.extend(map(int, block[0::2]))  # group codes of the whole block at once
+        values.extend(block[1::2])
+        block = next(blocks, None)
+        last = block is None
+        # a point needs up to 3 tags, keep the last 2 tags for the next block
+        end = len(codes) if last else len(codes) - 2
 
-    while True:
+        tags = []
+        append = tags.append
+        index = 0
         try:
-            if undo_tag is not None:
-                x = undo_tag
-                undo_tag = None
-            else:
-                x = next_tag()
-            code = x.code
-            if code == 999:  # skip comments
-                continue
-            if code in POINT_CODES:
-                y = next_tag()  # y coordinate is mandatory
-                if y.code != code + 10:
-                    raise DXFStructureError("Missing required y coordinate near line: {}.".format(line.counter))
-                z = next_tag()  # z coordinate just for 3d points
-                try:
-                    if z.code == code + 20:
-                        point = (float(x.value), float(y.value), float(z.value))
-                    else:
-                        if assure_3d_coords:
-                            point = (float(x.value), float(y.value), 0.)
+            while index < end:
+                code = codes[index]
+                value = values[index]
+                if code == 999:  # skip comments
+                    index += 1
+                    continue
+                if code in point_codes:
+                    if index + 1 >= len(codes):  # end of the stream
+                        index = len(codes)
+                        break
+                    if codes[index + 1] != code + 10:  # y coordinate is mandatory
+                        raise DXFStructureError("Missing required y coordinate near line: {}.".format(
+                            line + 2 * index + 4))
+                    if index + 2 >= len(codes):  # end of the stream, a point without z tag is dropped
+                        index = len(codes)
+                        break
+                    try:
+                        if codes[index + 2] == code + 20:  # z coordinate just for 3d points
+                            point = (float(value), float(values[index + 1]), float(values[index + 2]))
+                            index += 3
                         else:
-                            point = (float(x.value), float(y.value))
-                        undo_tag = z
-                except ValueError:
-                    raise DXFStructureError('Invalid floating point values near line: {}.'.format(line.counter))
-                yield DXFTag(code, point)
-            else:  # just a single tag
-                try:
-                    yield cast_tag(x)
-                except ValueError:
-                    raise DXFStructureError('Invalid tag (code={code}, value="{value}") near line: {line}.'.format(
-                        line=line.counter,
-                        code=x.code,
-                        value=x.value,
-                    ))
-        except EOFError:
-            return
+                            if assure_3d_coords:
+                                point = (float(value), float(values[index + 1]), 0.)
+                            else:
+                                point = (float(value), float(values[index + 1]))
+                            index += 2
+                    except ValueError:
+                        raise DXFStructureError('Invalid floating point values near line: {}.'.format(
+                            line + 2 * index + 6))
+                    append(new_tag(DXFTag, (code, point)))
+                else:  # just a single tag
+                    index += 1
+                    typecaster = cast_table[code] if 0 <= code < table_size else tostr
+                    if typecaster is not tostr:
+                        try:
+                            value = typecaster(value)
+                        except ValueError:
+                            try:
+                                if typecaster is not int:
+                                    raise
+                                value = int(float(value))  # convert float to int
+                            except ValueError:
+                                raise DXFStructureError(
+                                    'Invalid tag (code={code}, value="{value}") near line: {line}.'.format(
+                                        line=line + 2 * index,
+                                        code=code,
+                                        value=value,
+                                    ))
+                    append(new_tag(DXFTag, (code, value)))
+        except DXFStructureError:
+            yield from tags  # tags in front of the error
+            raise
+
+        yield from tags
+        del codes[:index]
+        del values[:index]
+        line += 2 * index
 
 
 def string_tagger(s):
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+if __name__ == '__main__':
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from dxfgrabber import tags
+else:
+    from . import tags
+from functools import partial
+from io import StringIO
+import random
+import time
+import unittest
+from unittest import mock
+
+DXFTag = tags.DXFTag
+DXFStructureError = tags.DXFStructureError
+
+
+def reference_tagger(stream, assure_3d_coords=False):
+    """ The line by line stream_tagger() of dxfgrabber 0.8.4, the new one has to give the same tags. """
+    class Counter:
+        def __init__(self):
+            self.counter = 0
+
+    undo_tag = None
+    line = Counter()
+
+    def next_tag():
+        code = stream.readline()
+        value = stream.readline()
+        line.counter += 2
+        if code and value:
+            return DXFTag(int(code.rstrip('\r\n')), value.rstrip('\r\n'))
+        else:
+            raise EOFError()
+
+    while True:
+        try:
+            if undo_tag is not None:
+                x = undo_tag
+                undo_tag = None
+            else:
+                x = next_tag()
+            code = x.code
+            if code == 999:
+                continue
+            if code in tags.POINT_CODES:
+                y = next_tag()
+                if y.code != code + 10:
+                    raise DXFStructureError("Missing required y coordinate near line: {}.".format(line.counter))
+                z = next_tag()
+                try:
+                    if z.code == code + 20:
+                        point = (float(x.value), float(y.value), float(z.value))
+                    else:
+                        if assure_3d_coords:
+                            point = (float(x.value), float(y.value), 0.)
+                        else:
+                            point = (float(x.value), float(y.value))
+                        undo_tag = z
+                except ValueError:
+                    raise DXFStructureError('Invalid floating point values near line: {}.'.format(line.counter))
+                yield DXFTag(code, point)
+            else:
+                try:
+                    yield tags.cast_tag(x)
+                except ValueError:
+                    raise DXFStructureError('Invalid tag (code={code}, value="{value}") near line: {line}.'.format(
+                        line=line.counter,
+                        code=x.code,
+                        value=x.value,
+                    ))
+        except EOFError:
+            return
+
+
+def sample_dxf(rng, count, odd_values=True):
+    """ Entities with 2d and 3d points and comments, odd values are blank strings, floats of int tags
+    and infinite floats.
+    """
+    parts = ["999\ncomment\n  0\nSECTION\n  2\nENTITIES\n"]
+    for i in range(count):
+        layers = ("0", "Layer", "") if odd_values else ("0", "Layer")
+        parts.append("  0\nLINE\n  5\n%X\n  8\n%s\n" % (i, rng.choice(layers)))
+        if rng.random() < 0.1:
+            parts.append("999\nthe color\n")
+        parts.append(" 62\n%s\n" % rng.choice(("1", "256", "7.0") if odd_values else ("1", "256")))
+        parts.append(" 10\n%f\n 20\n%f\n" % (rng.uniform(-1e3, 1e3), rng.uniform(-1e3, 1e3)))
+        if rng.random() < 0.7:
+            parts.append(" 30\n%f\n" % rng.uniform(-1e3, 1e3))
+        parts.append(" 11\n%r\n 21\n%r\n 31\n%r\n" % (rng.random(), rng.random(), rng.random()))
+        parts.append(" 39\n%s\n" % rng.choice(("0.5", "inf", "-Infinite") if odd_values else ("0.5", "1")))
+    parts.append("  0\nENDSEC\n  0\nEOF\n")
+    return "".join(parts)
+
+
+def run(tagger, text, **kwargs):
+    """ Returns the tags and the error message at their end. """
+    result = []
+    try:
+        for tag in tagger(StringIO(text), **kwargs):
+            result.append(tag)
+    except DXFStructureError as e:
+        return result, str(e)
+    return result, None
+
+
+class StreamTaggerTest(unittest.TestCase):
+    def assertSameTags(self, text, **kwargs):
+        expected = run(reference_tagger, text, **kwargs)
+        # small blocks split the pairs and points at every position
+        for block_size in (1, 7, 64, tags.BLOCK_SIZE):
+            with mock.patch.object(tags, 'block_lines', partial(tags.block_lines, block_size=block_size)):
+                self.assertEqual(run(tags.stream_tagger, text, **kwargs), expected)
+        return expected
+
+    def test_sample(self):
+        text = sample_dxf(random.Random(0), 200)
+        result, error = self.assertSameTags(text)
+        self.assertIsNone(error)
+        self.assertEqual(result[-1], DXFTag(0, 'EOF'))
+        self.assertSameTags(text, assure_3d_coords=True)
+
+    def test_line_endings(self):
+        text = sample_dxf(random.Random(1), 50)
+        self.assertSameTags(text.replace('\n', '\r\n'))
+        self.assertSameTags(text.rstrip('\n'))  # no line ending after the last line
+
+    def test_blank_lines(self):
+        self.assertSameTags("  0\n\n  1\n\n 10\n1\n 20\n2\n 30\n3\n  0\n\n")
+        with self.assertRaises(ValueError):  # a blank group code is no tag
+            list(tags.stream_tagger(StringIO("  0\nLINE\n\n0\n")))
+
+    def test_odd_lines(self):
+        # an incomplete last pair or point ends the stream
+        text = "  0\nLINE\n 10\n1.0\n 20\n2.0\n 30\n3.0\n  0\nEOF\n"
+        lines = text.splitlines(True)
+        for count in range(len(lines) + 1):
+            self.assertSameTags("".join(lines[:count]))
+            self.assertSameTags("".join(lines[:count]).replace('\n', '\r\n'))
+
+    def test_errors(self):
+        for text in (
+                "  0\nLINE\n 10\n1.0\n 30\n2.0\n  0\nEOF\n",  # missing y
+                "  0\nLINE\n 10\n1.0\n 20\nnan?\n  0\nEOF\n",  # invalid y
+                "  0\nLINE\n 10\n1.0\n 20\n2.0\n 30\n-Infinite\n  0\nEOF\n",  # just float() for points
+                "  0\nLINE\n 62\nred\n  0\nEOF\n",  # invalid int
+        ):
+            result, error = self.assertSameTags(text)
+            self.assertEqual(result, [DXFTag(0, 'LINE')])
+            self.assertIsNotNone(error)
+
+    def test_runtime(self):
+        text = sample_dxf(random.Random(2), 20000, odd_values=False)
+
+        def timed(tagger):
+            t = time.process_time()
+            for tag in tagger(StringIO(text)):
+                pass
+            return time.process_time() - t
+
+        reference = new = float('inf')
+        for i in range(5):
+            reference = min(reference, timed(reference_tagger))
+            new = min(new, timed(tags.stream_tagger))
+        # 1.6 to 2.2 times faster when measured, a safe margin for slow and busy machines
+        self.assertLess(new, reference / 1.3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -10,15 +10,10 @@ import bmesh
 from .. import dxfgrabber
 from . import convert, is_, groupsort
 from .line_merger import line_merger
+from .projection import PYPROJ, transform, transform_points, wgs84
 from ..transverse_mercator import TransverseMercator
 
 
-try:
-    from pyproj import Proj, transform as proj_transform
-    PYPROJ = True
-except:
-    PYPROJ = False
-
 BY_LAYER = 0
 BY_DXFTYPE = 1
 BY_CLOSED_NO_BULGE_POLY = 2
@@ -28,29 +23,6 @@ GROUP_INSTANCES = 5
 BY_BLOCK = 6
 
 
-def transform(p1, p2, c1, c2, c3):
-    if PYPROJ:
-        if type(p1) is Proj and type(p2) is Proj:
-            if p1.srs != p2.srs:
-                return proj_transform(p1, p2, c1, c2, c3)
-            else:
-                return (c1, c2, c3)
-        elif type(p2) is TransverseMercator:
-            wgs84 = Proj(init="EPSG:4326")
-            if p1.srs != wgs84.srs:
-                t2, t1, t3 = proj_transform(p1, wgs84, c1, c2, c3)
-            else:
-                t1, t2, t3 = c2, c1, c3  # mind c2, c1 inversion
-            tm1, tm2 = p2.fromGeographic(t1, t2)
-            return (tm1, tm2, t3)
-    else:
-        if p1.spherical:
-            t1, t2 = p2.fromGeographic(c2, c1)  # mind c2, c1 inversion
-            return (t1, t2, c3)
-        else:
-            return (c1, c2, c3)
-
-
 def float_len(f):
     s = str(f)
     if 'e' in s:
@@ -77,12 +49,12 @@ class Do:
         "dwg", "combination", "known_blocks", "import_text", "import_light", "export_acis", "merge_lines",
         "do_bounding_boxes", "acis_files", "errors", "block_representation", "recenter", "did_group_instance",
         "objects_before", "pDXF", "pScene", "thickness_and_width", "but_group_by_att", "current_scene",
-        "dxf_unit_scale"
+        "dxf_unit_scale", "proj_offset", "merge_lines_tolerance"
     )
 
     def __init__(self, dxf_filename, c=BY_LAYER, import_text=True, import_light=True, export_acis=True,
                  merge_lines=True, do_bbox=True, block_rep=LINKED_OBJECTS, recenter=False, pDXF=None, pScene=None,
-                 thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0):
+                 thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0, merge_lines_tolerance=1e-6):
         self.dwg = dxfgrabber.readfile(dxf_filename, {"assure_3d_coords": True})
         self.combination = c
         self.known_blocks = {}
@@ -103,6 +75,22 @@ class Do:
         self.but_group_by_att = but_group_by_att
         self.current_scene = None
         self.dxf_unit_scale = dxf_unit_scale
+        self.proj_offset = None
+        self.merge_lines_tolerance = merge_lines_tolerance
+
+    def _proj_offset(self):
+        """
+        :return: the scene geo-reference in the scene projection, computed once per geo-reference
+        """
+        scene = self.current_scene
+        if "latitude" in scene and "longitude" in scene:
+            if PYPROJ and type(self.pScene) not in (TransverseMercator, Indicator):
+                key = (scene.get('latitude', 0), scene.get('longitude', 0), scene.get('altitude', 0))
+                if self.proj_offset is None or self.proj_offset[0] != key:
+                    cscn_lat, cscn_lon, cscn_alt = key
+                    self.proj_offset = (key, Vector(transform(wgs84(), self.pScene, cscn_lon, cscn_lat, cscn_alt)))
+                return self.proj_offset[1]
+        return Vector((0, 0, 0))
 
     def proj(self, co, elevation=0):
         """
@@ -111,33 +99,7 @@ class Do:
         :return: transformed coordinate if self.pScene is defined
         """
         if self.pScene is not None and self.pDXF is not None:
-            u = self.dxf_unit_scale
-            if len(co) == 3:
-                c1, c2, c3 = co
-                c3 += elevation
-            else:
-                c1, c2 = co
-                c3 = elevation
-            if u != 1.0:
-                c1 *= u
-                c2 *= u
-                c3 *= u
-            # add
-            add = Vector((0, 0, 0))
-            if "latitude" in self.current_scene and "longitude" in self.current_scene:
-                if PYPROJ and type(self.pScene) not in (TransverseMercator, Indicator):
-                    wgs84 = Proj(init="EPSG:4326")
-                    cscn_lat = self.current_scene.get('latitude', 0)
-                    cscn_lon = self.current_scene.get('longitude', 0)
-                    cscn_alt = self.current_scene.get('altitude', 0)
-                    add = Vector(transform(wgs84, self.pScene, cscn_lon, cscn_lat, cscn_alt))
-
-            # projection
-            newco = Vector(transform(self.pDXF, self.pScene, c1, c2, c3))
-            newco = newco - add
-            if any((c == float("inf") or c == float("-inf") for c in newco)):
-                self.errors.add("Projection results in +/- infinity coordinates.")
-            return newco
+            return self.proj_points((co,), elevation)[0]
         else:
             u = self.dxf_unit_scale
             if u != 1:
@@ -154,6 +116,41 @@ class Do:
             else:
                 return Vector((co[0], co[1], co[2] + elevation if len(co) == 3 else elevation))
 
+    def proj_points(self, points, elevation=0):
+        """
+        :param points: list of coordinates
+        :param elevation: float (lwpolyline code 38)
+        :return: list of transformed coordinates, projected all at once if self.pScene is defined
+        """
+        if self.pScene is None or self.pDXF is None:
+            return [self.proj(co, elevation) for co in points]
+
+        u = self.dxf_unit_scale
+        xs = []
+        ys = []
+        zs = []
+        for co in points:
+            if len(co) == 3:
+                c1, c2, c3 = co
+                c3 += elevation
+            else:
+                c1, c2 = co
+                c3 = elevation
+            if u != 1.0:
+                c1 *= u
+                c2 *= u
+                c3 *= u
+            xs.append(c1)
+            ys.append(c2)
+            zs.append(c3)
+
+        # projection
+        add = self._proj_offset()
+        newcos = [Vector(newco) - add for newco in transform_points(self.pDXF, self.pScene, xs, ys, zs)]
+        if any(c == float("inf") or c == float("-inf") for newco in newcos for c in newco):
+            self.errors.add("Projection results in +/- infinity coordinates.")
+        return newcos
+
     def georeference(self, scene, center):
         if "latitude" not in scene and "longitude" not in scene:
             if type(self.pScene) is TransverseMercator:
@@ -161,8 +158,7 @@ class Do:
                 scene['longitude'] = self.pScene.lon
                 scene['altitude'] = 0
             elif type(self.pScene) is not None:
-                wgs84 = Proj(init="EPSG:4326")
-                latlon = transform(self.pScene, wgs84, center[0], center[1], center[2])
+                latlon = transform(self.pScene, wgs84(), center[0], center[1], center[2])
                 scene['longitude'] = latlon[0]
                 scene['latitude'] = latlon[1]
                 scene['altitude'] = latlon[2]
@@ -180,29 +176,31 @@ class Do:
         spl.use_cyclic_u = True
         b = spl.bezier_points
         b.add(count - 1)
+        points = self.proj_points(points)
         for i, j in enumerate(range(1, len(points), 3)):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
+            b[i].handle_left = points[j - 1]
+            b[i].co = points[j]
+            b[i].handle_right = points[j + 1]
 
     def _cubic_bezier_open(self, points, curve):
         count = int((len(points) - 1) / 3 + 1)
         spl = curve.splines.new('BEZIER')
         b = spl.bezier_points
         b.add(count - 1)
+        points = self.proj_points(points)
 
-        b[0].co = self.proj(points[0])
-        b[0].handle_left = self.proj(points[0])
-        b[0].handle_right = self.proj(points[1])
+        b[0].co = points[0]
+        b[0].handle_left = points[0]
+        b[0].handle_right = points[1]
 
-        b[-1].co = self.proj(points[-1])
-        b[-1].handle_right = self.proj(points[-1])
-        b[-1].handle_left = self.proj(points[-2])
+        b[-1].co = points[-1]
+        b[-1].handle_right = points[-1]
+        b[-1].handle_left = points[-2]
 
         for i, j in enumerate(range(3, len(points) - 2, 3), 1):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
+            b[i].handle_left = points[j - 1]
+            b[i].co = points[j]
+            b[i].handle_right = points[j + 1]
 
     def _cubic_bezier(self, points, curve, is_closed):
         """
@@ -227,8 +225,8 @@ class Do:
         p.use_cyclic_u = is_closed
         p.points.add(len(points) - 1)
 
-        for i, pt in enumerate(points):
-            p.points[i].co = self.proj(pt, elevation).to_4d()
+        for i, co in enumerate(self.proj_points(points, elevation)):
+            p.points[i].co = co.to_4d()
 
     def _gen_poly(self, en, curve, elevation=0):
         if any([b != 0 for b in en.bulge]):
@@ -483,8 +481,8 @@ class Do:
                 i += 1
 
         verts = []
-        for p in points:
-            verts.append(bm.verts.new(self.proj(p)))
+        for co in self.proj_points(points):
+            verts.append(bm.verts.new(co))
 
         # add only an edge if len points < 3
         if len(points) == 2:
@@ -1095,7 +1093,7 @@ class Do:
         curve: Blender curve data
         merges a list of LINE entities to a polygon-point-list and adds it to the Blender curve
         """
-        polylines = line_merger(lines)
+        polylines = line_merger(lines, self.merge_lines_tolerance)
         for polyline in polylines:
             self._poly(polyline, curve, 0, polyline[0] == polyline[-1])
 
@@ -1,95 +1,110 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+from itertools import product
+from math import floor
 
-def line_merger(lines, precision=6):
-    merger = _LineMerger(lines, precision)
+
+def line_merger(lines, tolerance=1e-6):
+    merger = _LineMerger(lines, tolerance)
     return merger.polylines
 
 
-def _round_point(point, precision):
-    return tuple(round(c, precision) for c in point)
+class _PointGrid:
+    """
+    Spatial hash of points, to find the point joined with a new one in constant time.
+    Points closer than `tolerance` to an already known point share its index; the grid cells are
+    `tolerance` wide, so only the neighbouring cells need to be searched.
+    """
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.cells = dict()  # key: cell -> value: list of point indices
+        self.points = []  # first point seen for each index
+
+    def index(self, point):
+        point = tuple(point)
+        tolerance = self.tolerance
+        if tolerance <= 0:
+            cell = point
+            neighbours = (cell,)
+        else:
+            cell = tuple(floor(c / tolerance) for c in point)
+            neighbours = product(*((c - 1, c, c + 1) for c in cell))
+
+        tolerance_sq = tolerance * tolerance
+        for key in neighbours:
+            for i in self.cells.get(key, ()):
+                if sum((a - b) ** 2 for a, b in zip(self.points[i], point)) <= tolerance_sq:
+                    return i
+
+        i = len(self.points)
+        self.points.append(point)
+        self.cells.setdefault(cell, []).append(i)
+        return i
 
 
 class _LineMerger:
-    def __init__(self, lines, precision):
-        self.segments = set()  # single lines as tuples: ((sx, sy[, sz]), (ex, ey[, ez]))
-        self.used_segments = set()
-        self.points = dict()  # key: point -> value: list of segments with this point as start or end point
-        self.precision = precision
+    def __init__(self, lines, tolerance):
+        self.grid = _PointGrid(tolerance)
+        self.segments = []  # single lines as point index pairs
+        self.point_segments = []  # point index -> indices of the segments with this point as start or end point
         self.setup(lines)
         self.polylines = self.merge_lines()  # result of merging process
 
     def setup(self, lines):
+        known = set()
         for line in lines:
-            s = _round_point(line.start, self.precision)
-            e = _round_point(line.end, self.precision)
-            self.add_segment(s, e)
+            start = self.grid.index(line.start)
+            end = self.grid.index(line.end)
+            if start == end:
+                continue  # this is not a segment
+            key = (start, end) if start < end else (end, start)
+            if key in known:
+                continue  # this segment already exist
+            known.add(key)
+            self.add_segment(start, end)
 
     def add_segment(self, start, end):
-        if start == end:
-            return  # this is not a segment
-        if end < start:  # order start and end points to detect all doubles
-            segment = (end, start)
-        else:
-            segment = (start, end)
-        if segment in self.segments:
-            return  # this segment already exist
-        self.segments.add(segment)
-        self.add_point(start, segment)
-        self.add_point(end, segment)
-
-    def add_point(self, point, segment):
-        segments = self.points.get(point)
-        if segments is None:
-            segments = list()
-            self.points[point] = segments
-        segments.append(segment)
-
-    def get_segment_with_point(self, point):
-        segments = self.points.get(point)
-        if segments is None:
-            return None
-
-        # Very important: do not return already used segments
-        for segment in segments:
-            if segment not in self.used_segments:
-                return segment
-        return None
-
-    def mark_as_used_segment(self, segment):
-        self.used_segments.add(segment)
-        self.segments.discard(segment)
+        n = len(self.segments)
+        self.segments.append((start, end))
+        while len(self.point_segments) < len(self.grid.points):
+            self.point_segments.append([])
+        self.point_segments[start].append(n)
+        self.point_segments[end].append(n)
 
     def merge_lines(self):
+        used = [False] * len(self.segments)
+        next_candidate = [0] * len(self.point_segments)  # segments before it are all used
+
         def get_extension_point(point):
-            extension = self.get_segment_with_point(point)
-            if extension is not None:
-                self.mark_as_used_segment(extension)
-                if extension[0] == point:
-                    return extension[1]
-                else:
-                    return extension[0]
-            return None
+            # every segment is skipped at most twice per end point, the whole merge stays linear
+            segments = self.point_segments[point]
+            i = next_candidate[point]
+            while i < len(segments) and used[segments[i]]:
+                i += 1
+            next_candidate[point] = i
+            if i == len(segments):
+                return None
+            segment = segments[i]
+            used[segment] = True
+            start, end = self.segments[segment]
+            return end if start == point else start
+
+        def extend(polyline):
+            extension_point = get_extension_point(polyline[-1])
+            while extension_point is not None:
+                polyline.append(extension_point)
+                extension_point = get_extension_point(extension_point)
 
         polylines = []
-        while len(self.segments):
-            segment = self.segments.pop()  # take an arbitrary segment
-            self.mark_as_used_segment(segment)
-            polyline = list(segment)  # start a new polyline
-            extend_start = True
-            extend_end = True
-            while extend_start or extend_end:
-                if extend_start:
-                    extension_point = get_extension_point(polyline[0])  # extend start of polyline
-                    if extension_point is not None:
-                        polyline.insert(0, extension_point)
-                    else:
-                        extend_start = False
-                if extend_end:
-                    extension_point = get_extension_point(polyline[-1])  # extend end of polyline
-                    if extension_point is not None:
-                        polyline.append(extension_point)
-                    else:
-                        extend_end = False
-            polylines.append(polyline)
+        points = self.grid.points
+        for n, segment in enumerate(self.segments):
+            if used[n]:
+                continue
+            used[n] = True
+            tail = [segment[1]]
+            extend(tail)  # extend end of polyline
+            head = [segment[0]]
+            extend(head)  # extend start of polyline
+            polyline = head[::-1] + tail
+            polylines.append([points[i] for i in polyline])
         return polylines
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+if __name__ == '__main__':
+    from line_merger import line_merger
+else:
+    from .line_merger import line_merger
+from collections import namedtuple
+import random
+import time
+import unittest
+
+Line = namedtuple("Line", "start end")
+
+TOLERANCE = 1e-3
+
+
+def random_polylines(rng, count, length):
+    """ Random walks, far enough apart from each other not to touch. """
+    polylines = []
+    for n in range(count):
+        point = (n * 1000.0, 0.0, 0.0)
+        polyline = [point]
+        for i in range(length):
+            point = tuple(c + rng.uniform(0.5, 2.0) for c in point)
+            polyline.append(point)
+        polylines.append(polyline)
+    return polylines
+
+
+def split_jittered(rng, polylines):
+    """ Shuffled segments with jittered end points, some of them reversed. """
+    def jitter(point):
+        return tuple(c + rng.uniform(-TOLERANCE / 4, TOLERANCE / 4) for c in point)
+
+    lines = []
+    for polyline in polylines:
+        for start, end in zip(polyline, polyline[1:]):
+            if rng.random() < 0.5:
+                start, end = end, start
+            lines.append(Line(jitter(start), jitter(end)))
+    rng.shuffle(lines)
+    return lines
+
+
+def same_chain(merged, original):
+    if len(merged) != len(original):
+        return False
+    if sum((a - b) ** 2 for a, b in zip(merged[0], original[0])) > TOLERANCE ** 2:
+        merged = merged[::-1]
+    return all(sum((a - b) ** 2 for a, b in zip(p, q)) <= TOLERANCE ** 2 for p, q in zip(merged, original))
+
+
+class LineMergerTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(line_merger([]), [])
+
+    def test_degenerate_and_double_lines(self):
+        lines = [Line((0, 0, 0), (0, 0, 0)), Line((0, 0, 0), (1, 0, 0)), Line((1, 0, 0), (0, 0, 0))]
+        self.assertEqual(line_merger(lines), [[(0, 0, 0), (1, 0, 0)]])
+
+    def test_closed_polygon(self):
+        square = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]
+        lines = [Line(square[i - 1], square[i]) for i in range(4)]
+        polylines = line_merger(lines)
+        self.assertEqual(len(polylines), 1)
+        self.assertEqual(len(polylines[0]), 5)
+        self.assertEqual(polylines[0][0], polylines[0][-1])
+
+    def test_join_across_cell_boundary(self):
+        # both ends are within tolerance, but on different sides of a grid cell border
+        lines = [Line((0, 0, 0), (1 - TOLERANCE / 10, 0, 0)), Line((1 + TOLERANCE / 10, 0, 0), (2, 0, 0))]
+        self.assertEqual(len(line_merger(lines, TOLERANCE)), 1)
+
+    def test_ends_outside_tolerance(self):
+        lines = [Line((0, 0, 0), (1, 0, 0)), Line((1 + 2 * TOLERANCE, 0, 0), (2, 0, 0))]
+        self.assertEqual(len(line_merger(lines, TOLERANCE)), 2)
+
+    def test_jittered_polylines(self):
+        rng = random.Random(0)
+        originals = random_polylines(rng, 20, 50)
+        polylines = line_merger(split_jittered(rng, originals), TOLERANCE)
+        self.assertEqual(len(polylines), len(originals))
+        for polyline in polylines:
+            self.assertTrue(any(same_chain(polyline, original) for original in originals))
+
+    def test_linear_runtime(self):
+        rng = random.Random(1)
+
+        def run(count):
+            lines = split_jittered(rng, random_polylines(rng, count, 100))
+            t = time.process_time()
+            line_merger(lines, TOLERANCE)
+            return time.process_time() - t
+
+        run(10)  # warm up
+        small = min(run(20) for i in range(3))
+        large = min(run(160) for i in range(3))
+        # 8 times the segments: about 8 times the time, a quadratic merge would take 64 times
+        self.assertLess(large, small * 20)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
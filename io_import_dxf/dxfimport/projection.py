@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+try:
+    from pyproj import Proj, transform as proj_transform
+    PYPROJ = True
+except:
+    PYPROJ = False
+
+
+_wgs84 = None
+
+
+def wgs84():
+    """
+    WGS84 (EPSG:4326) projection, created once and shared by all transformations.
+    """
+    global _wgs84
+    if _wgs84 is None:
+        _wgs84 = Proj(init="EPSG:4326")
+    return _wgs84
+
+
+def is_tmerc(p):
+    return hasattr(p, "fromGeographic")
+
+
+def transform(p1, p2, c1, c2, c3):
+    if PYPROJ:
+        if type(p1) is Proj and type(p2) is Proj:
+            if p1.srs != p2.srs:
+                return proj_transform(p1, p2, c1, c2, c3)
+            else:
+                return (c1, c2, c3)
+        elif is_tmerc(p2):
+            if p1.srs != wgs84().srs:
+                t2, t1, t3 = proj_transform(p1, wgs84(), c1, c2, c3)
+            else:
+                t1, t2, t3 = c2, c1, c3  # mind c2, c1 inversion
+            tm1, tm2 = p2.fromGeographic(t1, t2)
+            return (tm1, tm2, t3)
+    else:
+        if p1.spherical:
+            t1, t2 = p2.fromGeographic(c2, c1)  # mind c2, c1 inversion
+            return (t1, t2, c3)
+        else:
+            return (c1, c2, c3)
+
+
+def transform_points(p1, p2, xs, ys, zs):
+    """
+    Same as transform() for lists of coordinates, with a single pyproj call for all of them.
+    Returns a list of (c1, c2, c3) tuples.
+    """
+    if PYPROJ:
+        if type(p1) is Proj and type(p2) is Proj:
+            if p1.srs != p2.srs:
+                return list(zip(*proj_transform(p1, p2, xs, ys, zs)))
+            else:
+                return list(zip(xs, ys, zs))
+        elif is_tmerc(p2):
+            if p1.srs != wgs84().srs:
+                lons, lats, alts = proj_transform(p1, wgs84(), xs, ys, zs)
+            else:
+                lons, lats, alts = xs, ys, zs  # mind c2, c1 inversion
+            return [p2.fromGeographic(lat, lon) + (alt,) for lat, lon, alt in zip(lats, lons, alts)]
+    return [transform(p1, p2, c1, c2, c3) for c1, c2, c3 in zip(xs, ys, zs)]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+if __name__ == '__main__':
+    import projection
+else:
+    from . import projection
+import unittest
+
+
+class FakeProj:
+    instances = 0
+
+    def __init__(self, init):
+        FakeProj.instances += 1
+        self.srs = "+init=" + init + " "
+
+
+class FakeTransverseMercator:
+    def fromGeographic(self, lat, lon):
+        return lat * 10 - lon, lon * 10 + lat
+
+
+transform_calls = 0
+
+
+def fake_transform(p1, p2, c1, c2, c3):
+    global transform_calls
+    transform_calls += 1
+
+    def f(x, y, z):
+        return x * 2 + len(p2.srs), y * 3 - len(p1.srs), z + 1
+
+    if isinstance(c1, list):
+        return tuple(list(c) for c in zip(*(f(x, y, z) for x, y, z in zip(c1, c2, c3))))
+    return f(c1, c2, c3)
+
+
+class TransformPointsTest(unittest.TestCase):
+    def setUp(self):
+        global transform_calls
+        self.saved = projection.PYPROJ, getattr(projection, "Proj", None), \
+            getattr(projection, "proj_transform", None), projection._wgs84
+        projection.PYPROJ = True
+        projection.Proj = FakeProj
+        projection.proj_transform = fake_transform
+        projection._wgs84 = None
+        FakeProj.instances = 0
+        transform_calls = 0
+        self.xs = [1.0, 2.5, -3.0, 4.0]
+        self.ys = [0.5, 7.0, 2.0, -1.0]
+        self.zs = [0.0, 1.0, 2.0, 3.0]
+
+    def tearDown(self):
+        projection.PYPROJ, projection.Proj, projection.proj_transform, projection._wgs84 = self.saved
+
+    def per_point(self, p1, p2):
+        return [tuple(projection.transform(p1, p2, x, y, z)) for x, y, z in zip(self.xs, self.ys, self.zs)]
+
+    def test_proj_to_proj(self):
+        p1 = FakeProj("EPSG:2154")
+        p2 = FakeProj("EPSG:31467")
+        expected = self.per_point(p1, p2)
+        calls = transform_calls
+        self.assertEqual(projection.transform_points(p1, p2, self.xs, self.ys, self.zs), expected)
+        self.assertEqual(transform_calls - calls, 1)
+
+    def test_same_projection(self):
+        p1 = FakeProj("EPSG:2154")
+        p2 = FakeProj("EPSG:2154")
+        self.assertEqual(projection.transform_points(p1, p2, self.xs, self.ys, self.zs),
+                         list(zip(self.xs, self.ys, self.zs)))
+        self.assertEqual(transform_calls, 0)
+
+    def test_proj_to_tmerc(self):
+        p1 = FakeProj("EPSG:2154")
+        p2 = FakeTransverseMercator()
+        expected = self.per_point(p1, p2)
+        calls = transform_calls
+        self.assertEqual(projection.transform_points(p1, p2, self.xs, self.ys, self.zs), expected)
+        self.assertEqual(transform_calls - calls, 1)
+
+    def test_wgs84_to_tmerc(self):
+        p1 = FakeProj("EPSG:4326")
+        p2 = FakeTransverseMercator()
+        self.assertEqual(projection.transform_points(p1, p2, self.xs, self.ys, self.zs),
+                         self.per_point(p1, p2))
+        self.assertEqual(transform_calls, 0)
+
+    def test_wgs84_created_once(self):
+        p1 = FakeProj("EPSG:2154")
+        p2 = FakeTransverseMercator()
+        for i in range(10):
+            projection.transform(p1, p2, i, i, i)
+            projection.transform_points(p1, p2, self.xs, self.ys, self.zs)
+        # p1 and the shared WGS84 projection
+        self.assertEqual(FakeProj.instances, 2)
+
+    def test_without_pyproj(self):
+        class Spherical:
+            spherical = True
+
+        projection.PYPROJ = False
+        p2 = FakeTransverseMercator()
+        self.assertEqual(projection.transform_points(Spherical(), p2, self.xs, self.ys, self.zs),
+                         [p2.fromGeographic(y, x) + (z,) for x, y, z in zip(self.xs, self.ys, self.zs)])
+        self.assertEqual(FakeProj.instances, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -3,6 +3,7 @@
 import os
 import bpy
 import bmesh
+import numpy as np
 from math import pi, cos, sin, sqrt, ceil
 from mathutils import Vector, Matrix
 from copy import copy
@@ -193,6 +194,124 @@ def read_elements():
         ELEMENTS.append(li)
 
 
+# The function, which finds the element of one ATOM or HETATM line.
+#
+# Returns the short name, name, radius and color of the element, or None
+# if the line is strange.
+def read_pdb_element(line, radiustype):
+
+    # What follows is due to deviations which appear from PDB to
+    # PDB file. It is very special!
+    #
+    # PLEASE, DO NOT CHANGE! ............................... from here
+    if line[12:13] == " " or line[12:13].isdigit() == True:
+        short_name = line[13:14]
+        if line[14:15].islower() == True:
+            short_name = short_name + line[14:15]
+    elif line[12:13].isupper() == True:
+        short_name = line[12:13]
+        if line[13:14].isalpha() == True:
+            short_name = short_name + line[13:14]
+    else:
+        print("Atomic Blender: Strange error in PDB file.\n"
+              "Look for element names at positions 13-16 and 78-79.\n")
+        return None
+
+    if len(line) >= 78:
+
+        if line[76:77] == " ":
+            short_name2 = line[76:77]
+        else:
+            short_name2 = line[76:78]
+
+        if short_name2.isalpha() == True:
+            FOUND = False
+            for element in ELEMENTS:
+                if str.upper(short_name2) == str.upper(element.short_name):
+                    FOUND = True
+                    break
+            if FOUND == False:
+                short_name = short_name2
+
+    # ....................................................... to here.
+
+    # Go through all elements and find the element of the current atom.
+    for element in ELEMENTS:
+        if str.upper(short_name) == str.upper(element.short_name):
+            # Give the atom its proper names, color and radius:
+            # int(radiustype) => type of radius:
+            # pre-defined (0), atomic (1) or van der Waals (2)
+            return (str.upper(element.short_name),
+                    element.name,
+                    float(element.radii[int(radiustype)]),
+                    element.color)
+
+    # Is it a vacancy or an 'unknown atom' ?
+    # Give this atom also a name. If it is an 'X' then it is a
+    # vacancy. Otherwise ...
+    if "X" in short_name:
+        return ("VAC",
+                "Vacancy",
+                float(ELEMENTS[-3].radii[int(radiustype)]),
+                ELEMENTS[-3].color)
+    # ... take what is written in the PDB file. These are somewhat
+    # unknown atoms. This should never happen, the element list is
+    # almost complete. However, we do this due to security reasons.
+    else:
+        return (str.upper(short_name),
+                str.upper(short_name),
+                float(ELEMENTS[-2].radii[int(radiustype)]),
+                ELEMENTS[-2].color)
+
+
+# The function, which reads the ATOM and HETATM lines of a PDB file into
+# a structured array, column by column.
+#
+# The element of an atom only depends on a few columns of its line, so it is
+# determined once for each different combination of them.
+def read_pdb_atom_lines(atom_lines, radiustype):
+
+    number_atoms = len(atom_lines)
+
+    # All lines as a table of characters, padded to the same width
+    lines = np.array(atom_lines, dtype=str)
+    width = max(lines.dtype.itemsize // 4, 80)
+    lines = lines.astype("U%d" % width)
+    table = lines.view("U1").reshape(number_atoms, width)
+
+    def column(start, end):
+        return table[:, start:end].copy().view("U%d" % (end - start)).ravel()
+
+    atoms = np.empty(number_atoms, dtype=[("element", np.int32),
+                                          ("location", np.float64, 3)])
+
+    # x,y and z are at fixed positions in the PDB file.
+    for i, (start, end) in enumerate(((30, 38), (38, 46), (46, 55))):
+        try:
+            atoms["location"][:, i] = column(start, end).astype(np.float64)
+        except ValueError:
+            atoms["location"][:, i] = [float(line[start:end].rsplit()[0])
+                                       for line in atom_lines]
+
+    # Characters 13 to 15, and 77 and 78 if the line is long enough, give
+    # the element.
+    keys = table[:, [12, 13, 14, 76, 77]].copy()
+    keys[np.char.str_len(lines) < 78, 3:] = "\x01"
+    keys = keys.view("U5").ravel()
+    keys, first_lines, atoms["element"] = np.unique(keys,
+                                                    return_index=True,
+                                                    return_inverse=True)
+
+    elements = []
+    for i in first_lines:
+        element = read_pdb_element(atom_lines[i], radiustype)
+        if element is None:
+            return None
+        elements.append(element)
+
+    return atoms, elements
+
+
 # The function, which reads the x,y,z positions of all atoms in a PDB
 # file.
 #
@@ -206,134 +325,72 @@ def read_pdb_file(filepath_pdb, radiustype):
     all_atoms  = []
 
     # Open the pdb file ...
-    filepath_pdb_p = open(filepath_pdb, "r")
+    with open(filepath_pdb, "r") as filepath_pdb_p:
+        lines = filepath_pdb_p.readlines()
+
+    if lines == []:
+        return (0, all_atoms)
 
     #Go to the line, in which "ATOM" or "HETATM" appears.
-    for line in filepath_pdb_p:
+    first = len(lines) - 1
+    for i, line in enumerate(lines):
         split_list = line.split(' ')
         if "ATOM" in split_list[0]:
+            first = i
             break
         if "HETATM" in split_list[0]:
+            first = i
             break
 
-    j = 0
-    # This is in fact an endless 'while loop', ...
-    while j > -1:
-
-        # ... the loop is broken here (EOF) ...
-        if line == "":
-            break
+    # The first line is taken as is, the next ones without their last
+    # character. An empty line ends the list, like the end of the file.
+    atom_lines = []
+    order = []
+    for j, line in enumerate(lines[first:]):
+        if j > 0:
+            line = line[:-1]
+            if line == "":
+                break
 
         # If there is a "TER" we need to put empty entries into the lists
         # in order to not destroy the order of atom numbers and same numbers
         # used for sticks. "TER? What is that?" TER indicates the end of a
         # list of ATOM/HETATM records for a chain.
         if "TER" in line:
-            short_name = "TER"
-            name = "TER"
-            radius = 0.0
-            # 2019-03-14, New
-            color = [0,0,0, 0]
-            location = Vector((0,0,0))
-            # Append the TER into the list. Material remains empty so far.
-            all_atoms.append(AtomProp(short_name,
-                                      name,
-                                      location,
-                                      radius,
-                                      color,[]))
-
+            order.append(-1)
         # If 'ATOM or 'HETATM' appears in the line then do ...
         elif "ATOM" in line or "HETATM" in line:
-
-            # What follows is due to deviations which appear from PDB to
-            # PDB file. It is very special!
-            #
-            # PLEASE, DO NOT CHANGE! ............................... from here
-            if line[12:13] == " " or line[12:13].isdigit() == True:
-                short_name = line[13:14]
-                if line[14:15].islower() == True:
-                    short_name = short_name + line[14:15]
-            elif line[12:13].isupper() == True:
-                short_name = line[12:13]
-                if line[13:14].isalpha() == True:
-                    short_name = short_name + line[13:14]
-            else:
-                print("Atomic Blender: Strange error in PDB file.\n"
-                      "Look for element names at positions 13-16 and 78-79.\n")
-                return -1
-
-            if len(line) >= 78:
-
-                if line[76:77] == " ":
-                    short_name2 = line[76:77]
-                else:
-                    short_name2 = line[76:78]
-
-                if short_name2.isalpha() == True:
-                    FOUND = False
-                    for element in ELEMENTS:
-                        if str.upper(short_name2) == str.upper(element.short_name):
-                            FOUND = True
-                            break
-                    if FOUND == False:
-                        short_name = short_name2
-
-            # ....................................................... to here.
-
-            # Go through all elements and find the element of the current atom.
-            FLAG_FOUND = False
-            for element in ELEMENTS:
-                if str.upper(short_name) == str.upper(element.short_name):
-                    # Give the atom its proper names, color and radius:
-                    short_name = str.upper(element.short_name)
-                    name = element.name
-                    # int(radiustype) => type of radius:
-                    # pre-defined (0), atomic (1) or van der Waals (2)
-                    radius = float(element.radii[int(radiustype)])
-                    color = element.color
-                    FLAG_FOUND = True
-                    break
-
-            # Is it a vacancy or an 'unknown atom' ?
-            if FLAG_FOUND == False:
-                # Give this atom also a name. If it is an 'X' then it is a
-                # vacancy. Otherwise ...
-                if "X" in short_name:
-                    short_name = "VAC"
-                    name = "Vacancy"
-                    radius = float(ELEMENTS[-3].radii[int(radiustype)])
-                    color = ELEMENTS[-3].color
-                # ... take what is written in the PDB file. These are somewhat
-                # unknown atoms. This should never happen, the element list is
-                # almost complete. However, we do this due to security reasons.
-                else:
-                    short_name = str.upper(short_name)
-                    name = str.upper(short_name)
-                    radius = float(ELEMENTS[-2].radii[int(radiustype)])
-                    color = ELEMENTS[-2].color
-
-            # x,y and z are at fixed positions in the PDB file.
-            x = float(line[30:38].rsplit()[0])
-            y = float(line[38:46].rsplit()[0])
-            z = float(line[46:55].rsplit()[0])
-
-            location = Vector((x,y,z))
-
-            j += 1
-
+            order.append(len(atom_lines))
+            atom_lines.append(line)
+
+    if atom_lines != []:
+        result = read_pdb_atom_lines(atom_lines, radiustype)
+        if result is None:
+            return -1
+        atoms, elements = result
+        locations = atoms["location"].tolist()
+        atom_elements = atoms["element"].tolist()
+
+    for i in order:
+        if i == -1:
+            # Append the TER into the list. Material remains empty so far.
+            # 2019-03-14, New
+            all_atoms.append(AtomProp("TER",
+                                      "TER",
+                                      Vector((0,0,0)),
+                                      0.0,
+                                      [0,0,0, 0],[]))
+        else:
+            short_name, name, radius, color = elements[atom_elements[i]]
             # Append the atom to the list. Material remains empty so far.
             all_atoms.append(AtomProp(short_name,
                                       name,
-                                      location,
+                                      Vector(locations[i]),
                                       radius,
                                       color,[]))
 
-        line = filepath_pdb_p.readline()
-        line = line[:-1]
-
-    filepath_pdb_p.close()
-    # From above it can be clearly seen that j is now the number of all atoms.
-    Number_of_total_atoms = j
+    # The number of all atoms.
+    Number_of_total_atoms = len(atom_lines)
 
     return (Number_of_total_atoms, all_atoms)
 
@@ -360,6 +417,8 @@ def read_pdb_file_sticks(filepath_pdb, use_sticks_bonds, all_atoms):
 
     Number_of_sticks = 0
     sticks_double = 0
+    # The atom pairs of all sticks, in both orders.
+    stick_pairs = set()
     j = 0
     # This is in fact an endless while loop, ...
     while j > -1:
@@ -443,19 +502,13 @@ def read_pdb_file_sticks(filepath_pdb, use_sticks_bonds, all_atoms):
             # Note that in a PDB file, sticks of one atom pair can appear a
             # couple of times. (Only god knows why ...)
             # So, does a stick between the considered atoms already exist?
-            FLAG_BAR = False
-            for k in range(Number_of_sticks):
-                if ((all_sticks[k].atom1 == atom1 and all_sticks[k].atom2 == atom2) or
-                    (all_sticks[k].atom2 == atom1 and all_sticks[k].atom1 == atom2)):
-                    sticks_double += 1
-                    # If yes, then FLAG on 'True'.
-                    FLAG_BAR       = True
-                    break
-
-            # If the stick is not yet registered (FLAG_BAR == False), then
-            # register it!
-            if FLAG_BAR == False:
+            if (atom1, atom2) in stick_pairs:
+                sticks_double += 1
+            # If the stick is not yet registered, then register it!
+            else:
                 all_sticks.append(StickProp(atom1,atom2,number,dist_n))
+                stick_pairs.add((atom1, atom2))
+                stick_pairs.add((atom2, atom1))
                 Number_of_sticks += 1
                 j += 1
 
@@ -641,12 +694,12 @@ def draw_atoms_one_type(draw_all_atoms_type,
                         collection_molecule):
 
     # Create the vertices composed of the coordinates of all atoms of one type
-    atom_vertices = []
-    for atom in draw_all_atoms_type:
-        # In fact, the object is created in the World's origin.
-        # This is why 'object_center_vec' is subtracted. At the end
-        # the whole object is translated back to 'object_center_vec'.
-        atom_vertices.append(atom[2] - object_center_vec)
+    # In fact, the object is created in the World's origin.
+    # This is why 'object_center_vec' is subtracted. At the end
+    # the whole object is translated back to 'object_center_vec'.
+    atom_vertices = np.array([atom[2] for atom in draw_all_atoms_type])
+    atom_vertices -= np.array(object_center_vec)
+    atom = draw_all_atoms_type[-1]
 
     # IMPORTANT: First, we create a collection of the element, which contains
     # the atoms (balls + mesh) AND the sticks! The definition dealing with the
@@ -669,7 +722,8 @@ def draw_atoms_one_type(draw_all_atoms_type,
 
     # Build the mesh
     atom_mesh = bpy.data.meshes.new("Mesh_"+atom[0])
-    atom_mesh.from_pydata(atom_vertices, [], [])
+    atom_mesh.vertices.add(len(atom_vertices))
+    atom_mesh.vertices.foreach_set("co", atom_vertices.astype(np.float32).ravel())
     atom_mesh.update()
     new_atom_mesh = bpy.data.objects.new(atom[0] + "_mesh", atom_mesh)
 
@@ -1306,16 +1360,12 @@ def import_pdb(Ball_type,
     # here. It is used for building the material properties for
     # instance (see below).
     atom_all_types_list = []
+    atom_all_types_names = set()
 
     for atom in all_atoms:
-        FLAG_FOUND = False
-        for atom_type in atom_all_types_list:
-            # If the atom name is already in the list, FLAG on 'True'.
-            if atom_type[0] == atom.name:
-                FLAG_FOUND = True
-                break
         # No name in the current list has been found? => New entry.
-        if FLAG_FOUND == False:
+        if atom.name not in atom_all_types_names:
+            atom_all_types_names.add(atom.name)
             # Stored are: Atom label (e.g. 'Na'), the corresponding atom
             # name (e.g. 'Sodium') and its color.
             atom_all_types_list.append([atom.name, atom.element, atom.color])
@@ -1337,17 +1387,18 @@ def import_pdb(Ball_type,
         material.name = atom_type[0]
         atom_material_list.append(material)
 
-    # Now, we go through all atoms and give them a material. For all atoms ...
-    for atom in all_atoms:
+    # Now, we find the material of each type of atom. For all types ...
+    atom_type_materials = {}
+    for atom_type in atom_all_types_list:
         # ... and all materials ...
         for material in atom_material_list:
-            # ... select the correct material for the current atom via
+            # ... select the correct material for the current type via
             # comparison of names ...
-            if atom.name in material.name:
-                # ... and give the atom its material properties.
+            if atom_type[0] in material.name:
+                # ... and give the type its material properties.
                 # However, before we check if it is a vacancy.
                 # The vacancy is represented by a transparent cube.
-                if atom.name == "Vacancy":
+                if atom_type[0] == "Vacancy":
                     # For cycles and eevee.
                     material.use_nodes = True
                     mat_P_BSDF = material.node_tree.nodes['Principled BSDF']
@@ -1363,8 +1414,13 @@ def import_pdb(Ball_type,
                     material.blend_method = 'HASHED'
                     material.shadow_method = 'HASHED'
                     material.use_backface_culling = False
-                # The atom gets its properties.
-                atom.material = material
+                # The type gets its properties.
+                atom_type_materials[atom_type[0]] = material
+
+    # All atoms of one type get the material of the type.
+    for atom in all_atoms:
+        if atom.name in atom_type_materials:
+            atom.material = atom_type_materials[atom.name]
 
     # ------------------------------------------------------------------------
     # READING DATA OF STICKS
@@ -1429,6 +1485,15 @@ def import_pdb(Ball_type,
     # Go through the list which contains all types of atoms. It is the list,
     # which has been created on the top during reading the PDB file.
     # Example: atom_all_types_list = ["hydrogen", "carbon", ...]
+    # The draw lists, which contain all atoms of one type (e.g. all
+    # hydrogens), are filled in one pass through all atoms.
+    draw_atoms_of_type = {}
+    for atom in all_atoms:
+        draw_atoms_of_type.setdefault(atom.name, []).append([atom.name,
+                                                             atom.material,
+                                                             atom.location,
+                                                             atom.radius])
+
     draw_all_atoms = []
     for atom_type in atom_all_types_list:
 
@@ -1436,22 +1501,8 @@ def import_pdb(Ball_type,
         if atom_type[0] == "TER":
             continue
 
-        # This is the draw list, which contains all atoms of one type (e.g.
-        # all hydrogens) ...
-        draw_all_atoms_type = []
-
-        # Go through all atoms ...
-        for atom in all_atoms:
-            # ... select the atoms of the considered type via comparison ...
-            if atom.name == atom_type[0]:
-                # ... and append them to the list 'draw_all_atoms_type'.
-                draw_all_atoms_type.append([atom.name,
-                                            atom.material,
-                                            atom.location,
-                                            atom.radius])
-
         # Now append the atom list to the list of all types of atoms
-        draw_all_atoms.append(draw_all_atoms_type)
+        draw_all_atoms.append(draw_atoms_of_type[atom_type[0]])
 
     # ------------------------------------------------------------------------
     # COLLECTION
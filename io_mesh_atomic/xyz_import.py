@@ -2,6 +2,7 @@
 
 import os
 import bpy
+import numpy as np
 from math import pi, sqrt
 from mathutils import Vector, Matrix
 
@@ -198,6 +199,8 @@ def read_xyz_file(filepath_xyz,radiustype):
 
     number_frames = 0
     total_number_atoms = 0
+    # Element properties of each atom label found in the file
+    labels = {}
 
     # Open the file ...
     filepath_xyz_p = open(filepath_xyz, "r")
@@ -243,35 +246,43 @@ def read_xyz_file(filepath_xyz,radiustype):
                 split_list = line.rsplit()
                 short_name = str(split_list[0])
 
-                # Go through all elements and find the element of the current atom.
-                FLAG_FOUND = False
-                for element in ELEMENTS:
-                    if str.upper(short_name) == str.upper(element.short_name):
-                        # Give the atom its proper name, color and radius:
-                        name = element.name
-                        # int(radiustype) => type of radius:
-                        # pre-defined (0), atomic (1) or van der Waals (2)
-                        radius = float(element.radii[int(radiustype)])
-                        color = element.color
-                        FLAG_FOUND = True
-                        break
+                # The element of each label is searched only once.
+                if short_name in labels:
+                    short_name, name, radius, color = labels[short_name]
+                else:
+                    label = short_name
+
+                    # Go through all elements and find the element of the current atom.
+                    FLAG_FOUND = False
+                    for element in ELEMENTS:
+                        if str.upper(short_name) == str.upper(element.short_name):
+                            # Give the atom its proper name, color and radius:
+                            name = element.name
+                            # int(radiustype) => type of radius:
+                            # pre-defined (0), atomic (1) or van der Waals (2)
+                            radius = float(element.radii[int(radiustype)])
+                            color = element.color
+                            FLAG_FOUND = True
+                            break
 
-                # Is it a vacancy or an 'unknown atom' ?
-                if FLAG_FOUND == False:
-                    # Give this atom also a name. If it is an 'X' then it is a
-                    # vacancy. Otherwise ...
-                    if "X" in short_name:
-                        short_name = "VAC"
-                        name = "Vacancy"
-                        radius = float(ELEMENTS[-3].radii[int(radiustype)])
-                        color = ELEMENTS[-3].color
-                    # ... take what is written in the xyz file. These are somewhat
-                    # unknown atoms. This should never happen, the element list is
-                    # almost complete. However, we do this due to security reasons.
-                    else:
-                        name = str.upper(short_name)
-                        radius = float(ELEMENTS[-2].radii[int(radiustype)])
-                        color = ELEMENTS[-2].color
+                    # Is it a vacancy or an 'unknown atom' ?
+                    if FLAG_FOUND == False:
+                        # Give this atom also a name. If it is an 'X' then it is a
+                        # vacancy. Otherwise ...
+                        if "X" in short_name:
+                            short_name = "VAC"
+                            name = "Vacancy"
+                            radius = float(ELEMENTS[-3].radii[int(radiustype)])
+                            color = ELEMENTS[-3].color
+                        # ... take what is written in the xyz file. These are somewhat
+                        # unknown atoms. This should never happen, the element list is
+                        # almost complete. However, we do this due to security reasons.
+                        else:
+                            name = str.upper(short_name)
+                            radius = float(ELEMENTS[-2].radii[int(radiustype)])
+                            color = ELEMENTS[-2].color
+
+                    labels[label] = (short_name, name, radius, color)
 
                 x = float(split_list[1])
                 y = float(split_list[2])
@@ -297,31 +308,23 @@ def read_xyz_file(filepath_xyz,radiustype):
 
                 elements = []
                 for atom in all_atoms:
-                    FLAG_FOUND = False
-                    for element in elements:
-                        # If the atom name is already in the list,
-                        # FLAG on 'True'.
-                        if element == atom[1]:
-                            FLAG_FOUND = True
-                            break
                     # No name in the current list has been found? => New entry.
-                    if FLAG_FOUND == False:
+                    if atom[1] not in elements:
                         # Stored are: Atom label (e.g. 'Na'), the corresponding
                         # atom name (e.g. 'Sodium') and its color.
                         elements.append(atom[1])
 
-            # Sort the atoms: create lists of atoms of one type
-            structure = []
-            for element in elements:
-                atoms_one_type = []
-                for atom in all_atoms:
-                    if atom[1] == element:
-                        atoms_one_type.append(AtomProp(atom[0],
-                                                       atom[1],
-                                                       atom[2],
-                                                       atom[3],
-                                                       atom[4],[]))
-                structure.append(atoms_one_type)
+            # Sort the atoms: create lists of atoms of one type, in one pass
+            # through all atoms
+            atoms_of_type = {element: [] for element in elements}
+            for atom in all_atoms:
+                if atom[1] in atoms_of_type:
+                    atoms_of_type[atom[1]].append(AtomProp(atom[0],
+                                                           atom[1],
+                                                           atom[2],
+                                                           atom[3],
+                                                           atom[4],[]))
+            structure = [atoms_of_type[element] for element in elements]
 
             ALL_FRAMES.append(structure)
             number_frames += 1
@@ -752,13 +755,21 @@ def build_frames(frame_delta, frame_skip):
 
             for elements_frame, elements_structure in zip(frame,STRUCTURE):
 
-                key = elements_structure.shape_key_add()
-
-                for atom_frame, atom_structure in zip(elements_frame, key.data):
-
-                    atom_structure.co = (atom_frame.location
-                                       - elements_structure.location)
-
+                key = elements_structure.shape_key_add(from_mix=False)
+
+                # All positions of the key are written at once. If the
+                # frame has less atoms, the remaining ones stay at the basis.
+                number_atoms = min(len(elements_frame), len(key.data))
+                co = np.empty(len(key.data) * 3, dtype=np.float32)
+                if number_atoms < len(key.data):
+                    key.data.foreach_get("co", co)
+                co[:number_atoms * 3] = (
+                    np.array([atom_frame.location
+                              for atom_frame in elements_frame[:number_atoms]])
+                    - np.array(elements_structure.location)).ravel()
+                key.data.foreach_set("co", co)
+
+                atom_frame = elements_frame[number_atoms - 1]
                 key.name = atom_frame.name + "_frame_" + str(i)
 
             i += 1
@@ -768,34 +779,61 @@ def build_frames(frame_delta, frame_skip):
     scn.frame_start = 0
     scn.frame_end = frame_delta * num_frames
 
-    # Manage the values of the keys
-    for element in STRUCTURE:
-
-        scn.frame_current = 0
-
-        element.data.shape_keys.key_blocks[1].value = 1.0
-        element.data.shape_keys.key_blocks[2].value = 0.0
-        element.data.shape_keys.key_blocks[1].keyframe_insert("value")
-        element.data.shape_keys.key_blocks[2].keyframe_insert("value")
-
-        scn.frame_current += frame_delta
+    # Manage the values of the keys: the key of each frame is 1 at its own
+    # frame and 0 at the frame before and after. All keyframes of a key are
+    # written at once, with the interpolation and handle type of new keys in
+    # the preferences, as keyframe_insert() does.
+    keyframe = bpy.types.Keyframe.bl_rna.properties
+    preferences = bpy.context.preferences.edit
+    interpolation = keyframe['interpolation'].enum_items[
+                        preferences.keyframe_new_interpolation_type].value
+    handle_type = keyframe['handle_left_type'].enum_items[
+                        preferences.keyframe_new_handle_type].value
 
-        number = 0
-
-        for number in range(num_frames)[2:]:#-1]:
-
-            element.data.shape_keys.key_blocks[number-1].value = 0.0
-            element.data.shape_keys.key_blocks[number].value = 1.0
-            element.data.shape_keys.key_blocks[number+1].value = 0.0
-            element.data.shape_keys.key_blocks[number-1].keyframe_insert("value")
-            element.data.shape_keys.key_blocks[number].keyframe_insert("value")
-            element.data.shape_keys.key_blocks[number+1].keyframe_insert("value")
-
-            scn.frame_current += frame_delta
-
-        number += 1
+    for element in STRUCTURE:
 
-        element.data.shape_keys.key_blocks[number].value = 1.0
-        element.data.shape_keys.key_blocks[number-1].value = 0.0
-        element.data.shape_keys.key_blocks[number].keyframe_insert("value")
-        element.data.shape_keys.key_blocks[number-1].keyframe_insert("value")
+        shape_keys = element.data.shape_keys
+        if shape_keys.animation_data is None:
+            shape_keys.animation_data_create()
+        if shape_keys.animation_data.action is None:
+            shape_keys.animation_data.action = bpy.data.actions.new(
+                                                    shape_keys.name + "Action")
+        action = shape_keys.animation_data.action
+
+        for number in range(1, num_frames + 1):
+
+            key_block = shape_keys.key_blocks[number]
+            key_block.value = 1.0 if number == num_frames else 0.0
+
+            frames = [frame_delta * (number - 1)]
+            values = [1.0]
+            if number > 1:
+                frames.insert(0, frame_delta * (number - 2))
+                values.insert(0, 0.0)
+            if number < num_frames:
+                frames.append(frame_delta * number)
+                values.append(0.0)
+
+            data_path = key_block.path_from_id("value")
+            fcurve = action.fcurves.find(data_path)
+            if fcurve is None:
+                fcurve = action.fcurves.new(data_path)
+            else:
+                # The action already has keys of this shape key, replace them
+                # instead of doubling them.
+                fcurve.keyframe_points.clear()
+            keyframe_points = fcurve.keyframe_points
+            keyframe_points.add(len(frames))
+            co = np.column_stack((frames, values)).astype(np.float32)
+            keyframe_points.foreach_set("co", co.ravel())
+            # The handles one frame to each side, as keyframe_insert() puts them.
+            for prop, offset in (("handle_left", -1.0), ("handle_right", 1.0)):
+                keyframe_points.foreach_set(prop,
+                        (co + np.array((offset, 0.0), dtype=np.float32)).ravel())
+            for prop, setting in (("interpolation", interpolation),
+                                  ("handle_left_type", handle_type),
+                                  ("handle_right_type", handle_type)):
+                keyframe_points.foreach_set(prop, [setting] * len(frames))
+            fcurve.update()
+
+    scn.frame_current = frame_delta * (num_frames - 1)
@@ -20,6 +20,8 @@ if "bpy" in locals():
     import importlib
     if "export_uv_eps" in locals():
         importlib.reload(export_uv_eps)
+    if "uv_rasterizer" in locals():
+        importlib.reload(uv_rasterizer)
     if "export_uv_png" in locals():
         importlib.reload(export_uv_png)
     if "export_uv_svg" in locals():
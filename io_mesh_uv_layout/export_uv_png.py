@@ -2,13 +2,24 @@
 
 import bpy
 import gpu
+import numpy as np
 from mathutils import Vector, Matrix
 from mathutils.geometry import tessellate_polygon
 from gpu_extras.batch import batch_for_shader
 
+from . import uv_rasterizer
+
 
 def export(filepath, face_data, colors, width, height, opacity):
-    offscreen = gpu.types.GPUOffScreen(width, height)
+    try:
+        offscreen = gpu.types.GPUOffScreen(width, height)
+    except (SystemError, RuntimeError):
+        # no GPU context, e.g. in background mode: draw the image with numpy instead
+        triangles = [tessellate_uvs(uvs) for uvs, _ in face_data]
+        pixel_data = uv_rasterizer.rasterize(face_data, triangles, width, height, opacity)
+        save_pixels(filepath, pixel_data, width, height)
+        return
+
     offscreen.bind()
 
     try:
@@ -92,6 +103,6 @@ def draw_lines(face_data):
 def save_pixels(filepath, pixel_data, width, height):
     image = bpy.data.images.new("temp", width, height, alpha=True)
     image.filepath = filepath
-    image.pixels = [v / 255 for v in pixel_data]
+    image.pixels.foreach_set(np.asarray(pixel_data, dtype=np.float32) / 255)
     image.save()
     bpy.data.images.remove(image)
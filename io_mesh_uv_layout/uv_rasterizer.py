@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import numpy as np
+
+# lines are drawn in pieces of at most this length in pixels, LINE_CHUNK_SIZE pieces at a time
+LINE_PIECE_LENGTH = 8
+LINE_CHUNK_SIZE = 4096
+
+
+def rasterize(face_data, triangles, width, height, opacity):
+    """
+    Draws the same image as the offscreen rendering of export_uv_png, without a GPU:
+    filled faces blended with `opacity` and antialiased black edges of 1 pixel width.
+    `triangles` holds the tessellation (index triples into the uvs) of every face.
+    Returns a flat uint8 array of RGBA values, starting with the bottom row like the
+    framebuffer it replaces.
+    """
+    image = np.zeros((height, width, 4), dtype=np.float32)
+    size = np.array((width, height), dtype=np.float64)
+
+    for (uvs, color), face_triangles in zip(face_data, triangles):
+        points = np.array(uvs, dtype=np.float64).reshape(-1, 2) * size
+        fill_polygon(image, points, face_triangles, color, opacity)
+
+    starts = []
+    ends = []
+    for uvs, _ in face_data:
+        starts.extend(uvs)
+        ends.extend(uvs[1:])
+        ends.append(uvs[0])
+    if starts:
+        draw_lines(image, np.array(starts, dtype=np.float64) * size, np.array(ends, dtype=np.float64) * size)
+
+    return np.rint(image * 255).astype(np.uint8).ravel()
+
+
+def pixel_centers(image, lower, upper):
+    """
+    Pixel center coordinates of the part of `image` covering the box [lower, upper],
+    as (x0, y0, xs, ys) with xs and ys as row and column vectors, or None if it is empty.
+    """
+    height, width = image.shape[:2]
+    x0 = max(int(np.ceil(lower[0] - 0.5)), 0)
+    y0 = max(int(np.ceil(lower[1] - 0.5)), 0)
+    x1 = min(int(np.floor(upper[0] - 0.5)) + 1, width)
+    y1 = min(int(np.floor(upper[1] - 0.5)) + 1, height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    xs = np.arange(x0, x1, dtype=np.float64)[np.newaxis, :] + 0.5
+    ys = np.arange(y0, y1, dtype=np.float64)[:, np.newaxis] + 0.5
+    return x0, y0, xs, ys
+
+
+def blend(image, x0, y0, color, alpha):
+    """Alpha blending of `color` with a per pixel `alpha` over the image block at (x0, y0)"""
+    block = image[y0:y0 + alpha.shape[0], x0:x0 + alpha.shape[1]]
+    alpha = alpha[..., np.newaxis]
+    block[..., :3] = np.asarray(color[:3], dtype=np.float32) * alpha + block[..., :3] * (1 - alpha)
+    block[..., 3:] = alpha + block[..., 3:] * (1 - alpha)
+
+
+def fill_polygon(image, points, triangles, color, opacity):
+    area = pixel_centers(image, points.min(axis=0), points.max(axis=0))
+    if area is None:
+        return
+    x0, y0, xs, ys = area
+
+    # union of the triangles, to blend the face only once where they share an edge
+    inside = np.zeros((ys.shape[0], xs.shape[1]), dtype=bool)
+    for triangle in triangles:
+        a, b, c = points[list(triangle)]
+        edges = [(p[0], p[1], q[0] - p[0], q[1] - p[1]) for p, q in ((a, b), (b, c), (c, a))]
+        if edges[0][2] * edges[1][3] - edges[0][3] * edges[1][2] == 0:
+            continue  # degenerate triangle
+        # edge functions, a pixel center is inside if all of them have the same sign
+        sides = [(xs - px) * dy - (ys - py) * dx for px, py, dx, dy in edges]
+        inside |= ((sides[0] >= 0) & (sides[1] >= 0) & (sides[2] >= 0)) | \
+                  ((sides[0] <= 0) & (sides[1] <= 0) & (sides[2] <= 0))
+
+    blend(image, x0, y0, color, inside * np.float32(opacity))
+
+
+def draw_lines(image, starts, ends):
+    """
+    Antialiased black lines of 1 pixel width, the coverage falls off linearly from the
+    segment to one pixel away from it.
+    Blending black is a multiplication with 1 - coverage, so the order of the segments
+    does not matter: the segments are split in short pieces covering a small block of
+    pixels each, and all pieces are drawn at once, a chunk at a time.
+    """
+    height, width = image.shape[:2]
+    direction = ends - starts
+    length_sq = (direction * direction).sum(axis=1)
+    # a pixel counts for the piece its projection on the segment falls in
+    piece_counts = np.maximum(np.ceil(np.sqrt(length_sq) / LINE_PIECE_LENGTH), 1).astype(np.int64)
+    segments = np.repeat(np.arange(len(starts)), piece_counts)
+    pieces = np.arange(len(segments)) - np.repeat(np.cumsum(piece_counts) - piece_counts, piece_counts)
+
+    block = np.arange(LINE_PIECE_LENGTH + 3)
+    transmittance = np.ones((height, width), dtype=np.float32)
+    for chunk in range(0, len(segments), LINE_CHUNK_SIZE):
+        segment = segments[chunk:chunk + LINE_CHUNK_SIZE]
+        piece = pieces[chunk:chunk + LINE_CHUNK_SIZE]
+        count = piece_counts[segment]
+        start = starts[segment]
+        vector = direction[segment]
+        lower = np.minimum(start + vector * (piece / count)[:, np.newaxis],
+                           start + vector * ((piece + 1) / count)[:, np.newaxis])
+        x0, y0 = np.ceil(lower - 1.5).astype(np.int64).T
+
+        shape = (len(segment), len(block), len(block))
+        xs = np.broadcast_to(x0[:, np.newaxis, np.newaxis] + block[np.newaxis, np.newaxis, :], shape)
+        ys = np.broadcast_to(y0[:, np.newaxis, np.newaxis] + block[np.newaxis, :, np.newaxis], shape)
+        dx = xs + 0.5 - start[:, 0, np.newaxis, np.newaxis]
+        dy = ys + 0.5 - start[:, 1, np.newaxis, np.newaxis]
+        dir_x = vector[:, 0, np.newaxis, np.newaxis]
+        dir_y = vector[:, 1, np.newaxis, np.newaxis]
+        t = (dx * dir_x + dy * dir_y) / np.maximum(length_sq[segment], 1e-300)[:, np.newaxis, np.newaxis]
+        t = np.clip(t, 0, 1)
+        dx = dx - t * dir_x
+        dy = dy - t * dir_y
+        coverage = 1 - np.sqrt(dx * dx + dy * dy)
+
+        count = count[:, np.newaxis, np.newaxis]
+        visible = (coverage > 0) & \
+                  (np.minimum(np.floor(t * count), count - 1) == piece[:, np.newaxis, np.newaxis]) & \
+                  (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        np.multiply.at(transmittance, (ys[visible], xs[visible]), (1 - coverage[visible]).astype(np.float32))
+
+    image[..., :3] *= transmittance[..., np.newaxis]
+    image[..., 3] = 1 - (1 - image[..., 3]) * transmittance
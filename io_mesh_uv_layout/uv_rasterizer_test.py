@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+if __name__ == '__main__':
+    from uv_rasterizer import rasterize
+else:
+    from .uv_rasterizer import rasterize
+import unittest
+
+import numpy as np
+
+SIZE = 64
+
+
+def grid_faces(count, lower, upper):
+    """ count x count quads covering the UV square [lower, upper], with distinct colors. """
+    step = (upper - lower) / count
+    face_data = []
+    for i in range(count):
+        for j in range(count):
+            u, v = lower + i * step, lower + j * step
+            uvs = ((u, v), (u + step, v), (u + step, v + step), (u, v + step))
+            face_data.append((uvs, ((i + 1) / count, (j + 1) / count, 0.5)))
+    return face_data
+
+
+def quad_triangles(face_data):
+    return [((0, 1, 2), (0, 2, 3))] * len(face_data)
+
+
+def as_image(pixel_data, width=SIZE, height=SIZE):
+    return pixel_data.reshape(height, width, 4).astype(np.float64) / 255
+
+
+class RasterizeTest(unittest.TestCase):
+    def test_empty(self):
+        pixel_data = rasterize([], [], 8, 4, 1.0)
+        self.assertEqual(pixel_data.dtype, np.uint8)
+        self.assertEqual(pixel_data.shape, (8 * 4 * 4,))
+        self.assertFalse(pixel_data.any())
+
+    def test_grid(self):
+        count, lower, upper, opacity = 4, 0.25, 0.75, 0.5
+        face_data = grid_faces(count, lower, upper)
+        image = as_image(rasterize(face_data, quad_triangles(face_data), SIZE, SIZE, opacity))
+
+        centers = np.arange(SIZE) + 0.5
+        lines = np.linspace(lower, upper, count + 1) * SIZE
+        distance = np.abs(centers[:, np.newaxis] - lines).min(axis=1)
+        cell = np.clip(((centers / SIZE - lower) / (upper - lower) * count).astype(int), 0, count - 1)
+        outside = (centers < lines[0] - 1) | (centers > lines[-1] + 1)
+
+        for y in range(SIZE):
+            for x in range(SIZE):
+                pixel = image[y, x]
+                if outside[x] or outside[y]:
+                    self.assertEqual(pixel[3], 0.0)
+                elif distance[x] >= 1 and distance[y] >= 1:
+                    # face interior, the rows of the image start at v = 0
+                    color = np.array(face_data[cell[x] * count + cell[y]][1]) * opacity
+                    np.testing.assert_allclose(pixel, (*color, opacity), atol=1 / 255)
+                elif min(distance[x], distance[y]) <= 0.5:
+                    # on a UV edge
+                    self.assertLess(pixel[:3].max(), 0.5)
+                    self.assertGreaterEqual(pixel[3], 0.5)
+
+    def test_concave_polygon(self):
+        # L shape, the notch in the upper right quarter stays empty
+        uvs = ((0.0, 0.0), (1.0, 0.0), (1.0, 0.5), (0.5, 0.5), (0.5, 1.0), (0.0, 1.0))
+        triangles = [((0, 1, 2), (0, 2, 3), (0, 3, 4), (0, 4, 5))]
+        image = as_image(rasterize([(uvs, (1.0, 1.0, 1.0))], triangles, SIZE, SIZE, 1.0))
+        self.assertFalse(image[SIZE // 2 + 2:, SIZE // 2 + 2:].any())
+        self.assertTrue((image[2:SIZE // 2 - 2, 2:SIZE - 2] == 1.0).all())
+        self.assertTrue((image[2:SIZE - 2, 2:SIZE // 2 - 2] == 1.0).all())
+
+    def test_non_square_image(self):
+        face_data = grid_faces(1, 0.0, 1.0)
+        image = as_image(rasterize(face_data, quad_triangles(face_data), 32, 8, 1.0), 32, 8)
+        self.assertTrue((image[2:-2, 2:-2, 3] == 1.0).all())
+
+    def test_uvs_outside_image(self):
+        face_data = grid_faces(2, -1.0, 2.0)
+        image = as_image(rasterize(face_data, quad_triangles(face_data), SIZE, SIZE, 1.0))
+        self.assertTrue((image[..., 3] == 1.0).all())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -9,6 +9,8 @@ import math
 from math import sin, cos, pi
 from itertools import chain
 
+import numpy as np
+
 texture_cache = {}
 material_cache = {}
 
@@ -45,6 +47,20 @@ def imageConvertCompat(path):
 
 # =============================== VRML Specific
 
+def array_as_numpy(array_string):
+    """
+    Convert a list of number strings at once: integers if all of them are,
+    floats otherwise. Returns None if numpy can't parse some of them.
+    """
+    for dtype in (np.int64, np.float64):
+        try:
+            return np.array(array_string, dtype=dtype)
+        except (ValueError, OverflowError):
+            pass
+
+    return None
+
+
 def vrml_split_fields(value):
     """
     key 0.0 otherkey 1,2,3 opt1 opt1 0.0
@@ -801,10 +817,22 @@ class vrmlNode(object):
             if not data_split:
                 return []
 
-            array_data = array_as_number(data_split)
+            child_array = data_split
+
+        if type(child_array) == list:
+            # x3d creates these, they are flat
+            values = array_as_numpy(child_array)
+            if values is not None:
+                if group <= 0:
+                    return values.tolist()
+
+                remaining = len(values) % group
+                if remaining:
+                    print('\twarning, array was not aligned to requested grouping', group,
+                          'remaining value', values[-remaining:].tolist())
+                    values = values[:-remaining]
+                return values.reshape(-1, group).tolist()
 
-        elif type(child_array) == list:
-            # x3d creates these
             array_data = array_as_number(child_array)
         else:
             # print(child_array)
@@ -855,6 +883,24 @@ class vrmlNode(object):
 
         return new_array
 
+    def getFieldAsNumpyArray(self, field, dtype, ancestry):
+        """
+        Same as getFieldAsArray(field, 0, ancestry), as a flat numpy array
+        """
+
+        self_real = self.getRealNode()  # in case we're an instance
+
+        child_array = self_real.getFieldName(field, ancestry, True, SPLIT_COMMAS=True)
+        if child_array is None:
+            child_array = self.getFieldName(field, ancestry, SPLIT_COMMAS=True)
+
+        if type(child_array) == list:
+            values = array_as_numpy(child_array)
+            if values is not None:
+                return values.astype(dtype, copy=False)
+
+        return np.array(self.getFieldAsArray(field, 0, ancestry), dtype=dtype)
+
     def getFieldAsStringArray(self, field, ancestry):
         """
         Get a list of strings
@@ -1256,7 +1302,7 @@ def gzipOpen(path):
 
     if data is None:
         try:
-            filehandle = open(path, 'rU', encoding='utf-8', errors='surrogateescape')
+            filehandle = open(path, 'r', encoding='utf-8', errors='surrogateescape')
             data = filehandle.read()
             filehandle.close()
         except:
@@ -1696,6 +1742,11 @@ def importMesh_ApplyTextureToLoops(bpymesh, loops):
     d.foreach_set('uv', loops)
 
 
+def as_rows(values, size):
+    # Same grouping as getFieldAsArray, an incomplete last row is dropped
+    return values[:len(values) // size * size].reshape(-1, size)
+
+
 def flip(r, ccw):
     return r if ccw else r[::-1]
 
@@ -1884,149 +1935,124 @@ def importMesh_IndexedFaceSet(geom, ancestry):
     coord = geom.getChildBySpec('Coordinate')
     if coord.reference:
         points = coord.getRealNode().parsed
-        # We need unflattened coord array here, while
+        # We need an (n, 3) coord array here, while
         # importMesh_ReadVertices uses flattened. Can't cache both :(
         # TODO: resolve that somehow, so that vertex set can be effectively
         # reused between different mesh types?
     else:
-        points = coord.getFieldAsArray('point', 3, ancestry)
+        points = as_rows(coord.getFieldAsNumpyArray('point', np.float64, ancestry), 3)
         if coord.canHaveReferences():
             coord.parsed = points
-    index = geom.getFieldAsArray('coordIndex', 0, ancestry)
-
-    while index and index[-1] == -1:
-        del index[-1]
-
-    if len(points) >= 2 * len(index):  # Need to cull
-        culled_points = []
-        cull = {}  # Maps old vertex indices to new ones
-        uncull = []  # Maps new indices to the old ones
-        new_index = 0
-    else:
-        uncull = cull = None
-
-    faces = []
-    face = []
-    # Generate faces. Cull the vertices if necessary,
-    for i in index:
-        if i == -1:
-            if face:
-                faces.append(flip(face, ccw))
-            face = []
-        else:
-            if cull is not None:
-                if not(i in cull):
-                    culled_points.append(points[i])
-                    cull[i] = new_index
-                    uncull.append(i)
-                    i = new_index
-                    new_index += 1
-                else:
-                    i = cull[i]
-            face.append(i)
-    if face:
-        faces.append(flip(face, ccw))  # The last face
-
-    if cull:
-        points = culled_points
+    index = geom.getFieldAsNumpyArray('coordIndex', np.int64, ancestry)
+
+    # Trailing separators don't end a face
+    used_positions = np.flatnonzero(index != -1)
+    index = index[:used_positions[-1] + 1 if len(used_positions) else 0]
+
+    # Generate faces: split the index at the -1 separators, empty faces
+    # are skipped. Faces are flat arrays of loop values from here on,
+    # described by their start and length.
+    is_vertex = index != -1
+    verts = index[is_vertex]
+    face_ids = np.cumsum(~is_vertex)[is_vertex]
+    loop_total = np.unique(face_ids, return_counts=True)[1]
+    loop_start = np.cumsum(loop_total) - loop_total
+    num_loops = len(verts)
+    num_faces = len(loop_total)
+
+    # Position of each loop in its face, reversed if the face is flipped
+    loop_offset = np.arange(num_loops) - np.repeat(loop_start, loop_total)
+    if not ccw:
+        loop_offset = np.repeat(loop_total - 1, loop_total) - loop_offset
+    loop_order = np.repeat(loop_start, loop_total) + loop_offset
+
+    uncull = None
+    if len(points) >= 2 * len(index) and num_loops:  # Need to cull
+        # New vertex indices follow the order of first use
+        used, first_use, verts = np.unique(verts, return_index=True, return_inverse=True)
+        order = np.argsort(first_use)
+        uncull = used[order]  # Maps new indices to the old ones
+        cull = np.empty(len(used), dtype=np.int64)  # Maps old vertex indices to new ones
+        cull[order] = np.arange(len(used))
+        verts = cull[verts.ravel()]
+        points = points[uncull]
+
+    verts = verts[loop_order]
 
     bpymesh = bpy.data.meshes.new(name="IndexedFaceSet")
-    bpymesh.from_pydata(points, [], faces)
+    bpymesh.vertices.add(len(points))
+    bpymesh.vertices.foreach_set("co", points.astype(np.float32).ravel())
+    bpymesh.loops.add(num_loops)
+    bpymesh.loops.foreach_set("vertex_index", verts.astype(np.int32))
+    bpymesh.polygons.add(num_faces)
+    bpymesh.polygons.foreach_set("loop_start", loop_start.astype(np.int32))
+    bpymesh.polygons.foreach_set("loop_total", loop_total.astype(np.int32))
     # No validation here. It throws off the per-face stuff.
 
     # Similar treatment for normal and color indices
+    loop_faces = np.repeat(np.arange(num_faces), loop_total)
 
     def processPerVertexIndex(ind):
-        if ind:
-            # Deflatten into an array of arrays by face; the latter might
-            # need to be flipped
-            i = 0
-            verts_by_face = []
-            for f in faces:
-                verts_by_face.append(flip(ind[i:i + len(f)], ccw))
-                i += len(f) + 1
-            return verts_by_face
-        elif uncull:
-            return [[uncull[v] for v in f] for f in faces]
+        if len(ind):
+            # Each face takes its length plus one separator in the
+            # per-vertex index; the faces might need to be flipped
+            face_start = loop_start + np.arange(num_faces)
+            return ind[np.repeat(face_start, loop_total) + loop_offset]
+        elif uncull is not None:
+            return uncull[verts]
         else:
-            return faces  # Reuse coordIndex, as per the spec
+            return verts  # Reuse coordIndex, as per the spec
 
     # Normals
     normals = geom.getChildBySpec('Normal')
     if normals:
         per_vertex = geom.getFieldAsBool('normalPerVertex', True, ancestry)
-        vectors = normals.getFieldAsArray('vector', 3, ancestry)
-        normal_index = geom.getFieldAsArray('normalIndex', 0, ancestry)
+        vectors = as_rows(normals.getFieldAsNumpyArray('vector', np.float64, ancestry), 3)
+        normal_index = geom.getFieldAsNumpyArray('normalIndex', np.int64, ancestry)
         if per_vertex:
-            co = [co for f in processPerVertexIndex(normal_index)
-                     for v in f
-                     for co in vectors[v]]
-            bpymesh.vertices.foreach_set("normal", co)
+            co = vectors[processPerVertexIndex(normal_index)]
+            bpymesh.vertices.foreach_set("normal", co.ravel())
         else:
-            co = [co for (i, f) in enumerate(faces)
-                     for j in f
-                     for co in vectors[normal_index[i] if normal_index else i]]
-            bpymesh.polygons.foreach_set("normal", co)
+            co = vectors[normal_index[loop_faces] if len(normal_index) else loop_faces]
+            bpymesh.polygons.foreach_set("normal", co.ravel())
 
     # Apply vertex/face colors
     colors = geom.getChildBySpec(['ColorRGBA', 'Color'])
     if colors:
         if colors.getSpec() == 'ColorRGBA':
-            rgb = colors.getFieldAsArray('color', 4, ancestry)
+            rgb = as_rows(colors.getFieldAsNumpyArray('color', np.float64, ancestry), 4)
         else:
-            # Array of arrays; no need to flatten
-            rgb = [c + [1.0] for c in colors.getFieldAsArray('color', 3, ancestry)]
+            rgb = as_rows(colors.getFieldAsNumpyArray('color', np.float64, ancestry), 3)
+            rgb = np.hstack((rgb, np.ones((len(rgb), 1))))
 
         color_per_vertex = geom.getFieldAsBool('colorPerVertex', True, ancestry)
-        color_index = geom.getFieldAsArray('colorIndex', 0, ancestry)
+        color_index = geom.getFieldAsNumpyArray('colorIndex', np.int64, ancestry)
 
         d = bpymesh.vertex_colors.new().data
         if color_per_vertex:
-            cco = [cco for f in processPerVertexIndex(color_index)
-                       for v in f
-                       for cco in rgb[v]]
-        elif color_index:  # Color per face with index
-            cco = [cco for (i, f) in enumerate(faces)
-                       for j in f
-                       for cco in rgb[color_index[i]]]
+            cco = rgb[processPerVertexIndex(color_index)]
+        elif len(color_index):  # Color per face with index
+            cco = rgb[color_index[loop_faces]]
         else:  # Color per face without index
-            cco = [cco for (i, f) in enumerate(faces)
-                       for j in f
-                       for cco in rgb[i]]
-        d.foreach_set('color', cco)
+            cco = rgb[loop_faces]
+        d.foreach_set('color', cco.astype(np.float32).ravel())
 
     # Texture coordinates (UVs)
     tex_coord = geom.getChildBySpec('TextureCoordinate')
     if tex_coord:
-        tex_coord_points = tex_coord.getFieldAsArray('point', 2, ancestry)
-        tex_index = geom.getFieldAsArray('texCoordIndex', 0, ancestry)
-        tex_index = processPerVertexIndex(tex_index)
-        loops = [co for f in tex_index
-                    for v in f
-                    for co in tex_coord_points[v]]
-    else:
-        x_min = y_min = z_min =  math.inf
-        x_max = y_max = z_max = -math.inf
-        for f in faces:
-            # Unused vertices don't participate in size; X3DOM does so
-            for v in f:
-                (x, y, z) = points[v]
-                x_min = min(x_min, x)
-                x_max = max(x_max, x)
-                y_min = min(y_min, y)
-                y_max = max(y_max, y)
-                z_min = min(z_min, z)
-                z_max = max(z_max, z)
-
-        mins = (x_min, y_min, z_min)
-        deltas = (x_max - x_min, y_max - y_min, z_max - z_min)
+        tex_coord_points = as_rows(tex_coord.getFieldAsNumpyArray('point', np.float64, ancestry), 2)
+        tex_index = geom.getFieldAsNumpyArray('texCoordIndex', np.int64, ancestry)
+        loops = tex_coord_points[processPerVertexIndex(tex_index)]
+    elif num_loops:
+        # Unused vertices don't participate in size; X3DOM does so
+        used_points = points[verts]
+        mins = used_points.min(axis=0)
+        deltas = (used_points.max(axis=0) - mins).tolist()
         axes = [0, 1, 2]
         axes.sort(key=lambda a: (-deltas[a], a))
         # Tuple comparison breaks ties
         (s_axis, t_axis) = axes[0:2]
-        s_min = mins[s_axis]
         ds = deltas[s_axis]
-        t_min = mins[t_axis]
         dt = deltas[t_axis]
 
         # Avoid divide by zero T76303.
@@ -2035,13 +2061,12 @@ def importMesh_IndexedFaceSet(geom, ancestry):
         if not (dt > 0.0):
             dt = 1.0
 
-        def generatePointCoords(pt):
-            return (pt[s_axis] - s_min) / ds, (pt[t_axis] - t_min) / dt
-        loops = [co for f in faces
-                    for v in f
-                    for co in generatePointCoords(points[v])]
+        loops = np.column_stack(((used_points[:, s_axis] - mins[s_axis]) / ds,
+                                 (used_points[:, t_axis] - mins[t_axis]) / dt))
+    else:
+        loops = np.zeros((0, 2))
 
-    importMesh_ApplyTextureToLoops(bpymesh, loops)
+    importMesh_ApplyTextureToLoops(bpymesh, loops.astype(np.float32).ravel())
 
     bpymesh.validate()
     bpymesh.update()
@@ -3047,6 +3072,15 @@ def importShape_ProcessObject(
         if bpymat:
             bpydata.materials.append(bpymat)
 
+    importShape_LinkObject(bpycollection, vrmlname, bpydata, node,
+                           ancestry, global_matrix)
+
+    if DEBUG:
+        node.blendObject["source_line_no"] = geom.lineno
+
+
+def importShape_LinkObject(bpycollection, vrmlname, bpydata, node,
+                           ancestry, global_matrix):
     # Can transform data or object, better the object so we can instance
     # the data
     # bpymesh.transform(getFinalMatrix(node))
@@ -3055,9 +3089,6 @@ def importShape_ProcessObject(
     bpycollection.objects.link(bpyob)
     bpyob.select_set(True)
 
-    if DEBUG:
-        bpyob["source_line_no"] = geom.lineno
-
 
 def importText(geom, ancestry):
     fmt = geom.getChildBySpec('FontStyle')
@@ -3096,6 +3127,24 @@ geometry_importers = {
     }
 
 
+def isInProtoBody(ancestry):
+    """
+    Whether the node is in a PROTO body, every instance of the PROTO then reaches
+    the same node, but its IS fields differ from one instance to the next.
+    """
+    return any(node.getRealNode().proto_node for node in ancestry)
+
+
+def isSharedGeometry(geom, ancestry):
+    """
+    Whether shapes can link the data of this geometry: it has to be DEF'd or USE'd,
+    and not in a PROTO body.
+    """
+    if not (geom.reference or geom.canHaveReferences()):
+        return False
+    return not isInProtoBody(ancestry)
+
+
 def importShape(bpycollection, node, ancestry, global_matrix):
     # Under Shape, we can only have Appearance, MetadataXXX and a geometry node
     def isGeometry(spec):
@@ -3103,7 +3152,7 @@ def importShape(bpycollection, node, ancestry, global_matrix):
 
     bpyob = node.getRealNode().blendObject
 
-    if bpyob is not None:
+    if bpyob is not None and not isInProtoBody(ancestry):
         bpyob = node.blendData = node.blendObject = bpyob.copy()
         # Could transform data, but better the object so we can instance the data
         bpyob.matrix_world = getFinalMatrix(node, None, ancestry, global_matrix)
@@ -3138,9 +3187,22 @@ def importShape(bpycollection, node, ancestry, global_matrix):
         if textx:
             texmtx = translateTexTransform(textx, ancestry)
 
-    bpydata = None
     geom_spec = geom.getSpec()
 
+    # A geometry DEF'd once and USE'd in other shapes is imported only once,
+    # the shapes with the same material and texture transform link the same data
+    geom_real = geom.getRealNode()
+    shared = isSharedGeometry(geom, ancestry)
+    if shared and geom_real.parsed is None:
+        geom_real.parsed = {}
+    data_key = (bpymat, tuple(map(tuple, texmtx)) if texmtx else None)
+    bpydata = geom_real.parsed.get(data_key) if shared else None
+    if bpydata is not None:
+        importShape_LinkObject(
+                bpycollection, vrmlname + "_" + geom_spec, bpydata, node,
+                ancestry, global_matrix)
+        return
+
     # ccw is handled by every geometry importer separately; some
     # geometries are easier to flip than others
     geom_fn = geometry_importers.get(geom_spec)
@@ -3153,6 +3215,8 @@ def importShape(bpycollection, node, ancestry, global_matrix):
                 bpycollection, vrmlname, bpydata, geom, geom_spec,
                 node, bpymat, tex_has_alpha, texmtx,
                 ancestry, global_matrix)
+        if shared:
+            geom_real.parsed[data_key] = bpydata
     else:
         print('\tImportX3D warning: unsupported type "%s"' % geom_spec)
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# XXX Not really nice, but that hack is needed to allow execution of that test
+#     from both automated CTest and by directly running the file manually.
+#     Needs Blender, run it with Blender's Python or with the bpy module.
+if __name__ == '__main__':
+    from import_x3d import load
+else:
+    from .import_x3d import load
+import os
+import tempfile
+import unittest
+
+import bpy
+
+PROTO_SCENE = """#VRML V2.0 utf8
+PROTO SizedBox [
+  field SFVec3f boxSize 1 1 1
+]
+{
+  Shape {
+    geometry Box { size IS boxSize }
+  }
+}
+Transform { children [ SizedBox { boxSize 1 1 1 } ] }
+Transform { translation 5 0 0 children [ SizedBox { boxSize 2 4 6 } ] }
+"""
+
+DEF_USE_SCENE = """#VRML V2.0 utf8
+Transform { children [ Shape { geometry DEF Cube Box { size 2 2 2 } } ] }
+Transform { translation 5 0 0 children [ Shape { geometry USE Cube } ] }
+"""
+
+REPEATED_SCENE = """#VRML V2.0 utf8
+Transform { children [ Shape { geometry Box { size 2 2 2 } } ] }
+Transform { translation 5 0 0 children [ Shape { geometry Box { size 2 2 2 } } ] }
+"""
+
+
+def import_text(text):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = os.path.join(dirpath, "scene.wrl")
+        with open(filepath, "w") as f:
+            f.write(text)
+        load(bpy.context, filepath)
+    return sorted((ob for ob in bpy.context.scene.objects if ob.type == 'MESH'),
+                  key=lambda ob: ob.matrix_world.translation.x)
+
+
+def mesh_size(ob):
+    coords = [v.co for v in ob.data.vertices]
+    return tuple(round(max(co[i] for co in coords) - min(co[i] for co in coords), 5) for i in range(3))
+
+
+class ImportX3DGeometrySharingTest(unittest.TestCase):
+    def test_proto_instances(self):
+        # the IS fields of every instance give its own geometry
+        first, second = import_text(PROTO_SCENE)
+        self.assertIsNot(first.data, second.data)
+        self.assertEqual(mesh_size(first), (1.0, 1.0, 1.0))
+        self.assertEqual(sorted(mesh_size(second)), [2.0, 4.0, 6.0])
+
+    def test_def_use(self):
+        first, second = import_text(DEF_USE_SCENE)
+        self.assertIs(first.data, second.data)
+
+    def test_repeated_geometry(self):
+        first, second = import_text(REPEATED_SCENE)
+        self.assertIsNot(first.data, second.data)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
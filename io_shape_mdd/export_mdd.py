@@ -13,6 +13,7 @@ Be sure not to use modifiers that change the number or order of verts in the mes
 
 import bpy
 import mathutils
+import numpy as np
 from struct import pack
 
 
@@ -33,6 +34,17 @@ def check_vertcount(mesh, vertcount):
         raise Exception('Error, number of verts has changed during animation, cannot export')
 
 
+def transform_coords(coords, matrix):
+    """
+    Same as Mesh.transform(matrix) for the (n, 3) float32 vertex coords, in place,
+    with the float32 operations in the same order, so the written values stay the same.
+    """
+    matrix = np.array(matrix, dtype=np.float32)
+    x, y, z = coords.T.copy()
+    for axis_i, row in enumerate(matrix[:3]):
+        coords[:, axis_i] = x * row[0] + y * row[1] + z * row[2] + row[3]
+
+
 def save(context, filepath="", frame_start=1, frame_end=300, fps=25.0, use_rest_frame=False):
     """
     Blender.Window.WaitCursor(1)
@@ -69,6 +81,9 @@ def save(context, filepath="", frame_start=1, frame_end=300, fps=25.0, use_rest_
     if use_rest_frame:
         numframes += 1
 
+    # Reused for the vertex locations of every frame.
+    coords = np.empty((numverts, 3), dtype=np.float32)
+
     f = open(filepath, 'wb')  # no Errors yet:Safe to create file
 
     # Write the header
@@ -79,8 +94,9 @@ def save(context, filepath="", frame_start=1, frame_end=300, fps=25.0, use_rest_
 
     if use_rest_frame:
         check_vertcount(me, numverts)
-        me.transform(mat_flip @ obj.matrix_world)
-        f.write(pack(">%df" % (numverts * 3), *[axis for v in me.vertices for axis in v.co]))
+        me.vertices.foreach_get("co", coords.ravel())
+        transform_coords(coords, mat_flip @ obj.matrix_world)
+        coords.astype('>f4').tofile(f)
 
     obj_eval.to_mesh_clear()
 
@@ -90,10 +106,11 @@ def save(context, filepath="", frame_start=1, frame_end=300, fps=25.0, use_rest_
         obj_eval = obj.evaluated_get(depsgraph)
         me = obj_eval.to_mesh()
         check_vertcount(me, numverts)
-        me.transform(mat_flip @ obj.matrix_world)
+        me.vertices.foreach_get("co", coords.ravel())
+        transform_coords(coords, mat_flip @ obj.matrix_world)
 
         # Write the vertex data
-        f.write(pack(">%df" % (numverts * 3), *[axis for v in me.vertices for axis in v.co]))
+        coords.astype('>f4').tofile(f)
 
         obj_eval.to_mesh_clear()
 
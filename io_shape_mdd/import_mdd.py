@@ -14,57 +14,33 @@
 # Bill Niewuendorp
 
 import bpy
+import numpy as np
 from struct import unpack
 
-def set_linear_interpolation(obj, shapekey):
-    anim_data = obj.data.shape_keys.animation_data
-    data_path = "key_blocks[\"" + shapekey.name + "\"].value"
+LINEAR = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items["LINEAR"].value
 
-    for fcu in anim_data.action.fcurves:
-        if fcu.data_path == data_path:
-            for keyframe in fcu.keyframe_points:
-                keyframe.interpolation = 'LINEAR'
 
-
-def obj_update_frame(file, scene, obj, start, fr, step):
-
-    # Insert new shape key
-    new_shapekey = obj.shape_key_add()
-    new_shapekey.name = ("frame_%.4d" % fr)
-    new_shapekey_index = len(obj.data.shape_keys.key_blocks) - 1
-
-    obj.active_shape_key_index = new_shapekey_index
-    obj.show_only_shape_key = True
-
-    verts = new_shapekey.data
-
-    for v in verts:  # 12 is the size of 3 floats
-        v.co[:] = unpack('>3f', file.read(12))
-
-    # me.update()
-    obj.show_only_shape_key = False
-
-    # insert keyframes
-    new_shapekey = obj.data.shape_keys.key_blocks[new_shapekey_index]
-    frame = start + fr*step
-
-    new_shapekey.value = 0.0
-    new_shapekey.keyframe_insert("value", frame=frame - step)
-
-    new_shapekey.value = 1.0
-    new_shapekey.keyframe_insert("value", frame=frame)
-
-    new_shapekey.value = 0.0
-    new_shapekey.keyframe_insert("value", frame=frame + step)
-
-    set_linear_interpolation(obj, new_shapekey)
-
-    obj.data.update()
+def add_frame_keys(action, shapekey, frame, step):
+    """
+    Key the value of shapekey to 1.0 at its frame and to 0.0 one step before and after,
+    with linear interpolation.
+    """
+    data_path = shapekey.path_from_id("value")
+    fcurve = action.fcurves.find(data_path)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path=data_path)
+    else:
+        # Left over from an earlier shape key of the same name.
+        fcurve.keyframe_points.clear()
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.add(3)
+    keyframe_points.foreach_set("co", (frame - step, 0.0, frame, 1.0, frame + step, 0.0))
+    keyframe_points.foreach_set("interpolation", (LINEAR,) * 3)
+    fcurve.update()
 
 
 def load(context, filepath, frame_start=0, frame_step=1):
 
-    scene = context.scene
     obj = context.object
 
     print('\n\nimporting mdd %r' % filepath)
@@ -72,20 +48,45 @@ def load(context, filepath, frame_start=0, frame_step=1):
     if bpy.ops.object.mode_set.poll():
         bpy.ops.object.mode_set(mode='OBJECT')
 
-    file = open(filepath, 'rb')
-    frames, points = unpack(">2i", file.read(8))
-    time = unpack((">%df" % frames), file.read(frames * 4))
+    with open(filepath, 'rb') as file:
+        frames, points = unpack(">2i", file.read(8))
+        time = np.fromfile(file, dtype='>f4', count=frames)
+        # Vertex locations of all frames at once.
+        coords = np.fromfile(file, dtype='>f4', count=frames * points * 3)
 
     print('\tpoints:%d frames:%d' % (points, frames))
     print('\tstart frame:%d step:%d' % (frame_start, frame_step))
 
+    if len(coords) != frames * points * 3:
+        raise Exception('Error, the file ends before the last frame, cannot import')
+    if points != len(obj.data.vertices):
+        raise Exception('Error, the file has %d points for a mesh of %d vertices, cannot import' %
+                        (points, len(obj.data.vertices)))
+    coords = coords.astype(np.float32).reshape(frames, points * 3)
+
     # If target object doesn't have Basis shape key, create it.
     if not obj.data.shape_keys:
         basis = obj.shape_key_add()
         basis.name = "Basis"
         obj.data.update()
 
-    for i in range(frames):
-        obj_update_frame(file, scene, obj, frame_start, i, frame_step)
+    shape_keys = obj.data.shape_keys
+    if not shape_keys.animation_data:
+        shape_keys.animation_data_create()
+    action = shape_keys.animation_data.action
+    if not action:
+        action = shape_keys.animation_data.action = bpy.data.actions.new(shape_keys.name + "Action")
+
+    for fr in range(frames):
+        # Insert new shape key
+        new_shapekey = obj.shape_key_add(name="frame_%.4d" % fr, from_mix=False)
+        new_shapekey.data.foreach_set("co", coords[fr])
+
+        # insert keyframes
+        new_shapekey.value = 0.0
+        add_frame_keys(action, new_shapekey, frame_start + fr * frame_step, frame_step)
+
+    obj.active_shape_key_index = len(shape_keys.key_blocks) - 1
+    obj.data.update()
 
     return {'FINISHED'}
@@ -102,7 +102,7 @@ def check_index(collection, index):
     count = len(collection)
     return count>0 and index<count and index>=0
 
-def send_command(cmd, output="sendmat.py"):
+def send_command(cmd, output="sendmat.py", libpath=None):
     bin = winpath(bpy.app.binary_path)
     scriptpath = winpath(os.path.join(bpy.app.tempdir, output))
 
@@ -114,8 +114,9 @@ def send_command(cmd, output="sendmat.py"):
     if output == "createlib.py":
         code = subprocess.call([bin, "-b", "-P", scriptpath])
     else:
-        libpath = winpath(bpy.context.scene.matlib.current_library.path)
-        code = subprocess.call([bin, "-b", libpath, "-P", scriptpath])
+        if libpath is None:
+            libpath = bpy.context.scene.matlib.current_library.path
+        code = subprocess.call([bin, "-b", winpath(libpath), "-P", scriptpath])
 
     #code returns 0 if ok, 1 if not
     return abs(code-1)
@@ -129,6 +130,128 @@ def list_materials(path, sort=False):
     if sort: list = sorted(list)
     return list
 
+### LIBRARY INDEX
+#materials and categories of every library, stored in a json file next to the libraries.
+#an entry is valid while the library file keeps the same modification time and size,
+#so only the libraries changed since the last time are opened again.
+class LibraryIndex():
+
+    filename = "matlib_index.json"
+
+    def __init__(self):
+        self.entries = None
+        self.dirpath = None
+
+    @property
+    def filepath(self):
+        return os.path.join(matlib_path, self.filename)
+
+    def stamp(self, path):
+        st = os.stat(path)
+        return [st.st_mtime, st.st_size]
+
+    def load(self):
+        if self.entries is not None and self.dirpath == matlib_path:
+            return
+        self.dirpath = matlib_path
+        self.entries = {}
+        try:
+            with open(self.filepath, "r") as f:
+                self.entries = json.loads(f.read())
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        try:
+            with open(self.filepath, "w") as f:
+                f.write(json.dumps(self.entries, sort_keys=True, indent=4))
+        except OSError:
+            dd("can't write library index", self.filepath)
+
+    def get(self, path):
+        self.load()
+        entry = self.entries.get(path)
+        if entry and entry["stamp"] == self.stamp(path):
+            return entry
+        return None
+
+    def set(self, path, materials, cats):
+        self.load()
+        self.entries[path] = {
+            "stamp": self.stamp(path),
+            "materials": materials,
+            "categories": cats,
+        }
+        self.save()
+
+    def update(self, path, materials, cats):
+        #store the local state of a library, keeping the stamp until it is saved to disk
+        self.load()
+        entry = self.entries.get(path)
+        if entry:
+            entry["materials"] = materials
+            entry["categories"] = cats
+
+library_index = LibraryIndex()
+
+### PENDING EDITS
+#edits to the libraries are queued and run together in a single background blender,
+#that saves each library once. edits of a library that can't be saved stay queued.
+class PendingEdits():
+
+    def __init__(self):
+        self.commands = {}
+        self.snapshots = {}
+        self.snapshot_count = 0
+
+    def __len__(self):
+        return sum(len(cmds) for cmds in self.commands.values())
+
+    def add(self, libpath, cmd):
+        self.commands.setdefault(libpath, []).append(cmd)
+
+    def snapshot(self, libpath, mat):
+        #the material as it is now, its file may change before the library is saved
+        path = os.path.join(bpy.app.tempdir, "matlib_snapshot_%d.blend" % self.snapshot_count)
+        self.snapshot_count += 1
+        bpy.data.libraries.write(path, {mat}, fake_user=True, path_remap='ABSOLUTE')
+        self.snapshots.setdefault(libpath, []).append(path)
+        return winpath(path)
+
+    def flush(self):
+        failed = []
+        for libpath, cmds in list(self.commands.items()):
+            cmd = "\nimport bpy\n" + "\n".join(cmds)
+            cmd += '''
+bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)''' % winpath(libpath)
+            if send_command(cmd, "flushlib.py", libpath):
+                entry = library_index.entries.get(libpath) if library_index.entries else None
+                if entry:
+                    entry["stamp"] = library_index.stamp(libpath)
+                del self.commands[libpath]
+                for path in self.snapshots.pop(libpath, []):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            else:
+                failed.append(libpath)
+                #read the library again next time, the index shows the unsaved edits
+                if library_index.entries:
+                    library_index.entries.pop(libpath, None)
+        if library_index.entries is not None:
+            library_index.save()
+        for libpath in failed:
+            print("Save Library Error: can't save %s, its changes stay queued." % libpath)
+        return not failed
+
+pending_edits = PendingEdits()
+
+@persistent
+def flush_pending_edits(dummy=None):
+    if len(pending_edits):
+        pending_edits.flush()
+
 #category properties (none atm)
 class EmptyGroup(PropertyGroup):
     pass
@@ -155,7 +278,6 @@ class Categories():
 
         cmd = """
 print(30*"+")
-import bpy
 if not hasattr(bpy.context.scene, "matlib_categories"):
   class EmptyProps(bpy.types.PropertyGroup):
     pass
@@ -169,10 +291,10 @@ for cat in cats:
             cmd += """
 cat = cats.add()
 cat.name = "%s" """ % cat.capitalize()
-        cmd +='''
-bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)''' % winpath(libpath)
 
-        return send_command(cmd, "save_categories.py")
+        pending_edits.add(libpath, cmd)
+        bpy.context.scene.matlib.update_index()
+        return True
 
     def read(self, pull=True):
         #mandar a imprimir el listado
@@ -352,14 +474,24 @@ bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)'''
             self.filter = False
             self.cat_index = -1
 
-            categories = Categories(self.categories)
-            self.cats = categories.read(True)
+            if len(pending_edits):
+                pending_edits.flush()
+
+            entry = library_index.get(path)
+            if entry:
+                self.cats = entry["categories"]
+                materials = entry["materials"]
+            else:
+                categories = Categories(self.categories)
+                self.cats = categories.read(True)
+                materials = list_materials(path, True)
+                library_index.set(path, materials, self.cats)
             self.load_categories()
 
             for mat in self.all_materials:
                 self.all_materials.remove(0)
 
-            for mat in list_materials(self.current_library.path, True):
+            for mat in materials:
                 item = self.all_materials.add()
                 item.name = mat
                 for cat in self.cats:
@@ -371,6 +503,15 @@ bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)'''
         else:
             return 'ERROR', "Library not found!."
 
+    def update_index(self):
+        #store the materials and categories shown in the panel as the current state of the library
+        if self.current_library:
+            materials = [mat.name for mat in self.all_materials]
+            cats = [[cat.name, [mat.name for mat in self.all_materials if mat.category == cat.name]]
+                    for cat in self.categories]
+            self.cats = cats
+            library_index.update(self.current_library.path, materials, cats)
+
     def update_list(self):
         ### THIS HAS TO SORT
         self.empty_list()
@@ -439,20 +580,14 @@ bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)'''
                 if cat == self.all_materials[self.mat_index].category:
                     return
                 cmd = """
-import bpy
-try:
-  mat = bpy.data.materials['%s']
-except:
-  mat = None
+mat = bpy.data.materials.get('%s')
 if mat:
   mat['category'] = "%s"
-  bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)
-""" % (mat.name, cat, winpath(self.current_library.path))
-                if send_command(cmd):
-                    self.all_materials[self.mat_index].category = cat
-                    mat.category = cat
-                else:
-                    return "WARNING", "There was an error."
+""" % (mat.name, cat)
+                pending_edits.add(self.current_library.path, cmd)
+                self.all_materials[self.mat_index].category = cat
+                mat.category = cat
+                self.update_index()
 
             #        catnode = xml.find("category", self.current_category, lib, True)
             #        matnode = xml.find("material", mat.name, lib)
@@ -471,6 +606,8 @@ if mat:
             return "WARNING", "Select a material"
 
     def get_material(self, name, link=False):
+        if len(pending_edits):
+            pending_edits.flush()
         with bpy.data.libraries.load(self.current_library.path, link=link, relative=False) as (data_from, data_to):
             data_to.materials = [name]
         if link:
@@ -639,61 +776,62 @@ if mat:
         dd("adding material", name, libpath)
 
         overwrite = ""
-        if name in list_materials(libpath):
+        if name in [item.name for item in self.all_materials]:
             overwrite = '''
 mat = bpy.data.materials["%s"]
 mat.name = "tmp"
 mat.use_fake_user = False
 mat.user_clear()'''  % name
 
-        cmd = '''
-import bpy{0}
+        cmd = '''{0}
 with bpy.data.libraries.load("{1}") as (data_from, data_to):
   data_to.materials = ["{2}"]
 mat = bpy.data.materials["{2}"]
 mat.use_fake_user=True
 bpy.ops.file.pack_all()
-bpy.ops.wm.save_mainfile(filepath="{3}", check_existing=False, compress=True)
-'''.format(overwrite, thispath, name, libpath)
+'''.format(overwrite, pending_edits.snapshot(self.current_library.path, mat), name)
 
-        if send_command(cmd):
-            #self.load_library()
-            if not overwrite:
-                item = self.all_materials.add()
-                item.name = name
-                if "category" in mat.keys():
-                    item.category = mat['category']
-                #reorder all_materials
-                items = sorted([[item.name, item.category] for item in self.all_materials], key = lambda x: x[0])
+        pending_edits.add(self.current_library.path, cmd)
+        if not overwrite:
+            item = self.all_materials.add()
+            item.name = name
+            if "category" in mat.keys():
+                item.category = mat['category']
+            #reorder all_materials
+            items = sorted([[item.name, item.category] for item in self.all_materials], key = lambda x: x[0])
 
-                self.all_materials.clear()
-                for it in items:
-                    item = self.all_materials.add()
-                    item.name = it[0]
-                    item.category = it[1]
+            self.all_materials.clear()
+            for it in items:
+                item = self.all_materials.add()
+                item.name = it[0]
+                item.category = it[1]
 
-                self.update_list()
+            self.update_list()
+            self.update_index()
 
-            return 'INFO', "Material added."
-        else:
-            print("Save Material Error: Run Blender with administrative privileges.")
-            return 'WARNING', "There was an error saving the material"
+        return 'INFO', "Material added. Save the library to write the changes."
 
     def remove_material(self):
         name = self.active_material.name
         libpath = winpath(self.current_library.path)
-        if name and libpath and name in list_materials(libpath):
-            cmd = '''import bpy
+        if name and libpath and name in [item.name for item in self.all_materials]:
+            cmd = '''
 mat = bpy.data.materials["%s"]
 mat.use_fake_user = False
-mat.user_clear()
-bpy.ops.wm.save_mainfile(filepath="%s", check_existing=False, compress=True)''' % (name , libpath)
-            if send_command(cmd, "removemat.py"):
-                self.all_materials.remove(self.mat_index)
-                self.update_list()
-            else:
-                return 'ERROR', "There was an error."
-        return "INFO", name + " removed."
+mat.user_clear()''' % name
+            pending_edits.add(self.current_library.path, cmd)
+            self.all_materials.remove(self.all_materials.find(name))
+            self.update_list()
+            self.update_index()
+        return "INFO", name + " removed. Save the library to write the changes."
+
+    def save_library(self):
+        if not len(pending_edits):
+            return "INFO", "No changes to save."
+        if pending_edits.flush():
+            return "INFO", "Library saved."
+        print("Save Library Error: Run Blender with administrative privileges.")
+        return "WARNING", "There was an error saving the library"
 
     def get_dummy(self, context):
         dummy_name = "Material_Preview_Dummy"
@@ -964,6 +1102,9 @@ class MATLIB_OT_operator(Operator):
         elif self.cmd == "RELOAD":
             success = matlib.reload()
 
+        elif self.cmd == "SAVE":
+            success = matlib.save_library()
+
         if not matlib.current_library:
             self.report({'ERROR'}, "Select a Library")
             return {'CANCELLED'}
@@ -1136,6 +1277,8 @@ class MATLIB_PT_vxPanel(Panel):
         col.operator("matlib.operator", icon="COLOR", text="Preview Material").cmd="PREVIEW"
         col.operator("matlib.operator", icon="GHOST_DISABLED", text="Remove Preview").cmd="FLUSH"
         col.operator("matlib.operator", icon="REMOVE", text="Remove Material").cmd="REMOVE"
+        if len(pending_edits):
+            col.operator("matlib.operator", icon="FILE_TICK", text="Save Library").cmd="SAVE"
         col.prop(matlib, "show_prefs", icon="MODIFIER", text="Settings")
 
         # Search
@@ -1192,6 +1335,7 @@ MATLIB_MT_CatsMenu
 def refresh_libs(dummy=None):
     global libraries
     global matlib_path
+    flush_pending_edits()
     default_path = bpy.context.preferences.addons[__name__].preferences.matlib_path
     if default_path is not None and default_path != '':
         matlib_path = default_path
@@ -1257,6 +1401,7 @@ def register():
     Scene.matlib_categories = CollectionProperty(type=EmptyGroup)
     Scene.matlib = PointerProperty(type = matlibProperties)
     bpy.app.handlers.load_post.append(refresh_libs)
+    bpy.app.handlers.save_pre.append(flush_pending_edits)
     refresh_libs()
 
 
@@ -1269,6 +1414,8 @@ def unregister():
     except:
         pass
     del Scene.matlib
+    bpy.app.handlers.save_pre.remove(flush_pending_edits)
+    flush_pending_edits()
     libraries.clear()
     bpy.app.handlers.load_post.remove(refresh_libs)
     for c in classes:
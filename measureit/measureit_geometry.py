@@ -34,6 +34,109 @@ def imm_set_line_width(width):
 
     imm_line_width = width
 
+
+# -------------------------------------------------------------
+# Draw list
+#
+# While a draw list is active, lines, triangles and texts are
+# collected instead of drawn, and all the geometry sharing a
+# color and line width is drawn later with a single batch.
+# The draw list can be kept to draw the same frame again.
+# -------------------------------------------------------------
+class DrawList:
+    def __init__(self):
+        self.lines = {}
+        self.tris = {}
+        self.texts = []
+        self.batches = None
+
+    def add_line(self, v1, v2, rgba):
+        key = (tuple(rgba), imm_line_width, imm_viewport)
+        self.lines.setdefault(key, []).extend(((v1[0], v1[1], 0), (v2[0], v2[1], 0)))
+
+    def add_triangle(self, v1, v2, v3, rgba):
+        self.tris.setdefault(tuple(rgba), []).extend(((v1[0], v1[1]), (v2[0], v2[1]), (v3[0], v3[1])))
+
+    def add_text(self, size, x_pos, y_pos, text_rot, rgba, text):
+        self.texts.append((size, x_pos, y_pos, text_rot, tuple(rgba), text))
+
+    def build_batches(self):
+        tri_batches = [(rgba, batch_for_shader(shader, 'TRIS', {"pos": coords}))
+                       for rgba, coords in self.tris.items()]
+        line_batches = [(key, batch_for_shader(shader_line, 'LINES', {"pos": coords}))
+                        for key, coords in self.lines.items()]
+        self.batches = (tri_batches, line_batches)
+
+    def draw(self):
+        if self.batches is None:
+            self.build_batches()
+        tri_batches, line_batches = self.batches
+
+        if tri_batches:
+            shader.bind()
+            for rgba, batch in tri_batches:
+                shader.uniform_float("color", rgba)
+                batch.draw(shader)
+
+        if line_batches:
+            shader_line.bind()
+            for (rgba, width, viewport), batch in line_batches:
+                shader_line.uniform_float("color", rgba)
+                shader_line.uniform_float("lineWidth", width)
+                shader_line.uniform_float("viewportSize", viewport)
+                batch.draw(shader_line)
+
+        font_id = 0
+        for size, x_pos, y_pos, text_rot, rgba, text in self.texts:
+            blf.size(font_id, size, 72)
+            if text_rot is not None:
+                blf.enable(font_id, ROTATION)
+                blf.rotation(font_id, text_rot)
+            blf.position(font_id, x_pos, y_pos, 0)
+            blf.color(font_id, rgba[0], rgba[1], rgba[2], rgba[3])
+            blf.draw(font_id, text)
+            if text_rot is not None:
+                blf.disable(font_id, ROTATION)
+
+
+draw_list = None
+draw_list_cache = {}
+
+
+def begin_draw_list():
+    global draw_list
+    draw_list = DrawList()
+    return draw_list
+
+
+def end_draw_list():
+    global draw_list
+    current = draw_list
+    draw_list = None
+    if current is not None:
+        current.draw()
+    return current
+
+
+# -------------------------------------------------------------
+# Cache of draw lists per region, used while the measured
+# geometry and the view do not change
+#
+# -------------------------------------------------------------
+def get_cached_draw_list(region_key, view_key):
+    cached = draw_list_cache.get(region_key)
+    if cached is not None and cached[0] == view_key:
+        return cached[1]
+    return None
+
+
+def set_cached_draw_list(region_key, view_key, mydraw_list):
+    draw_list_cache[region_key] = (view_key, mydraw_list)
+
+
+def clear_draw_list_cache():
+    draw_list_cache.clear()
+
 # -------------------------------------------------------------
 # Draw segments
 #
@@ -850,9 +953,13 @@ def draw_text(myobj, pos2d, display_text, rgba, fsize, align='L', text_rot=0.0):
         # calculate new Y position
         new_y = y_pos + (mheight * idx)
         # Draw
-        blf.position(font_id, newx, new_y, 0)
-        blf.color(font_id, rgba[0], rgba[1], rgba[2], rgba[3])
-        blf.draw(font_id, " " + line)
+        if draw_list is not None:
+            draw_list.add_text(round(fsize * ui_scale), newx, new_y, text_rot if align == 'L' else None,
+                               rgba, " " + line)
+        else:
+            blf.position(font_id, newx, new_y, 0)
+            blf.color(font_id, rgba[0], rgba[1], rgba[2], rgba[3])
+            blf.draw(font_id, " " + line)
         # sub line
         idx -= 1
         # saves max width
@@ -870,6 +977,11 @@ def draw_text(myobj, pos2d, display_text, rgba, fsize, align='L', text_rot=0.0):
 #
 # -------------------------------------------------------------
 def draw_line(v1, v2, rgba):
+    if draw_list is not None:
+        if v1 is not None and v2 is not None:
+            draw_list.add_line(v1, v2, rgba)
+        return
+
     coords = [(v1[0], v1[1], 0), (v2[0], v2[1], 0)]
     batch = batch_for_shader(shader_line, 'LINES', {"pos": coords})
 
@@ -890,6 +1002,11 @@ def draw_line(v1, v2, rgba):
 #
 # -------------------------------------------------------------
 def draw_triangle(v1, v2, v3, rgba):
+    if draw_list is not None:
+        if v1 is not None and v2 is not None and v3 is not None:
+            draw_list.add_triangle(v1, v2, v3, rgba)
+        return
+
     coords = [(v1[0], v1[1]), (v2[0], v2[1]), (v3[0], v3[1])]
     batch = batch_for_shader(shader, 'TRIS', {"pos": coords})
 
@@ -61,8 +61,23 @@ def save_handler(dummy):
         pass
 
 
+# ------------------------------------------------------
+# Handler to detect changes in the scene
+# Discard the cached measures drawing
+#
+# ------------------------------------------------------
+# noinspection PyUnusedLocal
+@persistent
+def update_handler(*args):
+    clear_draw_list_cache()
+
+
 bpy.app.handlers.load_post.append(load_handler)
 bpy.app.handlers.save_pre.append(save_handler)
+bpy.app.handlers.depsgraph_update_post.append(update_handler)
+bpy.app.handlers.frame_change_post.append(update_handler)
+bpy.app.handlers.undo_post.append(update_handler)
+bpy.app.handlers.redo_post.append(update_handler)
 
 
 # ------------------------------------------------------------------
@@ -1935,6 +1950,19 @@ def draw_main(context):
     # Enable drawing
     gpu.state.blend_set('ALPHA')
     # ---------------------------------------
+    # Reuse the last drawing if nothing changed
+    # ---------------------------------------
+    region_key = region.as_pointer()
+    view_key = (region.width, region.height, tuple(map(tuple, rv3d.perspective_matrix)),
+                bpy.context.preferences.system.ui_scale)
+    cached = get_cached_draw_list(region_key, view_key)
+    if cached is not None:
+        cached.draw()
+        gpu.state.blend_set('NONE')
+        return
+
+    begin_draw_list()
+    # ---------------------------------------
     # Generate all OpenGL calls for measures
     # ---------------------------------------
     for myobj in objlist:
@@ -1962,6 +1990,11 @@ def draw_main(context):
             if scene.measureit_debug_faces is True or scene.measureit_debug_normals is True:
                 draw_faces(context, myobj, region, rv3d)
 
+    # ---------------------------------------
+    # Draw the collected geometry
+    # ---------------------------------------
+    set_cached_draw_list(region_key, view_key, end_draw_list())
+
     # -----------------------
     # restore defaults
     # -----------------------
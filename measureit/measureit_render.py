@@ -58,6 +58,7 @@ def render_main(self, context, animation=False):
         gpu.matrix.reset()
         gpu.matrix.load_matrix(view_matrix)
         gpu.matrix.load_projection_matrix(Matrix.Identity(4))
+        begin_draw_list()
 
         # -----------------------------
         # Loop to draw all objects
@@ -100,6 +101,7 @@ def render_main(self, context, animation=False):
             y2 = height - y1
             draw_rectangle((x1, y1), (x2, y2), rfcolor)
 
+        end_draw_list()
         buffer = fb.read_color(0, 0, width, height, 4, 0, 'UBYTE')
         buffer.dimensions = width * height * 4
 
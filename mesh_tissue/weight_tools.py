@@ -3212,6 +3212,7 @@ class reaction_diffusion_free_data(Operator):
         ob = context.object
         props = ob.reaction_diffusion_settings
         props.bool_cache = False
+        rd_laplacian_cache.pop(ob.name, None)
 
         folder = Path(props.cache_dir)
         for i in range(props.cache_frame_start, props.cache_frame_end):
@@ -3230,6 +3231,89 @@ def reaction_diffusion_scene(scene, bake=False):
         if ob.reaction_diffusion_settings.run:
             reaction_diffusion_def(ob)
 
+# Reaction-Diffusion Laplacian without Numba, cached per object
+rd_laplacian_cache = {}
+
+def rd_laplacian(ob, n_verts, edge_verts):
+    '''
+    Graph Laplacian of the mesh edges as a tuple (degree, columns). The n-th
+    column holds the vertices with more than n neighbours and their n-th
+    neighbour, so that each vertex appears at most once per column.
+    Vertices is None for the columns containing all the vertices in order.
+    It is rebuilt only if the topology of the object changes.
+    '''
+    edge_verts = np.asarray(edge_verts, dtype=np.int64)
+    key = (n_verts, len(edge_verts)//2, hash(edge_verts.tobytes()))
+    cached = rd_laplacian_cache.get(ob.name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    rows = np.concatenate((edge_verts[0::2], edge_verts[1::2]))
+    neighbours = np.concatenate((edge_verts[1::2], edge_verts[0::2]))
+    order = np.argsort(rows, kind='stable')
+    rows = rows[order]
+    neighbours = neighbours[order]
+    degree = np.bincount(rows, minlength=n_verts)
+    position = np.arange(len(rows)) - np.repeat(np.cumsum(degree) - degree, degree)
+    order = np.argsort(position, kind='stable')
+    splits = np.cumsum(np.bincount(position))[:-1]
+    columns = []
+    for verts, neigh in zip(np.split(rows[order], splits), np.split(neighbours[order], splits)):
+        if len(verts) == n_verts: verts = None
+        columns.append((verts, neigh))
+    laplacian = (degree.astype(float), columns)
+    rd_laplacian_cache[ob.name] = (key, laplacian)
+    return laplacian
+
+def rd_apply_laplacian(laplacian, values, out, tmp):
+    degree, columns = laplacian
+    np.multiply(degree, values, out=out)
+    np.negative(out, out=out)
+    for verts, neigh in columns:
+        if verts is None:
+            np.take(values, neigh, out=tmp, mode='clip')
+            out += tmp
+        else:
+            out[verts] += values[neigh]
+
+def numpy_reaction_diffusion(laplacian, a, b, brush, diff_a, diff_b, f, k, dt, time_steps):
+    '''
+    Same simulation as numba_reaction_diffusion, with a cached Laplacian
+    (see rd_laplacian) and buffers allocated once for all the time steps.
+    '''
+    n_verts = len(a)
+    lap_a = np.empty(n_verts)
+    lap_b = np.empty(n_verts)
+    ab2 = np.empty(n_verts)
+    tmp = np.empty(n_verts)
+    kf = k + f
+    for i in range(time_steps):
+        rd_apply_laplacian(laplacian, a, lap_a, tmp)
+        rd_apply_laplacian(laplacian, b, lap_b, tmp)
+
+        np.multiply(b, b, out=ab2)
+        ab2 *= a
+        # a += (diff_a*lap_a - ab2 + f*(1-a))*dt
+        lap_a *= diff_a
+        lap_a -= ab2
+        np.subtract(1, a, out=tmp)
+        tmp *= f
+        lap_a += tmp
+        lap_a *= dt
+        a += lap_a
+        # b += (diff_b*lap_b + ab2 - (k+f)*b)*dt
+        lap_b *= diff_b
+        lap_b += ab2
+        np.multiply(kf, b, out=tmp)
+        lap_b -= tmp
+        lap_b *= dt
+        b += lap_b
+
+        b += brush
+        np.clip(a, 0, 1, out=a)
+        np.clip(b, 0, 1, out=b)
+    return a, b
+
 def reaction_diffusion_def(ob, bake=False):
 
     scene = bpy.context.scene
@@ -3410,29 +3494,8 @@ def reaction_diffusion_def(ob, bake=False):
             a, b = numba_reaction_diffusion(n_verts, n_edges, edge_verts, a, b, _brush, _diff_a, _diff_b, _f, _k, dt, time_steps)
         except:
             print('Not using Numba! The simulation could be slow.')
-            arr = np.arange(n_edges)*2
-            id0 = edge_verts[arr]     # first vertex indices for each edge
-            id1 = edge_verts[arr+1]   # second vertex indices for each edge
-            for i in range(time_steps):
-                b += brush
-                lap_a = np.zeros(n_verts)
-                lap_b = np.zeros(n_verts)
-                lap_a0 =  a[id1] -  a[id0]   # laplacian increment for first vertex of each edge
-                lap_b0 =  b[id1] -  b[id0]   # laplacian increment for first vertex of each edge
-
-                np.add.at(lap_a, id0, lap_a0)
-                np.add.at(lap_b, id0, lap_b0)
-                np.add.at(lap_a, id1, -lap_a0)
-                np.add.at(lap_b, id1, -lap_b0)
-
-                ab2 = a*b**2
-                a += eval("(diff_a*lap_a - ab2 + f*(1-a))*dt")
-                b += eval("(diff_b*lap_b + ab2 - (k+f)*b)*dt")
-                #a += (diff_a*lap_a - ab2 + f*(1-a))*dt
-                #b += (diff_b*lap_b + ab2 - (k+f)*b)*dt
-
-                a = nan_to_num(a)
-                b = nan_to_num(b)
+            laplacian = rd_laplacian(ob, n_verts, edge_verts)
+            a, b = numpy_reaction_diffusion(laplacian, a, b, brush, diff_a, diff_b, f, k, dt, time_steps)
 
         timeElapsed = time.time() - start
         print('       Simulation Time:',timeElapsed)
@@ -3741,29 +3804,9 @@ def fast_bake_def(ob, frame_start=1, frame_end=250):
 
     except:
         print('Not using Numba! The simulation could be slow.')
-        edge_verts = np.array(edge_verts)
-        arr = np.arange(n_edges)*2
-        id0 = edge_verts[arr]     # first vertex indices for each edge
-        id1 = edge_verts[arr+1]   # second vertex indices for each edge
+        laplacian = rd_laplacian(ob, n_verts, edge_verts)
         for j in range(props.cache_frame_start, props.cache_frame_end):
-            for i in range(time_steps):
-                b += brush
-                lap_a = np.zeros(n_verts)
-                lap_b = np.zeros(n_verts)
-                lap_a0 =  a[id1] -  a[id0]   # laplacian increment for first vertex of each edge
-                lap_b0 =  b[id1] -  b[id0]   # laplacian increment for first vertex of each edge
-
-                np.add.at(lap_a, id0, lap_a0)
-                np.add.at(lap_b, id0, lap_b0)
-                np.add.at(lap_a, id1, -lap_a0)
-                np.add.at(lap_b, id1, -lap_b0)
-
-                ab2 = a*b**2
-                a += eval("(diff_a*lap_a - ab2 + f*(1-a))*dt")
-                b += eval("(diff_b*lap_b + ab2 - (k+f)*b)*dt")
-
-                a = nan_to_num(a)
-                b = nan_to_num(b)
+            a, b = numpy_reaction_diffusion(laplacian, a, b, brush, diff_a, diff_b, f, k, dt, time_steps)
 
             if not(os.path.exists(folder)):
                 os.mkdir(folder)
@@ -4209,15 +4252,14 @@ def contour_bmesh(me, bm, weight, iso_val):
     # store weight values
 
     vertices = get_vertices_numpy(me)
-    faces_mask = np.array(bm.faces)
-    filtered_edges = get_edges_id_numpy(me)
+    edges = get_edges_numpy(me)
     n_verts = len(bm.verts)
 
     #############################
 
     # vertices indexes
-    id0 = filtered_edges[:,0]
-    id1 = filtered_edges[:,1]
+    id0 = edges[:,0]
+    id1 = edges[:,1]
     # vertices weight
     w0 = weight[id0]
     w1 = weight[id1]
@@ -4240,60 +4282,35 @@ def contour_bmesh(me, bm, weight, iso_val):
     param = np.expand_dims(param,axis=1)
     verts = v0 + (v1-v0)*param
 
-    # indexes of edges with new vertices
-    #edges_index = filtered_edges[mask_new_verts][:,2]
-
-    edges_id = {}
-    for i, e in enumerate(filtered_edges):
-        #edges_id[id] = i + n_verts
-        edges_id['{}_{}'.format(e[0],e[1])] = i + n_verts
-        edges_id['{}_{}'.format(e[1],e[0])] = i + n_verts
-
+    # index of the new vertex of each edge, -1 for the edges that are not splitted
+    edges_vert = np.full(len(edges), -1)
+    edges_vert[mask_new_verts] = np.arange(len(verts)) + n_verts
 
-    '''
-    for e in filtered_edges:
-        id0 = e.verts[0].index
-        id1 = e.verts[1].index
-        w0 = weight[id0]
-        w1 = weight[id1]
-
-        if w0 == w1: continue
-        elif w0 > iso_val and w1 > iso_val:
-            continue
-        elif w0 < iso_val and w1 < iso_val: continue
-        elif w0 == iso_val or w1 == iso_val: continue
-        else:
-            v0 = me0.vertices[id0].co
-            v1 = me0.vertices[id1].co
-            v = v0.lerp(v1, (iso_val-w0)/(w1-w0))
-            delete_edges.append(e)
-            verts.append(v)
-            edges_id[str(id0)+"_"+str(id1)] = count
-            edges_id[str(id1)+"_"+str(id0)] = count
-            count += 1
-    '''
+    # face-to-edge table: the edge following each corner of the faces
+    loops_vert = get_attribute_numpy(me.loops, 'vertex_index')
+    loops_new_vert = edges_vert[get_attribute_numpy(me.loops, 'edge_index')]
+    loop_start = get_attribute_numpy(me.polygons, 'loop_start')
+    loop_total = get_attribute_numpy(me.polygons, 'loop_total')
+    # only the faces crossed by the contour are splitted
+    faces_mask = np.logical_or.reduceat(loops_new_vert >= 0, loop_start)
 
     splitted_faces = []
 
     switch = False
     # splitting faces
-    for f in faces_mask:
+    for start, total in zip(loop_start[faces_mask].tolist(), loop_total[faces_mask].tolist()):
         # create sub-faces slots. Once a new vertex is reached it will
         # change slot, storing the next vertices for a new face.
         build_faces = [[],[]]
-        #switch = False
-        verts0 = list(me.polygons[f.index].vertices)
-        verts1 = list(verts0)
-        verts1.append(verts1.pop(0)) # shift list
-        for id0, id1 in zip(verts0, verts1):
+        face_verts = loops_vert[start:start+total].tolist()
+        face_new_verts = loops_new_vert[start:start+total].tolist()
+        for id0, new_vert in zip(face_verts, face_new_verts):
 
             # add first vertex to active slot
             build_faces[switch].append(id0)
 
-            # try to split edge
-            try:
-                # check if the edge must be splitted
-                new_vert = edges_id['{}_{}'.format(id0,id1)]
+            # check if the edge must be splitted
+            if new_vert >= 0:
                 # add new vertex
                 build_faces[switch].append(new_vert)
                 # if there is an open face on the other slot
@@ -4306,7 +4323,6 @@ def contour_bmesh(me, bm, weight, iso_val):
                 switch = not switch
                 # continue previous face
                 build_faces[switch].append(new_vert)
-            except: pass
         if len(build_faces[not switch]) == 2:
             build_faces[not switch].append(id0)
         if len(build_faces[not switch]) > 2:
@@ -4319,19 +4335,13 @@ def contour_bmesh(me, bm, weight, iso_val):
     for v in verts: _new_vert(v)
     bm.verts.ensure_lookup_table()
 
-    # deleting old edges/faces
-    bm.edges.ensure_lookup_table()
-    remove_edges = [bm.edges[i] for i in filtered_edges[:,2]]
-    #for e in remove_edges: bm.edges.remove(e)
-    #for e in delete_edges: bm.edges.remove(e)
-
-    bm.verts.ensure_lookup_table()
     # adding new faces use fast local method access
     _new_face = bm.faces.new
+    bm_verts = bm.verts
     missed_faces = []
     for f in splitted_faces:
         try:
-            face_verts = [bm.verts[i] for i in f]
+            face_verts = [bm_verts[i] for i in f]
             _new_face(face_verts)
         except:
             missed_faces.append(f)
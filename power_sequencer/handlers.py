@@ -3,6 +3,8 @@
 import bpy
 from bpy.app.handlers import persistent
 
+from .operators.utils.strip_index import invalidate_strip_index
+
 
 @persistent
 def power_sequencer_playback_speed_post(scene):
@@ -31,6 +33,15 @@ def power_sequencer_playback_speed_post(scene):
         bpy.ops.screen.frame_offset(delta=target_frame - scene.frame_current)
 
 
+@persistent
+def power_sequencer_strip_index_update(scene, depsgraph=None):
+    """
+    Handler function that marks the cached strip index as outdated
+    whenever strips may have changed
+    """
+    invalidate_strip_index()
+
+
 def draw_playback_speed(self, context):
     layout = self.layout
     scene = context.scene
@@ -42,6 +53,14 @@ def draw_ui_menu(self, context):
     layout.menu("POWER_SEQUENCER_MT_main")
 
 
+STRIP_INDEX_HANDLERS = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
 def register_handlers():
     # Menus
     bpy.types.SEQUENCER_HT_header.append(draw_ui_menu)
@@ -49,6 +68,8 @@ def register_handlers():
 
     # Handlers
     bpy.app.handlers.frame_change_post.append(power_sequencer_playback_speed_post)
+    for handlers in STRIP_INDEX_HANDLERS:
+        handlers.append(power_sequencer_strip_index_update)
 
 
 def unregister_handlers():
@@ -58,3 +79,5 @@ def unregister_handlers():
 
     # Handlers
     bpy.app.handlers.frame_change_post.remove(power_sequencer_playback_speed_post)
+    for handlers in STRIP_INDEX_HANDLERS:
+        handlers.remove(power_sequencer_strip_index_update)
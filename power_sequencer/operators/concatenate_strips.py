@@ -9,6 +9,7 @@ from .utils.functions import (
     get_mouse_frame_and_channel,
     ripple_move,
 )
+from .utils.strip_index import invalidate_strip_index
 from .utils.doc import doc_name, doc_idname, doc_brief, doc_description
 
 
@@ -150,6 +151,7 @@ class POWER_SEQUENCER_OT_concatenate_strips(bpy.types.Operator):
                 ripple_move(context, [s], -gap)
             else:
                 s.frame_start -= gap
+                invalidate_strip_index()
             concatenate_start = s.frame_final_end if self.is_towards_left else s.frame_final_start
             last_gap = gap
 
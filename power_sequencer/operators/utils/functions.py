@@ -6,6 +6,7 @@ from operator import attrgetter
 import bpy
 
 from .global_settings import SequenceTypes
+from .strip_index import get_strip_index, invalidate_strip_index
 
 max_channel = 32
 min_channel = 1
@@ -89,32 +90,17 @@ def find_sequences_after(context, sequence):
         - Sequences, the sequences to check
     Returns all the strips after the sequence in the current context
     """
-    return [s for s in context.sequences if s.frame_final_start > sequence.frame_final_start]
+    return get_strip_index(context).strips_starting_from(
+        sequence.frame_final_start, inclusive=False
+    )
 
 
 def find_snap_candidate(context, frame=0):
     """
     Returns the cut frame closest to the `frame` argument
     """
-    snap_candidate = 1000000
-
-    for s in context.sequences:
-        start_to_frame = frame - s.frame_final_start
-        end_to_frame = frame - s.frame_final_end
-
-        distance_to_start = abs(start_to_frame)
-        distance_to_end = abs(end_to_frame)
-
-        candidate = (
-            frame - start_to_frame
-            if min(distance_to_start, distance_to_end) == distance_to_start
-            else frame - end_to_frame
-        )
-
-        if abs(frame - candidate) < abs(frame - snap_candidate):
-            snap_candidate = candidate
-
-    return snap_candidate
+    snap_candidate = get_strip_index(context).closest_cut(frame)
+    return 1000000 if snap_candidate is None else snap_candidate
 
 
 def find_strips_mouse(context, frame, channel, select_linked=False):
@@ -127,15 +113,12 @@ def find_strips_mouse(context, frame, channel, select_linked=False):
     Returns the sequence(s) under the mouse cursor as a list
     Returns an empty list if nothing found
     """
-    sequences = [
-        s
-        for s in context.sequences
-        if not s.lock and s.channel == channel and s.frame_final_start <= frame <= s.frame_final_end
-    ]
+    index = get_strip_index(context)
+    sequences = [s for s in index.strips_at_frame(frame, channel) if not s.lock]
     if select_linked:
         linked_strips = [
             s
-            for s in context.sequences
+            for s in index.strips_at_frame(sequences[0].frame_final_start)
             if s.frame_final_start == sequences[0].frame_final_start
             and s.frame_final_end == sequences[0].frame_final_end
         ]
@@ -275,6 +258,7 @@ def trim_strips(context, frame_start, frame_end, to_trim, to_delete=[]):
             s.frame_final_start = trim_end
         elif s.frame_final_end > trim_start and s.frame_final_start < trim_start:
             s.frame_final_end = trim_start
+    invalidate_strip_index()
 
     delete_strips(to_delete)
     for s in initial_selection:
@@ -287,6 +271,13 @@ def find_closest_surrounding_cuts(context, frame):
     Returns a tuple of (strip_before, strip_after), the two closest sequences around a gap.
     If the frame is in the middle of a strip, both strips may be the same.
     """
+    index = get_strip_index(context)
+    strip_before, frame_before = index.last_cut_before(frame)
+    strip_after, frame_after = index.first_cut_after(frame)
+    if strip_before and strip_after:
+        return strip_before, strip_after
+
+    # Fall back to the original scan when there is no cut on either side
     strip_before = max(
         context.sequences,
         key=lambda s: s.frame_final_end
@@ -318,9 +309,7 @@ def find_closest_surrounding_cuts_frames(context, frame):
 def get_sequences_under_cursor(context):
     frame = context.scene.frame_current
     under_cursor = [
-        s
-        for s in context.sequences
-        if s.frame_final_start <= frame and s.frame_final_end >= frame and not s.lock
+        s for s in get_strip_index(context).strips_at_frame(frame) if not s.lock
     ]
     return under_cursor
 
@@ -333,10 +322,11 @@ def ripple_move(context, sequences, duration_frames, delete=False):
     """
     channels = {s.channel for s in sequences}
     first_strip = min(sequences, key=lambda s: s.frame_final_start)
+    index = get_strip_index(context)
     to_ripple = [
         s
-        for s in context.sequences
-        if s.channel in channels and s.frame_final_start >= first_strip.frame_final_start
+        for channel in sorted(channels)
+        for s in index.strips_starting_from(first_strip.frame_final_start, channel)
     ]
 
     if delete:
@@ -363,7 +353,8 @@ def find_strips_in_range(frame_start, frame_end, sequences, find_overlapping=Tru
     strips_inside_range = []
     strips_overlapping_range = []
     if not sequences:
-        sequences = bpy.context.sequences
+        # Only strips intersecting the range can be inside or overlapping it
+        sequences = get_strip_index(bpy.context).strips_in_range(frame_start, frame_end)
     for s in sequences:
         if (
             frame_start <= s.frame_final_start <= frame_end
@@ -392,6 +383,7 @@ def delete_strips(to_delete):
     sequences = bpy.context.scene.sequence_editor.sequences
     for s in to_delete:
         sequences.remove(s)
+    invalidate_strip_index()
 
 
 def move_selection(context, sequences, frame_offset, channel_offset=0):
@@ -406,6 +398,7 @@ def move_selection(context, sequences, frame_offset, channel_offset=0):
     for s in sequences:
         s.select = True
     bpy.ops.transform.seq_slide(value=(frame_offset, channel_offset))
+    invalidate_strip_index()
     bpy.ops.sequencer.select_all(action="DESELECT")
     for s in initial_selection:
         s.select = True
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2016-2020 by Nathan Lovato, Daniel Oakey, Razvan Radulescu, and contributors
+"""
+Cached index of the strips in the current sequencer context, to answer frame and channel
+queries with binary searches instead of scanning every strip.
+
+The index is rebuilt lazily after invalidate_strip_index() is called. The add-on calls it from
+depsgraph update and undo handlers, and the helpers in functions.py call it after they change
+strips. Operators that move strips by hand and then query the index in the same call must
+invalidate it themselves.
+"""
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+_cache = {"key": None, "index": None}
+_generation = 0
+
+
+class StripIndex:
+    """
+    Sorted arrays of strip start and end frames, globally and per channel.
+    Query results are returned in the order of the sequences the index was built from.
+    """
+
+    def __init__(self, sequences):
+        self.sequences = list(sequences)
+        self.order = {s: i for i, s in enumerate(self.sequences)}
+
+        self.by_start = sorted(self.sequences, key=attrgetter("frame_final_start"))
+        self.starts = [s.frame_final_start for s in self.by_start]
+        self.by_end = sorted(self.sequences, key=attrgetter("frame_final_end"))
+        self.ends = [s.frame_final_end for s in self.by_end]
+        self.max_duration = max(
+            (s.frame_final_end - s.frame_final_start for s in self.sequences), default=0
+        )
+        self.cuts = sorted(set(self.starts) | set(self.ends))
+
+        self.channels = {}
+        for s in self.by_start:
+            self.channels.setdefault(s.channel, []).append(s)
+        self.channel_starts = {
+            channel: [s.frame_final_start for s in strips]
+            for channel, strips in self.channels.items()
+        }
+
+    def _sorted(self, strips):
+        return sorted(strips, key=self.order.__getitem__)
+
+    def _candidates(self, frame_start, frame_end, channel=None):
+        """
+        Returns the strips that can intersect the closed range [frame_start, frame_end]:
+        the ones starting between frame_start - max_duration and frame_end
+        """
+        if channel is None:
+            strips, starts = self.by_start, self.starts
+        else:
+            strips, starts = self.channels.get(channel, []), self.channel_starts.get(channel, [])
+        lo = bisect_left(starts, frame_start - self.max_duration)
+        hi = bisect_right(starts, frame_end)
+        return strips[lo:hi]
+
+    def strips_in_range(self, frame_start, frame_end, channel=None):
+        """Returns the strips with frame_final_start <= frame_end and frame_final_end >= frame_start"""
+        return self._sorted(
+            s
+            for s in self._candidates(frame_start, frame_end, channel)
+            if s.frame_final_end >= frame_start
+        )
+
+    def strips_at_frame(self, frame, channel=None):
+        """Returns the strips with frame_final_start <= frame <= frame_final_end"""
+        return self.strips_in_range(frame, frame, channel)
+
+    def strips_starting_from(self, frame, channel=None, inclusive=True):
+        """Returns the strips starting at or after `frame`, or strictly after if not `inclusive`"""
+        if channel is None:
+            strips, starts = self.by_start, self.starts
+        else:
+            strips, starts = self.channels.get(channel, []), self.channel_starts.get(channel, [])
+        bisect = bisect_left if inclusive else bisect_right
+        return self._sorted(strips[bisect(starts, frame) :])
+
+    def closest_cut(self, frame):
+        """Returns the strip start or end frame closest to `frame`, or None if there are no strips"""
+        i = bisect_left(self.cuts, frame)
+        candidates = self.cuts[max(0, i - 1) : i + 1]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda cut: abs(frame - cut))
+
+    def last_cut_before(self, frame):
+        """
+        Returns the strip whose last cut at or before `frame` is the closest to it, along with
+        that cut frame, or (None, None)
+        """
+        best, best_frame = None, None
+        i = bisect_right(self.ends, frame)
+        if i > 0:
+            best, best_frame = self.by_end[i - 1], self.ends[i - 1]
+        for s in self._candidates(frame, frame):
+            if s.frame_final_end > frame and (best is None or s.frame_final_start > best_frame):
+                best, best_frame = s, s.frame_final_start
+        return best, best_frame
+
+    def first_cut_after(self, frame):
+        """
+        Returns the strip whose first cut at or after `frame` is the closest to it, along with
+        that cut frame, or (None, None)
+        """
+        best, best_frame = None, None
+        i = bisect_left(self.starts, frame)
+        if i < len(self.starts):
+            best, best_frame = self.by_start[i], self.starts[i]
+        for s in self._candidates(frame, frame):
+            if (
+                s.frame_final_start < frame <= s.frame_final_end
+                and (best is None or s.frame_final_end < best_frame)
+            ):
+                best, best_frame = s, s.frame_final_end
+        return best, best_frame
+
+
+def invalidate_strip_index():
+    """Marks the cached strip index as outdated"""
+    global _generation
+    _generation += 1
+
+
+def get_strip_index(context):
+    """Returns the StripIndex for context.sequences, rebuilding it if it is outdated"""
+    sequence_editor = context.scene.sequence_editor
+    meta_stack = sequence_editor.meta_stack
+    # The strips of the current meta level, counted without building context.sequences
+    strips = meta_stack[-1].sequences if meta_stack else sequence_editor.sequences
+    key = (
+        _generation,
+        context.scene.as_pointer(),
+        tuple(m.as_pointer() for m in meta_stack),
+        len(strips),
+    )
+    if _cache["key"] != key:
+        _cache["key"] = key
+        _cache["index"] = StripIndex(context.sequences)
+    return _cache["index"]
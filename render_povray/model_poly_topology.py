@@ -6,6 +6,10 @@ Here polygon meshes as POV mesh2 objects.
 """
 
 import bpy
+import os
+import hashlib
+import tempfile
+import numpy as np
 from . import texturing
 from .scenography import image_format, img_map, img_map_transforms
 from .shading import write_object_material_interior
@@ -26,6 +30,366 @@ def write_object_csg_inside_vector(ob, file):
             )
             has_csg_inside_vector = True
 
+def write_mesh_texture_list(file,
+                            ob,
+                            me_materials,
+                            facesMaterials,
+                            material_names_dictionary,
+                            unpacked_images,
+                            tab_write):
+    """Write the mesh2 texture list of a mesh without vertex colors, one texture per material.
+
+    facesMaterials lists the material indices used by the faces, in order of appearance.
+    Return the dictionary mapping (diffuse color, material index) to texture list index."""
+    from .render import (
+        string_strip_hyphen,
+        comments,
+        preview_dir,
+    )
+
+    vertCols = {}
+    # No vertex colors, so write material colors as vertex colors
+
+    for i, material in enumerate(me_materials):
+        if (
+            material and material.pov.material_use_nodes is False
+        ):  # WARNING!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+            # Multiply diffuse with SSS Color
+            if material.pov_subsurface_scattering.use:
+                diffuse_color = [
+                    i * j
+                    for i, j in zip(
+                        material.pov_subsurface_scattering.color[:],
+                        material.diffuse_color[:],
+                    )
+                ]
+                key = (
+                    diffuse_color[0],
+                    diffuse_color[1],
+                    diffuse_color[2],
+                    i,
+                )  # i == f.mat
+                vertCols[key] = [-1]
+            else:
+                diffuse_color = material.diffuse_color[:]
+                key = (
+                    diffuse_color[0],
+                    diffuse_color[1],
+                    diffuse_color[2],
+                    i,
+                )  # i == f.mat
+                vertCols[key] = [-1]
+
+            idx = 0
+            texturing.local_material_names = []
+            for col, index in vertCols.items():
+                # if me_materials:
+                mater = me_materials[col[3]]
+                if me_materials is not None:
+                    texturing.write_texture_influence(
+                        file,
+                        mater,
+                        material_names_dictionary,
+                        image_format,
+                        img_map,
+                        img_map_transforms,
+                        tab_write,
+                        comments,
+                        col,
+                        preview_dir,
+                        unpacked_images,
+                    )
+                # ------------------------------------------------
+                index[0] = idx
+                idx += 1
+
+    # Vert Colors
+    tab_write(file, "texture_list {\n")
+    # In case there's is no material slot, give at least one texture
+    # (an empty one so it uses pov default)
+    if len(vertCols) != 0:
+        tab_write(
+            file, "%s" % (len(vertCols))
+        )  # vert count
+    else:
+        tab_write(file, "1")
+    # below "material" alias, added check obj.active_material
+    # to avoid variable referenced before assignment error
+    try:
+        material = ob.active_material
+    except IndexError:
+        # when no material slot exists,
+        material = None
+
+    # WARNING!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    if (
+        material
+        and ob.active_material is not None
+        and not material.pov.material_use_nodes
+        and not material.use_nodes
+    ):
+        if material.pov.replacement_text != "":
+            file.write("\n")
+            file.write(" texture{%s}\n" % material.pov.replacement_text)
+
+        else:
+            # Loop through declared materials list
+            # global local_material_names
+            for cMN in texturing.local_material_names:
+                if material != "Default":
+                    file.write("\n texture{MAT_%s}\n" % cMN)
+                    # use string_strip_hyphen(material_names_dictionary[material]))
+                    # or Something like that to clean up the above?
+    elif material and material.pov.material_use_nodes:
+        for index in facesMaterials:
+            faceMaterial = string_strip_hyphen(
+                bpy.path.clean_name(me_materials[index].name)
+            )
+            file.write("\n texture{%s}\n" % faceMaterial)
+    # END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    elif vertCols:
+        for cMN in vertCols: # or in texturing.local_material_names:
+            # if possible write only one, though
+            file.write(" texture{}\n")
+    else:
+        file.write(" texture{}\n")
+    tab_write(file, "}\n")
+    return vertCols
+
+def format_vectors(values, row_format, separator):
+    """Format all rows of a 2D array with a single string formatting operation"""
+    if not len(values):
+        return ""
+    return separator + separator.join([row_format] * len(values)) % tuple(values.ravel().tolist())
+
+
+# Include files referenced by the current export, the other ones are pruned after it
+used_cache_files = set()
+
+
+def mesh_cache_dir(pov_path):
+    """Return the directory of the cached mesh include files of an exported .pov file
+
+    Temporary .pov files share a directory with other sessions, so their includes are kept in
+    the session's own temporary directory, otherwise they go next to the .pov file, one
+    directory per exported file name."""
+    if bpy.context.scene.pov.tempfiles_enable:
+        return os.path.join(bpy.app.tempdir, "pov_mesh_cache")
+    pov_dir, pov_name = os.path.split(os.path.abspath(pov_path))
+    return os.path.join(pov_dir, "pov_mesh_cache", os.path.splitext(pov_name)[0])
+
+
+def write_cached_mesh2_include(cache_dir, key, suffix, write_func):
+    """Return the path of the cached include file for the key, writing it first if missing"""
+    path = os.path.join(cache_dir, "mesh2_%s_%s.inc" % (key, suffix))
+    if not os.path.exists(path):
+        # a unique name, other renders may be writing the same include
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=cache_dir)
+        with os.fdopen(fd, "w") as include_file:
+            write_func(include_file)
+        os.replace(temp_path, path)
+    used_cache_files.add(path)
+    return path.replace("\\", "/")
+
+
+def prune_mesh_cache(pov_path):
+    """Delete the cached include files the last export of pov_path did not use.
+
+    Meshes deforming over an animation get new include files every frame, so only the
+    ones of the latest export are kept, and the directory is removed once it is empty.
+    Include files still being written (.tmp) are left alone."""
+    cache_dir = mesh_cache_dir(pov_path)
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith(".inc") and path not in used_cache_files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        try:
+            os.rmdir(cache_dir)
+        except OSError:
+            pass  # still in use
+    used_cache_files.clear()
+
+
+def export_mesh_cached(file,
+                       ob,
+                       me,
+                       uv_layer,
+                       povdataname,
+                       material_names_dictionary,
+                       unpacked_images,
+                       tab_level,
+                       tab_write,
+                       linebreaksinlists):
+    """Write a mesh without vertex colors as a mesh2 whose lists live in #include files.
+
+    The include files are named after a hash of the evaluated geometry and of the material
+    mapping, so they are only written for meshes that changed since a previous export, and
+    their text is formatted from NumPy arrays. Textures and object modifiers are still
+    written inline in the main file."""
+    from .render import tab
+
+    cache_dir = mesh_cache_dir(file.name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    me_materials = me.materials
+    vert_count = len(me.vertices)
+    tri_count = len(me.loop_triangles)
+
+    verts_co = np.empty(vert_count * 3, dtype=np.float32)
+    me.vertices.foreach_get("co", verts_co)
+    verts_co = verts_co.reshape(-1, 3)
+    verts_normals = np.empty(vert_count * 3, dtype=np.float32)
+    me.vertices.foreach_get("normal", verts_normals)
+    verts_normals = verts_normals.reshape(-1, 3)
+
+    faces_verts = np.empty(tri_count * 3, dtype=np.int32)
+    me.loop_triangles.foreach_get("vertices", faces_verts)
+    faces_verts = faces_verts.reshape(-1, 3)
+    faces_loops = np.empty(tri_count * 3, dtype=np.int32)
+    me.loop_triangles.foreach_get("loops", faces_loops)
+    faces_normals = np.empty(tri_count * 3, dtype=np.float32)
+    me.loop_triangles.foreach_get("normal", faces_normals)
+    faces_normals = faces_normals.reshape(-1, 3)
+    faces_smooth = np.empty(tri_count, dtype=bool)
+    me.loop_triangles.foreach_get("use_smooth", faces_smooth)
+    faces_material = np.empty(tri_count, dtype=np.int32)
+    me.loop_triangles.foreach_get("material_index", faces_material)
+
+    # Material indices used by faces, in order of appearance
+    used, first = np.unique(faces_material, return_index=True)
+    facesMaterials = used[np.argsort(first)].tolist() if me_materials else []
+
+    # Unique normals: vertex normals for smooth faces, face normal otherwise
+    corner_normals = np.where(
+        faces_smooth[:, None, None],
+        verts_normals[faces_verts],
+        faces_normals[:, None, :],
+    ).reshape(-1, 3)
+    unique_normals, normal_indices = np.unique(corner_normals, axis=0, return_inverse=True)
+    normal_indices = normal_indices.reshape(-1, 3)
+
+    if uv_layer:
+        loops_uv = np.empty(len(me.loops) * 2, dtype=np.float32)
+        uv_layer.foreach_get("uv", loops_uv)
+        corner_uvs = loops_uv.reshape(-1, 2)[faces_loops]
+        unique_uvs, uv_indices = np.unique(corner_uvs, axis=0, return_inverse=True)
+        uv_indices = uv_indices.reshape(-1, 3)
+
+    # Textures are written inline, they are only indexed from the cached lists
+    file.write("\n")
+    tab_write(file, "#declare %s =\n" % povdataname)
+    tab_write(file, "mesh2 {\n")
+
+    hasher = hashlib.sha1()
+    for array in (verts_co, verts_normals, faces_verts, faces_normals, faces_smooth):
+        hasher.update(array.tobytes())
+    if uv_layer:
+        hasher.update(corner_uvs.tobytes())
+    tab_str = tab * tab_level if linebreaksinlists else ""
+    separator = ",\n" + tab_str if linebreaksinlists else ", "
+    hasher.update(separator.encode())
+    vectors_key = hasher.hexdigest()
+
+    def write_vectors(include_file):
+        include_file.write("vertex_vectors {\n%d" % vert_count)
+        include_file.write(format_vectors(verts_co, "<%.6f, %.6f, %.6f>", separator))
+        include_file.write("\n}\n")
+        include_file.write("normal_vectors {\n%d" % len(unique_normals))
+        include_file.write(format_vectors(unique_normals, "<%.6f, %.6f, %.6f>", separator))
+        include_file.write("\n}\n")
+        if uv_layer:
+            include_file.write("uv_vectors {\n%d" % len(unique_uvs))
+            include_file.write(format_vectors(unique_uvs, "<%.6f, %.6f>", separator))
+            include_file.write("\n}\n")
+
+    path = write_cached_mesh2_include(cache_dir, vectors_key, "vectors", write_vectors)
+    tab_write(file, '#include "%s"\n' % path)
+
+    vertCols = write_mesh_texture_list(file,
+                                       ob,
+                                       me_materials,
+                                       facesMaterials,
+                                       material_names_dictionary,
+                                       unpacked_images,
+                                       tab_write)
+
+    # Texture index of each material, -1 where the face is written without one
+    material_texture = []
+    for material_index, material in enumerate(me_materials):
+        if material is None:
+            material_texture.append(-1)
+        elif material.pov.material_use_nodes:
+            material_texture.append(0)
+        else:
+            if material.pov_subsurface_scattering.use:
+                diffuse_color = [
+                    i * j
+                    for i, j in zip(
+                        material.pov_subsurface_scattering.color[:],
+                        material.diffuse_color[:],
+                    )
+                ]
+            else:
+                diffuse_color = material.diffuse_color[:]
+            material_texture.append(vertCols[(*diffuse_color[:3], material_index)][0])
+    if material_texture:
+        faces_texture = np.array(material_texture, dtype=np.int32)[faces_material]
+    else:
+        faces_texture = np.full(tri_count, -1, dtype=np.int32)
+
+    hasher.update(faces_texture.tobytes())
+    indices_key = hasher.hexdigest()
+
+    def write_indices(include_file):
+        textured = faces_texture >= 0
+        include_file.write("face_indices {\n%d" % tri_count)
+        if textured.all():
+            face_rows = np.column_stack((faces_verts, faces_texture, faces_texture, faces_texture))
+            include_file.write(format_vectors(face_rows, "<%d,%d,%d>, %d,%d,%d", separator))
+        elif not textured.any():
+            include_file.write(format_vectors(faces_verts, "<%d,%d,%d>", separator))
+        else:
+            include_file.write(separator + separator.join(
+                "<%d,%d,%d>, %d,%d,%d" % (*fv, ci, ci, ci) if ci >= 0 else "<%d,%d,%d>" % tuple(fv)
+                for fv, ci in zip(faces_verts.tolist(), faces_texture.tolist())
+            ))
+        include_file.write("\n}\n")
+        include_file.write("normal_indices {\n%d" % tri_count)
+        include_file.write(format_vectors(normal_indices, "<%d,%d,%d>", separator))
+        include_file.write("\n}\n")
+        if uv_layer:
+            include_file.write("uv_indices {\n%d" % tri_count)
+            include_file.write(format_vectors(uv_indices, "<%d,%d,%d>", separator))
+            include_file.write("\n}\n")
+
+    path = write_cached_mesh2_include(cache_dir, indices_key, "indices", write_indices)
+    tab_write(file, '#include "%s"\n' % path)
+
+    # XXX BOOLEAN
+    write_object_csg_inside_vector(ob, file)
+    if me.materials:
+        try:
+            material = me.materials[0]  # dodgy
+            write_object_material_interior(file, material, ob, tab_write)
+        except IndexError:
+            print(me)
+
+    # POV object modifiers such as
+    # hollow / sturm / double_illuminate etc.
+    write_object_modifiers(ob, file)
+
+    # Importance for radiosity sampling added here:
+    tab_write(file, "radiosity { \n")
+    tab_write(file, "importance %3g \n" % ob.pov.importance_value)
+    tab_write(file, "}\n")
+
+    tab_write(file, "}\n")  # End of mesh block
+
+
 def export_mesh(file,
                 ob,
                 povdataname,
@@ -91,6 +455,20 @@ def export_mesh(file,
     except AttributeError:
         vcol_layer = None
 
+    if bpy.context.scene.pov.mesh_cache_enable and not me.vertex_colors:
+        export_mesh_cached(file,
+                           ob,
+                           me,
+                           uv_layer,
+                           povdataname,
+                           material_names_dictionary,
+                           unpacked_images,
+                           tab_level,
+                           tab_write,
+                           linebreaksinlists)
+        ob_eval.to_mesh_clear()
+        return True
+
     faces_verts = [f.vertices[:] for f in me_faces]
     faces_normals = [f.normal[:] for f in me_faces]
     verts_normals = [v.normal[:] for v in me.vertices]
@@ -440,112 +818,13 @@ def export_mesh(file,
                                        facesMaterials)
             for f in new_me_faces_mat_idx:
                 facesMaterials.append(f.material_index)
-        # No vertex colors, so write material colors as vertex colors
-
-        for i, material in enumerate(me_materials):
-            if (
-                material and material.pov.material_use_nodes is False
-            ):  # WARNING!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-                # Multiply diffuse with SSS Color
-                if material.pov_subsurface_scattering.use:
-                    diffuse_color = [
-                        i * j
-                        for i, j in zip(
-                            material.pov_subsurface_scattering.color[:],
-                            material.diffuse_color[:],
-                        )
-                    ]
-                    key = (
-                        diffuse_color[0],
-                        diffuse_color[1],
-                        diffuse_color[2],
-                        i,
-                    )  # i == f.mat
-                    vertCols[key] = [-1]
-                else:
-                    diffuse_color = material.diffuse_color[:]
-                    key = (
-                        diffuse_color[0],
-                        diffuse_color[1],
-                        diffuse_color[2],
-                        i,
-                    )  # i == f.mat
-                    vertCols[key] = [-1]
-
-                idx = 0
-                texturing.local_material_names = []
-                for col, index in vertCols.items():
-                    # if me_materials:
-                    mater = me_materials[col[3]]
-                    if me_materials is not None:
-                        texturing.write_texture_influence(
-                            file,
-                            mater,
-                            material_names_dictionary,
-                            image_format,
-                            img_map,
-                            img_map_transforms,
-                            tab_write,
-                            comments,
-                            col,
-                            preview_dir,
-                            unpacked_images,
-                        )
-                    # ------------------------------------------------
-                    index[0] = idx
-                    idx += 1
-
-        # Vert Colors
-        tab_write(file, "texture_list {\n")
-        # In case there's is no material slot, give at least one texture
-        # (an empty one so it uses pov default)
-        if len(vertCols) != 0:
-            tab_write(
-                file, "%s" % (len(vertCols))
-            )  # vert count
-        else:
-            tab_write(file, "1")
-        # below "material" alias, added check obj.active_material
-        # to avoid variable referenced before assignment error
-        try:
-            material = ob.active_material
-        except IndexError:
-            # when no material slot exists,
-            material = None
-
-        # WARNING!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-        if (
-            material
-            and ob.active_material is not None
-            and not material.pov.material_use_nodes
-            and not material.use_nodes
-        ):
-            if material.pov.replacement_text != "":
-                file.write("\n")
-                file.write(" texture{%s}\n" % material.pov.replacement_text)
-
-            else:
-                # Loop through declared materials list
-                # global local_material_names
-                for cMN in texturing.local_material_names:
-                    if material != "Default":
-                        file.write("\n texture{MAT_%s}\n" % cMN)
-                        # use string_strip_hyphen(material_names_dictionary[material]))
-                        # or Something like that to clean up the above?
-        elif material and material.pov.material_use_nodes:
-            for index in facesMaterials:
-                faceMaterial = string_strip_hyphen(
-                    bpy.path.clean_name(me_materials[index].name)
-                )
-                file.write("\n texture{%s}\n" % faceMaterial)
-        # END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-        elif vertCols:
-            for cMN in vertCols: # or in texturing.local_material_names:
-                # if possible write only one, though
-                file.write(" texture{}\n")
-        else:
-            file.write(" texture{}\n")
-        tab_write(file, "}\n")
+        vertCols = write_mesh_texture_list(file,
+                                           ob,
+                                           me_materials,
+                                           facesMaterials,
+                                           material_names_dictionary,
+                                           unpacked_images,
+                                           tab_write)
 
         # Face indices
         tab_write(file, "face_indices {\n")
@@ -24,6 +24,7 @@ from . import shading  # for BI POV shaders emulation
 from . import nodes_fn
 from . import texturing_procedural # for Blender procedurals to POV patterns emulation
 from . import model_all  # for mesh based geometry
+from . import model_poly_topology  # for the cached mesh include files
 from . import model_meta_topology  # for mesh based geometry
 from . import model_curve_topology  # for curves based geometry
 
@@ -251,6 +252,7 @@ global_matrix = mathutils.Matrix.Rotation(-pi / 2.0, 4, 'X')
 def write_pov(filename, scene=None, info_callback=None):
     """Main export process from Blender UI to POV syntax and write to exported file """
 
+    model_poly_topology.used_cache_files.clear()
     with open(filename, "w") as file:
         # Only for testing
         if not scene:
@@ -585,6 +587,7 @@ def write_pov(filename, scene=None, info_callback=None):
 
     if not file.closed:
         file.close()
+    model_poly_topology.prune_mesh_cache(filename)
 
 def write_pov_ini(filename_ini, filename_log, filename_pov, filename_image):
     """Write ini file."""
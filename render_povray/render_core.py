@@ -192,6 +192,24 @@ class PovRender(bpy.types.RenderEngine):
         else:
             pass
 
+    def _command_line_args(self, scene):
+        """Gather POV-Ray command line arguments from preferences and scene settings"""
+        extra_args = []
+        # Always add user preferences include path field when specified
+        if (pov_documents := bpy.context.preferences.addons[__package__].preferences.docpath_povray)!="":
+            extra_args.append("+L"+ pov_documents)
+        if scene.pov.command_line_switches != "":
+            extra_args.extend(iter(scene.pov.command_line_switches.split(" ")))
+        self._is_windows = False
+        if platform.startswith('win'):
+            self._is_windows = True
+            if "/EXIT" not in extra_args and not scene.pov.pov_editor:
+                extra_args.append("/EXIT")
+        else:
+            # added -d option to prevent render window popup which leads to segfault on linux
+            extra_args.append("-d")
+        return extra_args
+
     def _render(self, depsgraph):
         """Export necessary files and render image."""
         scene = bpy.context.scene
@@ -211,20 +229,7 @@ class PovRender(bpy.types.RenderEngine):
 
         print("***-STARTING-***")
 
-        extra_args = []
-        # Always add user preferences include path field when specified
-        if (pov_documents := bpy.context.preferences.addons[__package__].preferences.docpath_povray)!="":
-            extra_args.append("+L"+ pov_documents)
-        if scene.pov.command_line_switches != "":
-            extra_args.extend(iter(scene.pov.command_line_switches.split(" ")))
-        self._is_windows = False
-        if platform.startswith('win'):
-            self._is_windows = True
-            if "/EXIT" not in extra_args and not scene.pov.pov_editor:
-                extra_args.append("/EXIT")
-        else:
-            # added -d option to prevent render window popup which leads to segfault on linux
-            extra_args.append("-d")
+        extra_args = self._command_line_args(scene)
 
         # Start Rendering!
         try:
@@ -247,6 +252,131 @@ class PovRender(bpy.types.RenderEngine):
             print("Command line arguments passed: " + str(extra_args))
             return True
 
+    @staticmethod
+    def _stop_processes(processes):
+        """Terminate the POV-Ray processes and wait for them, so that none is left as a zombie"""
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+        for process in processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def _render_bands(self, x, y, band_count):
+        """Render the exported scene as horizontal bands, each with its own POV-Ray process.
+
+        All processes share the same .pov and .ini files, and only override the rendered rows
+        (+SR/+ER) and the output file. Bands are loaded into the render result as they finish.
+        Return False if POV-Ray could not be started, a band failed or the render was cancelled."""
+        scene = bpy.context.scene
+
+        pov_binary = PovRender._locate_binary()
+        if not pov_binary:
+            print("POV-Ray 3.7: could not execute povray, possibly POV-Ray isn't installed")
+            return False
+
+        render.write_pov_ini(
+            self._temp_file_ini, self._temp_file_log, self._temp_file_in, self._temp_file_out
+        )
+        extra_args = self._command_line_args(scene)
+
+        band_count = min(band_count, y)
+        rows = [round(i * y / band_count) for i in range(band_count + 1)]
+        base_out = os.path.splitext(self._temp_file_out)[0]
+        bands = []
+
+        print("***-STARTING %d BANDS-***" % band_count)
+        try:
+            for i in range(band_count):
+                start_row, end_row = rows[i] + 1, rows[i + 1]
+                band_out = "%s_band%03d.png" % (base_out, i)
+                try:
+                    os.remove(band_out)  # so as not to load the old file
+                except OSError:
+                    pass
+                # Output is discarded, as it is not read while rendering concurrently
+                process = subprocess.Popen(
+                    [pov_binary, self._temp_file_ini, "+SR%d" % start_row, "+ER%d" % end_row,
+                     "+O" + band_out] + extra_args,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                bands.append((process, start_row, end_row, band_out))
+        except OSError:
+            print("POV-Ray 3.7: could not execute '%s'" % pov_binary)
+            import traceback
+
+            traceback.print_exc()
+            PovRender._stop_processes([process for process, *_band in bands])
+            return False
+
+        pending = list(bands)
+        failed = 0
+        self.update_stats("", "POV-Ray 3.7: Rendering %d Bands" % band_count)
+
+        while pending:
+            time.sleep(self.DELAY)
+
+            # User interrupts the rendering
+            if self.test_break():
+                PovRender._stop_processes([process for process, *_band in pending])
+                print("***POV INTERRUPTED***")
+                pending = []
+                break
+
+            for band in [band for band in pending if band[0].poll() is not None]:
+                pending.remove(band)
+                process, start_row, end_row, band_out = band
+                if process.returncode != 0:
+                    failed += 1
+                    print("***POV PROCESS FAILED FOR ROWS %d-%d : %s ***"
+                          % (start_row, end_row, process.returncode))
+                self._load_band(x, y, start_row, end_row, band_out)
+                self.update_progress((len(bands) - len(pending)) / len(bands))
+
+        for *_band, band_out in bands:
+            for i in range(5):
+                try:
+                    if os.path.exists(band_out):
+                        os.unlink(band_out)
+                    break
+                except OSError:
+                    time.sleep(self.DELAY)
+
+        return failed == 0 and not self.test_break()
+
+    def _load_band(self, x, y, start_row, end_row, band_out):
+        """Copy one rendered band into the render result
+
+        POV-Ray rows are counted from the top, starting at 1, while Blender rows start
+        at the bottom. Depending on the version, POV-Ray writes either the band alone or
+        a full size image, so the size of the written PNG is checked first."""
+        if not os.path.exists(band_out):
+            print("***NO POV OUTPUT FOR ROWS %d-%d***" % (start_row, end_row))
+            return
+
+        with open(band_out, "rb") as f:
+            header = f.read(24)
+        image_height = int.from_bytes(header[20:24], "big")
+
+        band_y = y - end_row
+        band_height = end_row - start_row + 1
+        result = self.begin_result(0, band_y, x, band_height)
+        lay = result.layers[0]
+        try:
+            if image_height == band_height:
+                lay.load_from_file(band_out)
+            else:
+                lay.load_from_file(band_out, 0, band_y)
+        except RuntimeError:
+            print("***POV ERROR WHILE READING OUTPUT FILE***")
+        self.end_result(result)
+
     def _cleanup(self):
         """Delete temp files and unpacked ones"""
         for f in (self._temp_file_in, self._temp_file_ini, self._temp_file_out):
@@ -537,6 +667,20 @@ class PovRender(bpy.types.RenderEngine):
             self._export(depsgraph, pov_path, image_render_path)
             self.update_stats("", "POV-Ray 3.7: Parsing File")
 
+            # Concurrent band rendering, border renders already restrict the rendered rows.
+            # The Windows GUI engine (pvengine) does not run several instances at once
+            if (
+                scene.pov.render_band_count > 1
+                and not r.use_border
+                and not platform.startswith('win')
+            ):
+                if not self._render_bands(x, y, scene.pov.render_band_count) and not self.test_break():
+                    self.report({'ERROR'}, "POV-Ray 3.7: Band render failed, see the console for details")
+                self.update_stats("", "")
+                if scene.pov.tempfiles_enable or scene.pov.deletefiles_enable:
+                    self._cleanup()
+                return
+
             if not self._render(depsgraph):
                 self.update_stats("", "POV-Ray 3.7: Not found")
                 # return
@@ -102,6 +102,8 @@ class RENDER_PT_POV_export_settings(RenderButtonsPanel, Panel):
         col = split.column()
         col.label(text="Command line options:")
         col.prop(scene.pov, "command_line_switches", text="", icon="RIGHTARROW")
+        col.prop(scene.pov, "render_band_count")
+        col.prop(scene.pov, "mesh_cache_enable")
         split = layout.split()
 
         # layout.active = not scene.pov.tempfiles_enable
@@ -244,6 +244,14 @@ class RenderPovSettingsScene(PropertyGroup):
         name="Enable Comments", description="Add comments to pov file", default=True
     )
 
+    mesh_cache_enable: BoolProperty(
+        name="Cache Meshes",
+        description="Write mesh lists to #include files named after a hash of their "
+        "geometry and materials, and reuse them for unchanged meshes on later frames "
+        "and renders. Meshes with vertex colors are always written inline",
+        default=False,
+    )
+
     # Real pov options
     command_line_switches: StringProperty(
         name="Command Line Switches",
@@ -253,6 +261,15 @@ class RenderPovSettingsScene(PropertyGroup):
         maxlen=500,
     )
 
+    render_band_count: IntProperty(
+        name="Render Processes",
+        description="Split the image into this many horizontal bands, each rendered "
+        "by its own POV-Ray process at the same time",
+        min=1,
+        max=64,
+        default=1,
+    )
+
     antialias_enable: BoolProperty(
         name="Anti-Alias", description="Enable Anti-Aliasing", default=True
     )
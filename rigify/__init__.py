@@ -548,6 +548,9 @@ def register():
     bpy.types.Armature.rigify_mirror_widgets = BoolProperty(name="Mirror Widgets",
         description="Make widgets for left and right side bones linked duplicates with negative X scale for the right side, based on bone name symmetry",
         default=True)
+    bpy.types.Armature.rigify_share_widget_meshes = BoolProperty(name="Share Widget Meshes",
+        description="Make widgets with identical geometry use the same mesh datablock. Editing such a widget mesh changes it for all bones using it",
+        default=True)
     bpy.types.Armature.rigify_widgets_collection = PointerProperty(type=bpy.types.Collection,
         name="Widgets Collection",
         description="Defines which collection to place widget objects in. If unset, a new one will be created based on the name of the rig")
@@ -610,6 +613,7 @@ def unregister():
     del ArmStore.rigify_colors_lock
     del ArmStore.rigify_theme_to_add
     del ArmStore.rigify_force_widget_update
+    del ArmStore.rigify_share_widget_meshes
     del ArmStore.rigify_target_rig
     del ArmStore.rigify_rig_ui
 
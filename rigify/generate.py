@@ -9,7 +9,7 @@ from .utils.bones import new_bone
 from .utils.layers import ORG_LAYER, MCH_LAYER, DEF_LAYER, ROOT_LAYER
 from .utils.naming import (ORG_PREFIX, MCH_PREFIX, DEF_PREFIX, ROOT_NAME, make_original_name,
                            change_name_side, get_name_side, Side)
-from .utils.widgets import WGT_PREFIX
+from .utils.widgets import WGT_PREFIX, merge_duplicate_widget_meshes
 from .utils.widgets_special import create_root_widget
 from .utils.mechanism import refresh_all_drivers
 from .utils.misc import gamma_correct, select_object, ArmatureObject, verify_armature_obj
@@ -561,6 +561,10 @@ class Generator(base_generate.BaseGenerator):
 
         self.__assign_widgets()
 
+        # noinspection PyUnresolvedReferences
+        if metarig.data.rigify_share_widget_meshes:
+            merge_duplicate_widget_meshes(self.widget_collection.objects)
+
         # Create Selection Sets
         create_selection_sets(obj, metarig)
 
@@ -153,6 +153,7 @@ class DATA_PT_rigify_advanced(bpy.types.Panel):
         col.separator()
         col.row().prop(armature_id_store, "rigify_force_widget_update")
         col.row().prop(armature_id_store, "rigify_mirror_widgets")
+        col.row().prop(armature_id_store, "rigify_share_widget_meshes")
         col.separator()
         col.row().prop(armature_id_store, "rigify_finalize_script", text="Run Script")
 
@@ -129,19 +129,159 @@ def get_4d_rotlock(bone):
     else:
         return [all(bone.lock_rotation)] * 4
 
+class KeyframeBuffer:
+    """Collects transform keyframes during a bake, and writes them into the action
+    curves in one batch per curve instead of calling keyframe_insert for every key.
+    Used as a context manager, it collects the keys of keyframe_transform_properties
+    inside the block and writes them at the end."""
+
+    # Flags reproduced by the batch, keys with other flags are inserted right away
+    BATCHED_FLAGS = {'INSERTKEY_AVAILABLE', 'INSERTKEY_XYZ_TO_RGB'}
+    # Curve colors of INSERTKEY_XYZ_TO_RGB, other properties keep the default one
+    XYZ_TO_RGB_MODES = {
+        'location': 'AUTO_RGB', 'rotation_euler': 'AUTO_RGB', 'scale': 'AUTO_RGB',
+        'rotation_quaternion': 'AUTO_YRGB',
+    }
+
+    active = None
+
+    def __init__(self, obj, to_raw=None):
+        self.obj = obj
+        self.to_raw = to_raw
+        self.channels = {}
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = KeyframeBuffer.active
+        KeyframeBuffer.active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        KeyframeBuffer.active = self.outer
+        if exc_type is None:
+            self.flush()
+
+    def accepts(self, obj, keyflags):
+        "Whether the keys of obj with these flags can be collected."
+        return obj == self.obj and keyflags <= self.BATCHED_FLAGS
+
+    def add(self, bone, prop, index, keyflags):
+        "Record the current value of the property channel(s) at the current frame."
+        frame = bpy.context.scene.frame_current
+        if self.to_raw:
+            frame = self.to_raw(frame)
+
+        value = getattr(bone, prop)
+        indices = range(len(value)) if index is None else [index]
+
+        for i in indices:
+            key = (bone.name, prop, i)
+            if key not in self.channels:
+                self.channels[key] = (keyflags, {})
+            self.channels[key][1][frame] = value[i]
+
+    def flush(self):
+        "Write all collected keys into the action, the same way keyframe_insert would."
+        action = find_action(self.obj)
+
+        edit_prefs = bpy.context.preferences.edit
+        keyframe_props = bpy.types.Keyframe.bl_rna.properties
+        new_interpolation = keyframe_props['interpolation'].enum_items[
+            edit_prefs.keyframe_new_interpolation_type].value
+        new_handle_type = keyframe_props['handle_left_type'].enum_items[
+            edit_prefs.keyframe_new_handle_type].value
+
+        for (bone_name, prop, index), (keyflags, keys) in self.channels.items():
+            bone = self.obj.pose.bones[bone_name]
+            data_path = bone.path_from_id(prop)
+            curve = action.fcurves.find(data_path, index=index)
+
+            if not curve:
+                if 'INSERTKEY_AVAILABLE' in keyflags:
+                    continue
+                curve = action.fcurves.new(data_path, index=index, action_group=bone_name)
+                if 'INSERTKEY_XYZ_TO_RGB' in keyflags and prop in self.XYZ_TO_RGB_MODES:
+                    curve.color_mode = self.XYZ_TO_RGB_MODES[prop]
+
+            points = curve.keyframe_points
+            old_count = len(points)
+
+            coords = [0.0] * (old_count * 2)
+            handles_left = [0.0] * (old_count * 2)
+            handles_right = [0.0] * (old_count * 2)
+            interpolations = [0] * old_count
+            handle_types_left = [0] * old_count
+            handle_types_right = [0] * old_count
+            points.foreach_get('co', coords)
+            points.foreach_get('handle_left', handles_left)
+            points.foreach_get('handle_right', handles_right)
+            points.foreach_get('interpolation', interpolations)
+            points.foreach_get('handle_left_type', handle_types_left)
+            points.foreach_get('handle_right_type', handle_types_right)
+
+            # Replace the values of keys that already exist on the same frame
+            existing = {coords[i * 2]: i for i in range(old_count)}
+            new_keys = []
+            new_interpolations = []
+            before = last_before = 0
+            interpolation = new_interpolation
+
+            for frame, value in sorted(keys.items()):
+                if frame in existing:
+                    i = existing[frame]
+                    delta = value - coords[i * 2 + 1]
+                    coords[i * 2 + 1] = value
+                    handles_left[i * 2 + 1] += delta
+                    handles_right[i * 2 + 1] += delta
+                    continue
+
+                # Once the curve has more than two keys, a new key continues the
+                # interpolation of the key before it (or after it, if it is the first)
+                while before < old_count and coords[before * 2] < frame:
+                    before += 1
+                if old_count + len(new_interpolations) < 2:
+                    interpolation = new_interpolation
+                elif before > last_before or not new_interpolations:
+                    interpolation = interpolations[max(before - 1, 0)]
+                last_before = before
+
+                new_keys += [frame, value]
+                new_interpolations.append(interpolation)
+
+            points.add(len(new_interpolations))
+
+            points.foreach_set('co', coords + new_keys)
+            points.foreach_set('handle_left', handles_left + new_keys)
+            points.foreach_set('handle_right', handles_right + new_keys)
+            points.foreach_set('interpolation', interpolations + new_interpolations)
+            points.foreach_set('handle_left_type', handle_types_left + [new_handle_type] * len(new_interpolations))
+            points.foreach_set('handle_right_type', handle_types_right + [new_handle_type] * len(new_interpolations))
+            curve.update()
+
+        self.channels.clear()
+
 def keyframe_transform_properties(obj, bone_name, keyflags, *,
                                   ignore_locks=False, no_loc=False, no_rot=False, no_scale=False):
     "Keyframe transformation properties, taking flags and mode into account, and avoiding keying locked channels."
     bone = obj.pose.bones[bone_name]
 
+    def keyframe_insert(prop, index=None):
+        buffer = KeyframeBuffer.active
+        if buffer and buffer.accepts(obj, keyflags):
+            buffer.add(bone, prop, index, keyflags)
+        elif index is None:
+            bone.keyframe_insert(prop, group=bone_name, options=keyflags)
+        else:
+            bone.keyframe_insert(prop, index=index, group=bone_name, options=keyflags)
+
     def keyframe_channels(prop, locks):
         if ignore_locks or not all(locks):
             if ignore_locks or not any(locks):
-                bone.keyframe_insert(prop, group=bone_name, options=keyflags)
+                keyframe_insert(prop)
             else:
                 for i, lock in enumerate(locks):
                     if not lock:
-                        bone.keyframe_insert(prop, index=i, group=bone_name, options=keyflags)
+                        keyframe_insert(prop, index=i)
 
     if not (no_loc or bone.bone.use_connect):
         keyframe_channels('location', bone.lock_location)
@@ -705,9 +845,11 @@ class RigifyBakeKeyframesMixin(RigifyOperatorMixinBase):
         scene = context.scene
         saved_state = self.bake_state
 
-        for frame in self.bake_frames:
-            scene.frame_set(frame)
-            self.apply_frame_state(context, rig, saved_state.get(frame))
+        # Transform keys are collected and written in bulk after the scan
+        with KeyframeBuffer(rig, self.nla_to_raw):
+            for frame in self.bake_frames:
+                scene.frame_set(frame)
+                self.apply_frame_state(context, rig, saved_state.get(frame))
 
         clean_action_empty_curves(self.bake_rig)
         scene.frame_set(self.bake_current_frame)
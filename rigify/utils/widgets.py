@@ -3,6 +3,7 @@
 import bpy
 import math
 import inspect
+import hashlib
 import functools
 
 from typing import Optional, Callable
@@ -170,6 +171,75 @@ def create_widget(rig: ArmatureObject, bone_name: str,
     return obj
 
 
+##############################################
+# Widget mesh sharing
+##############################################
+
+def get_widget_geometry_hash(mesh: Mesh, precision=5) -> str:
+    """
+    Computes a hash of the widget mesh geometry (vertices, edges and faces),
+    with coordinates rounded to the given number of decimal places.
+    """
+    coords = [0.0] * (len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get('co', coords)
+
+    edges = [0] * (len(mesh.edges) * 2)
+    mesh.edges.foreach_get('vertices', edges)
+
+    loops = [0] * len(mesh.loops)
+    mesh.loops.foreach_get('vertex_index', loops)
+
+    totals = [0] * len(mesh.polygons)
+    mesh.polygons.foreach_get('loop_total', totals)
+
+    # Adding 0.0 folds negative zero into positive zero
+    coords = [round(v, precision) + 0.0 for v in coords]
+
+    hasher = hashlib.sha1()
+    for data in (coords, edges, loops, totals):
+        hasher.update(repr(data).encode())
+
+    return hasher.hexdigest()
+
+
+def merge_duplicate_widget_meshes(objects) -> int:
+    """
+    Makes widget objects with identical geometry share a single mesh datablock,
+    and removes the meshes that became unused. Meshes that already have more
+    users (e.g. kept from a previous generation, or mirrored) are preferred.
+    Returns the number of removed meshes.
+    """
+    groups: dict[str, list[Object]] = {}
+    hash_cache: dict[Mesh, str] = {}
+
+    for obj in objects:
+        mesh = obj.data
+        if obj.type != 'MESH' or obj.library or mesh.library:
+            continue
+        if mesh not in hash_cache:
+            hash_cache[mesh] = get_widget_geometry_hash(mesh)
+        groups.setdefault(hash_cache[mesh], []).append(obj)
+
+    removed = 0
+
+    for group in groups.values():
+        meshes = list({obj.data: None for obj in group})
+        if len(meshes) < 2:
+            continue
+
+        shared = max(meshes, key=lambda m: m.users)
+
+        for obj in group:
+            obj.data = shared
+
+        for mesh in meshes:
+            if mesh != shared and mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+                removed += 1
+
+    return removed
+
+
 ##############################################
 # Widget choice dropdown
 ##############################################